@@ -1,44 +1,324 @@
 """AI agent for link health prediction using PyTorch."""
-import torch
-import torch.nn as nn
-from typing import Dict
+import os
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Micro-batcher settings: coalesce concurrent single predictions into one forward
+MAX_BATCH = 256
+MAX_WAIT_MS = 2
 
-class SimpleHealthModel(nn.Module):
-    """A lightweight feedforward model to estimate link health."""
-    
-    def __init__(self):
-        super().__init__()
-        self.net = nn.Sequential(
-            nn.Linear(3, 8),
-            nn.ReLU(),
-            nn.Linear(8, 1),
-            nn.Sigmoid()
-        )
-
-    def forward(self, x):
-        return self.net(x)
-
-
-# Initialize model and device
-# Note: This uses MPS (Metal Performance Shaders) on Mac for GPU acceleration.
-# For CUDA-based environments (Linux/Windows with NVIDIA GPUs), change to:
-# device = "cuda" if torch.cuda.is_available() else "cpu"
-device = "mps" if torch.backends.mps.is_available() else "cpu"
-try:
-    model = SimpleHealthModel().to(device)
-    model.eval()
-    logger.info(f"AI model initialized on device: {device}")
-except Exception as e:
-    logger.error(f"Failed to initialize AI model on {device}: {e}")
-    # Fallback to CPU if device initialization fails
-    device = "cpu"
-    model = SimpleHealthModel().to(device)
-    model.eval()
-    logger.info(f"AI model initialized on fallback device: {device}")
+# Model state, built on first prediction so importing this module stays cheap
+# (PyTorch is only imported when a prediction is actually requested)
+_weights: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+_int8_model: Optional[Any] = None
+_model_lock = threading.Lock()
+
+
+def _build_health_model():
+    """Import PyTorch and construct SimpleHealthModel on the preferred device."""
+    import torch
+    import torch.nn as nn
+    
+    class SimpleHealthModel(nn.Module):
+        """A lightweight feedforward model to estimate link health."""
+        
+        def __init__(self):
+            super().__init__()
+            self.net = nn.Sequential(
+                nn.Linear(3, 8),
+                nn.ReLU(),
+                nn.Linear(8, 1),
+                nn.Sigmoid()
+            )
+    
+        def forward(self, x):
+            return self.net(x)
+    
+    # Initialize model and device
+    # Note: This uses MPS (Metal Performance Shaders) on Mac for GPU acceleration.
+    # For CUDA-based environments (Linux/Windows with NVIDIA GPUs), change to:
+    # device = "cuda" if torch.cuda.is_available() else "cpu"
+    device = "mps" if torch.backends.mps.is_available() else "cpu"
+    try:
+        model = SimpleHealthModel().to(device)
+        model.eval()
+        logger.info("AI model initialized on device: %s", device)
+    except Exception as e:
+        logger.error("Failed to initialize AI model on %s: %s", device, e)
+        # Fallback to CPU if device initialization fails
+        device = "cpu"
+        model = SimpleHealthModel().to(device)
+        model.eval()
+        logger.info("AI model initialized on fallback device: %s", device)
+    return model
+
+
+def _extract_weights(health_model) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Copy the MLP parameters into contiguous float32 NumPy arrays (W stored as in x out)."""
+    import torch
+    
+    with torch.inference_mode():
+        layer1, layer2 = health_model.net[0], health_model.net[2]
+        w1 = layer1.weight.detach().cpu().numpy().T.astype(np.float32, copy=True)
+        b1 = layer1.bias.detach().cpu().numpy().astype(np.float32, copy=True)
+        w2 = layer2.weight.detach().cpu().numpy().T.astype(np.float32, copy=True)
+        b2 = layer2.bias.detach().cpu().numpy().astype(np.float32, copy=True)
+    return w1, b1, w2, b2
+
+
+def _build_int8_model(health_model):
+    """
+    Build a dynamically quantized INT8 copy of the model on CPU.
+    
+    Enabled with HEALTH_MODEL_INT8=1. Linear weights are stored as qint8 and
+    activations are quantized per batch, so batched inference uses int8 dot
+    products. Because the activation scale depends on the whole batch, single
+    predictions are never co-batched in this mode, and scores from the batch
+    APIs can differ slightly from scoring the same row alone. Returns None if
+    quantization is unavailable on this build.
+    """
+    import copy
+    import torch
+    import torch.nn as nn
+    
+    try:
+        cpu_model = copy.deepcopy(health_model).cpu()
+        cpu_model.eval()
+        quantized = torch.ao.quantization.quantize_dynamic(cpu_model, {nn.Linear}, dtype=torch.qint8)
+        logger.info("AI model quantized to INT8 (dynamic)")
+    except Exception as e:
+        logger.warning("INT8 quantization unavailable, using FP32 kernel: %s", e)
+        return None
+    
+    # Trace and freeze into a single graph so each batch skips per-op eager
+    # dispatch. The torch thread count is process-wide and left to the host.
+    try:
+        with torch.no_grad():
+            traced = torch.jit.freeze(torch.jit.trace(quantized, torch.zeros(1, 3)))
+        logger.info("INT8 AI model traced and frozen with TorchScript")
+        return traced
+    except Exception as e:
+        logger.warning("TorchScript tracing failed, using eager INT8 model: %s", e)
+        return quantized
+
+
+def _get_weights() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the model weights, building the model on first use.
+    
+    The 3->8->1 MLP is far too small to benefit from PyTorch dispatch; inference
+    runs as a plain NumPy kernel over weights extracted once from the model.
+    """
+    global _weights, _int8_model
+    if _weights is None:
+        with _model_lock:
+            if _weights is None:
+                model = _build_health_model()
+                if os.getenv("HEALTH_MODEL_INT8") == "1":
+                    _int8_model = _build_int8_model(model)
+                _weights = _extract_weights(model)
+    return _weights
+
+
+def _sanitize_inputs(rx_errors: int, tx_errors: int, utilization: float) -> Tuple[int, int, float]:
+    """Clamp utilization to [0, 1] and use absolute error counts."""
+    if not (0.0 <= utilization <= 1.0):
+        logger.warning("Utilization out of range: %s, clamping to [0, 1]", utilization)
+        utilization = max(0.0, min(1.0, utilization))
+    
+    if rx_errors < 0 or tx_errors < 0:
+        logger.warning("Negative error counts detected, using absolute values")
+        rx_errors = abs(rx_errors)
+        tx_errors = abs(tx_errors)
+    
+    return rx_errors, tx_errors, utilization
+
+
+def _build_result(score: float, rx_errors: int, tx_errors: int, utilization: float) -> dict:
+    """Build the health prediction result dictionary for a single link."""
+    return {
+        "health_score": round(score, 3),
+        "status": "healthy" if score > 0.7 else "warning",
+        "inputs": {
+            "rx_errors": rx_errors,
+            "tx_errors": tx_errors,
+            "utilization": utilization
+        }
+    }
+
+
+def _forward_batch(rows: Sequence[Sequence[float]]) -> np.ndarray:
+    """Run a single forward pass over an (N, 3) batch and return N scores."""
+    w1, b1, w2, b2 = _get_weights()
+    x = np.asarray(rows, dtype=np.float32).reshape(-1, 3)
+    if _int8_model is not None:
+        import torch
+        with torch.inference_mode():
+            return _int8_model(torch.from_numpy(x)).reshape(-1).numpy()
+    h = np.maximum(x @ w1 + b1, 0.0)
+    z = h @ w2 + b2
+    return (1.0 / (1.0 + np.exp(-z))).reshape(-1)
+
+
+def predict_link_health_scores(rows: Any) -> np.ndarray:
+    """
+    Return raw health scores for an (N, 3) array of link telemetry.
+    
+    Bulk-scoring entry point for callers that aggregate or threshold the
+    results themselves (e.g. np.where(scores > 0.7, "healthy", "warning")),
+    so no per-link dicts or rounding are produced. Inputs are sanitized the
+    same way as predict_link_health, vectorized over the batch.
+    
+    Args:
+        rows: Array-like of (rx_errors, tx_errors, utilization) rows
+        
+    Returns:
+        float32 array of N health scores in [0, 1]
+    """
+    x = np.array(rows, dtype=np.float32).reshape(-1, 3)
+    np.abs(x[:, :2], out=x[:, :2])
+    np.clip(x[:, 2], 0.0, 1.0, out=x[:, 2])
+    return _forward_batch(x)
+
+
+def predict_link_health_batch(rows: Sequence[Sequence[float]]) -> List[dict]:
+    """
+    Predict link health for many links with one model forward pass.
+    
+    Builds a single (N, 3) array instead of N separate 1x3 inputs, so the
+    per-call tensor construction and dispatch overhead is paid once per batch.
+    
+    Args:
+        rows: Sequence of (rx_errors, tx_errors, utilization) triples
+        
+    Returns:
+        List of result dictionaries in the same order as rows
+    """
+    logger.info("Predicting link health for batch of %s link(s)", len(rows))
+    
+    try:
+        sanitized = [_sanitize_inputs(*row) for row in rows]
+        if not sanitized:
+            return []
+        scores = _forward_batch(sanitized).tolist()
+        return [_build_result(score, *row) for score, row in zip(scores, sanitized)]
+    except Exception as e:
+        logger.error("Error during batch health prediction: %s", e)
+        error = {
+            "error": "Prediction failed",
+            "message": str(e),
+            "health_score": None,
+            "status": "error"
+        }
+        return [dict(error) for _ in rows]
+
+
+class _MicroBatcher:
+    """
+    Coalesce concurrent single-link predictions into batched forward passes.
+    
+    A caller with no other prediction in flight runs its forward pass inline,
+    so the sequential path never waits on the worker. With the INT8 model
+    every caller runs inline, since dynamic quantization would make a score
+    depend on whichever requests shared its batch. Overlapping callers are
+    queued: a daemon worker drains up to MAX_BATCH pending requests, waits (at
+    most MAX_WAIT_MS) only while further callers are about to enqueue, and
+    resolves each request's Future from one forward pass.
+    """
+    
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self._queue: "queue.Queue[Tuple[Tuple[int, int, float], Future]]" = queue.Queue()
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000.0
+        self._worker = None
+        self._lock = threading.Lock()
+        # Callers inside predict(), and queued callers not yet taken by the worker
+        self._in_flight = 0
+        self._arriving = 0
+        # Reused input buffer, only touched by the worker thread
+        self._buf = np.empty((max_batch, 3), dtype=np.float32)
+    
+    def _ensure_worker(self):
+        """Start the worker thread on first use."""
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name="health-model-batcher", daemon=True
+                    )
+                    self._worker.start()
+    
+    def predict(self, row: Tuple[int, int, float]) -> float:
+        """Score one (rx_errors, tx_errors, utilization) row, batching only under contention."""
+        _get_weights()
+        with self._lock:
+            self._in_flight += 1
+            inline = self._in_flight == 1 or _int8_model is not None
+            if not inline:
+                self._arriving += 1
+        try:
+            if inline:
+                return float(_forward_batch(row)[0])
+            return self.submit(row).result()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+    
+    def submit(self, row: Tuple[int, int, float]) -> Future:
+        """Queue one (rx_errors, tx_errors, utilization) row for prediction."""
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((row, future))
+        return future
+    
+    def _take(self, block: bool, timeout: Optional[float] = None):
+        """Dequeue one request and mark its caller as no longer arriving."""
+        item = self._queue.get(block, timeout)
+        with self._lock:
+            if self._arriving:
+                self._arriving -= 1
+        return item
+    
+    def _run(self):
+        """Worker loop: drain pending requests and run them as one batch."""
+        while True:
+            pending = [self._take(True)]
+            while len(pending) < self._max_batch:
+                try:
+                    pending.append(self._take(False))
+                except queue.Empty:
+                    # Only wait for stragglers that have committed to this queue
+                    if not self._arriving:
+                        break
+                    try:
+                        pending.append(self._take(True, self._max_wait))
+                    except queue.Empty:
+                        break
+            
+            buf = self._buf
+            for i, ((rx_errors, tx_errors, utilization), _) in enumerate(pending):
+                buf[i, 0] = rx_errors
+                buf[i, 1] = tx_errors
+                buf[i, 2] = utilization
+            
+            try:
+                scores = _forward_batch(buf[:len(pending)])
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            
+            for score, (_, future) in zip(scores.tolist(), pending):
+                future.set_result(score)
+
+
+_batcher = _MicroBatcher()
 
 
 def predict_link_health(rx_errors: int, tx_errors: int, utilization: float) -> dict:
@@ -50,6 +330,9 @@ def predict_link_health(rx_errors: int, tx_errors: int, utilization: float) -> d
     - Uses ML model to predict link degradation
     - Provides actionable health scores for monitoring and alerting
     
+    Concurrent callers are coalesced by the micro-batcher into a single
+    forward pass; use predict_link_health_batch() for known sweeps.
+    
     Args:
         rx_errors: Number of receive errors
         tx_errors: Number of transmit errors
@@ -58,42 +341,22 @@ def predict_link_health(rx_errors: int, tx_errors: int, utilization: float) -> d
     Returns:
         Dictionary containing health_score and status
     """
-    logger.info(f"Predicting link health: rx_errors={rx_errors}, tx_errors={tx_errors}, utilization={utilization}")
+    logger.info("Predicting link health: rx_errors=%s, tx_errors=%s, utilization=%s", rx_errors, tx_errors, utilization)
     
     try:
-        # Validate inputs
-        if not (0.0 <= utilization <= 1.0):
-            logger.warning(f"Utilization out of range: {utilization}, clamping to [0, 1]")
-            utilization = max(0.0, min(1.0, utilization))
+        rx_errors, tx_errors, utilization = _sanitize_inputs(rx_errors, tx_errors, utilization)
+        score = _batcher.predict((rx_errors, tx_errors, utilization))
         
-        if rx_errors < 0 or tx_errors < 0:
-            logger.warning(f"Negative error counts detected, using absolute values")
-            rx_errors = abs(rx_errors)
-            tx_errors = abs(tx_errors)
+        result = _build_result(score, rx_errors, tx_errors, utilization)
         
-        with torch.no_grad():
-            x = torch.tensor([[rx_errors, tx_errors, utilization]], dtype=torch.float32).to(device)
-            score = model(x).item()
-        
-        result = {
-            "health_score": round(score, 3),
-            "status": "healthy" if score > 0.7 else "warning",
-            "inputs": {
-                "rx_errors": rx_errors,
-                "tx_errors": tx_errors,
-                "utilization": utilization
-            }
-        }
-        
-        logger.debug(f"Health prediction: {result}")
+        logger.debug("Health prediction: %s", result)
         return result
         
     except Exception as e:
-        logger.error(f"Error during health prediction: {e}")
+        logger.error("Error during health prediction: %s", e)
         return {
             "error": "Prediction failed",
             "message": str(e),
             "health_score": None,
             "status": "error"
         }
-
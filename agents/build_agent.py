@@ -1,13 +1,23 @@
 """Build validation agent for validating SONiC and non-SONiC build metadata."""
+import copy
 import os
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Optional
 from utils.logger import setup_logger
-from utils.file_loader import load_build_json
+from utils.file_loader import load_build_json, resolve_build_path
 
 logger = setup_logger(__name__)
 
+# Field sets checked against build_data.keys(); tuples keep report order stable
+_SONIC_REQUIRED_ORDER = ("version", "platform", "kernel_version", "build_date")
+_NONSONIC_REQUIRED_ORDER = ("vendor", "model", "os_version", "firmware_version")
+_RECOMMENDED_ORDER = ("serial_number", "mac_address", "hostname")
+_SONIC_REQUIRED = frozenset(_SONIC_REQUIRED_ORDER)
+_NONSONIC_REQUIRED = frozenset(_NONSONIC_REQUIRED_ORDER)
+_RECOMMENDED = frozenset(_RECOMMENDED_ORDER)
 
-def validate_build_metadata(build_json_path: str) -> dict:
+
+def validate_build_metadata(build_json_path: str, include_metadata: bool = True) -> dict:
     """
     Validate SONiC or non-SONiC build JSON files.
     
@@ -23,6 +33,8 @@ def validate_build_metadata(build_json_path: str) -> dict:
     
     Args:
         build_json_path: Path to the build JSON file (can be relative to data/builds/)
+        include_metadata: Whether to return the parsed build metadata (default: True).
+            Validation-only callers can pass False to skip copying it into the result.
         
     Returns:
         Dictionary containing:
@@ -30,10 +42,43 @@ def validate_build_metadata(build_json_path: str) -> dict:
         - device_type: "SONiC" or "non-SONiC"
         - errors: List of validation errors (if any)
         - warnings: List of warnings (missing recommended fields)
-        - metadata: The parsed build metadata
+        - metadata: The parsed build metadata (empty if include_metadata is False)
     """
-    logger.info(f"Validating build metadata: {build_json_path}")
+    logger.info("Validating build metadata: %s", build_json_path)
+    
+    resolved_path = resolve_build_path(build_json_path)
+    try:
+        st = os.stat(resolved_path)
+        cached = _validate_cached(resolved_path, st.st_mtime_ns, st.st_size)
+    except OSError:
+        cached = None
+    
+    if cached is None:
+        logger.error("Build file load failed: %s", build_json_path)
+        return {
+            "valid": False,
+            "device_type": None,
+            "errors": [f"Failed to load build file: {build_json_path}"],
+            "warnings": [],
+            "metadata": {}
+        }
     
+    # Copy so callers cannot mutate the cached result
+    result = dict(cached)
+    result["errors"] = list(cached["errors"])
+    result["warnings"] = list(cached["warnings"])
+    result["metadata"] = copy.deepcopy(cached["metadata"]) if include_metadata else {}
+    return result
+
+
+@lru_cache(maxsize=512)
+def _validate_cached(path: str, mtime_ns: int, size: int) -> Optional[dict]:
+    """
+    Load and validate a build file, cached on (path, mtime_ns, size).
+    
+    The stat fields in the key invalidate the entry when the file changes.
+    Returns None if the file cannot be loaded.
+    """
     result = {
         "valid": False,
         "device_type": None,
@@ -43,38 +88,40 @@ def validate_build_metadata(build_json_path: str) -> dict:
     }
     
     # Load build JSON using file loader utility
-    build_data = load_build_json(build_json_path)
+    build_data = load_build_json(path)
     if build_data is None:
-        result["errors"].append(f"Failed to load build file: {build_json_path}")
-        logger.error(f"Build file load failed: {build_json_path}")
-        return result
+        return None
     
     # Determine device type
-    if "sonic" in build_data.get("type", "").lower() or "sonic" in build_data.get("platform", "").lower():
+    build_type = build_data.get("type", "").lower()
+    platform = build_data.get("platform", "").lower()
+    is_sonic = "sonic" in build_type or "sonic" in platform
+    if is_sonic:
         result["device_type"] = "SONiC"
-        required_fields = ["version", "platform", "kernel_version", "build_date"]
+        required, required_order = _SONIC_REQUIRED, _SONIC_REQUIRED_ORDER
     else:
         result["device_type"] = "non-SONiC"
-        required_fields = ["vendor", "model", "os_version", "firmware_version"]
+        required, required_order = _NONSONIC_REQUIRED, _NONSONIC_REQUIRED_ORDER
     
     # Validate required fields
-    missing_fields = []
-    for field in required_fields:
-        if field not in build_data:
-            missing_fields.append(field)
+    keys = build_data.keys()
+    missing = required - keys
     
-    if missing_fields:
+    if missing:
+        missing_fields = [field for field in required_order if field in missing]
         result["errors"].append(f"Missing required fields: {', '.join(missing_fields)}")
-        logger.warning(f"Missing required fields: {missing_fields}")
+        logger.warning("Missing required fields: %s", missing_fields)
     else:
         result["valid"] = True
-        logger.info(f"Build metadata validated successfully for {result['device_type']} device")
+        logger.info("Build metadata validated successfully for %s device", result['device_type'])
     
     # Check for optional but recommended fields
-    recommended_fields = ["serial_number", "mac_address", "hostname"]
-    for field in recommended_fields:
-        if field not in build_data:
-            result["warnings"].append(f"Recommended field missing: {field}")
+    missing_recommended = _RECOMMENDED - keys
+    if missing_recommended:
+        result["warnings"] = [
+            f"Recommended field missing: {field}"
+            for field in _RECOMMENDED_ORDER if field in missing_recommended
+        ]
     
     result["metadata"] = build_data
     return result
@@ -12,6 +12,9 @@ from datetime import datetime, timedelta
 
 logger = setup_logger(__name__)
 
+# Prefer libyaml's C-backed loader; fall back to the pure-Python SafeLoader
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class ConfigAgent:
     """Agent for handling configuration and compliance queries."""
@@ -27,22 +30,17 @@ class ConfigAgent:
         baseline_path = Path("data/config_baseline.yaml")
         if baseline_path.exists():
             try:
-                with open(baseline_path, 'r') as f:
-                    return yaml.safe_load(f)
+                with open(baseline_path, 'rb') as f:
+                    return yaml.load(f, Loader=_YAML_LOADER)
             except Exception as e:
                 logger.warning(f"Failed to load baseline config: {e}")
         return {}
     
     def _load_device_configs(self) -> List[Dict[str, Any]]:
-        """Load device configuration data."""
-        config_path = Path("data/config_baseline.yaml")
-        if config_path.exists():
-            try:
-                with open(config_path, 'r') as f:
-                    data = yaml.safe_load(f)
-                    return data.get("devices", [])
-            except Exception as e:
-                logger.warning(f"Failed to load device configs: {e}")
+        """Load device configuration data (from the already-parsed baseline file)."""
+        data = self.baseline_config
+        if isinstance(data, dict):
+            return data.get("devices", [])
         return []
     
     def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -3,9 +3,15 @@
 This module provides optional SSH and Telnet connectivity for verifying device
 identity and retrieving live device information.
 """
+import asyncio
+import atexit
 import os
 import socket
-from typing import Optional, Dict, Any
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
+from utils.credentials import credential_digest
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -37,6 +43,89 @@ except ImportError:
         logger.warning("telnetlib not available (removed in Python 3.12+). Telnet features will be disabled.")
         logger.warning("To enable Telnet: pip install telnetlib3")
 
+# nest_asyncio support, probed once on first need (None = not yet checked)
+_NEST_ASYNCIO_OK: Optional[bool] = None
+
+# Authenticated SSH clients reused across commands, keyed by (host, port,
+# username, password digest) so a client is only reused with its own password
+SSH_POOL_MAXSIZE = 32
+_ssh_pool: "OrderedDict[Tuple[str, int, str, str], Any]" = OrderedDict()
+_ssh_pool_lock = threading.Lock()
+
+
+def _get_ssh_client(host: str, port: int, username: str, password: str, timeout: int):
+    """Return a pooled, connected SSHClient, connecting (and evicting LRU) on a miss."""
+    key = (host, port, username, credential_digest(password))
+    with _ssh_pool_lock:
+        client = _ssh_pool.get(key)
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                _ssh_pool.move_to_end(key)
+                return client
+            # Stale connection, drop it and reconnect below
+            del _ssh_pool[key]
+    if client is not None:
+        client.close()
+    
+    client = paramiko.SSHClient()
+    client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    logger.debug("Connecting to %s:%s via SSH", host, port)
+    client.connect(
+        hostname=host,
+        port=port,
+        username=username,
+        password=password,
+        timeout=timeout,
+        look_for_keys=False,
+        allow_agent=False
+    )
+    
+    evicted = []
+    with _ssh_pool_lock:
+        existing = _ssh_pool.get(key)
+        if existing is not None:
+            transport = existing.get_transport()
+            if transport is not None and transport.is_active():
+                # Another thread connected first and may already be using its
+                # client; keep that one and drop ours
+                _ssh_pool.move_to_end(key)
+                evicted.append(client)
+                client = existing
+            else:
+                del _ssh_pool[key]
+                evicted.append(existing)
+        if client is not existing:
+            _ssh_pool[key] = client
+            while len(_ssh_pool) > SSH_POOL_MAXSIZE:
+                evicted.append(_ssh_pool.popitem(last=False)[1])
+    for old_client in evicted:
+        old_client.close()
+    return client
+
+
+def _discard_ssh_client(host: str, port: int, username: str, password: str):
+    """Remove and close a pooled SSH client (e.g. after a failed command)."""
+    with _ssh_pool_lock:
+        client = _ssh_pool.pop((host, port, username, credential_digest(password)), None)
+    if client is not None:
+        client.close()
+
+
+def close_ssh_pool():
+    """Close every pooled SSH connection."""
+    with _ssh_pool_lock:
+        clients = list(_ssh_pool.values())
+        _ssh_pool.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug("Error closing pooled SSH client: %s", e)
+
+
+atexit.register(close_ssh_pool)
+
 
 def run_ssh_command(
     host: str,
@@ -49,6 +138,9 @@ def run_ssh_command(
     """
     Execute a command on a device via SSH using paramiko.
     
+    Connections are kept open in a small LRU pool so repeated commands to
+    the same device reuse the authenticated transport.
+    
     Args:
         host: Device hostname or IP address
         username: SSH username
@@ -67,47 +159,106 @@ def run_ssh_command(
         raise ImportError("paramiko not available, install with: pip install paramiko")
     
     try:
-        ssh = paramiko.SSHClient()
-        ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
-        logger.debug(f"Connecting to {host}:{port} via SSH")
-        ssh.connect(
-            hostname=host,
-            port=port,
-            username=username,
-            password=password,
-            timeout=timeout,
-            look_for_keys=False,
-            allow_agent=False
-        )
+        ssh = _get_ssh_client(host, port, username, password, timeout)
         
-        logger.debug(f"Executing command: {command}")
-        stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout)
-        
-        output = stdout.read().decode('utf-8', errors='ignore')
-        error = stderr.read().decode('utf-8', errors='ignore')
-        
-        ssh.close()
+        logger.debug("Executing command: %s", command)
+        try:
+            stdin, stdout, stderr = ssh.exec_command(command, timeout=timeout)
+            output = stdout.read().decode('utf-8', errors='ignore')
+            error = stderr.read().decode('utf-8', errors='ignore')
+        except Exception:
+            _discard_ssh_client(host, port, username, password)
+            raise
         
         if error and "Permission denied" not in error.lower():
-            logger.warning(f"SSH command stderr: {error}")
+            logger.warning("SSH command stderr: %s", error)
         
         return output.strip()
     
     except paramiko.AuthenticationException:
-        logger.error(f"SSH authentication failed for {host}")
+        logger.error("SSH authentication failed for %s", host)
         raise Exception(f"SSH authentication failed for {host}")
     except paramiko.SSHException as e:
-        logger.error(f"SSH error for {host}: {e}")
+        logger.error("SSH error for %s: %s", host, e)
         raise Exception(f"SSH error: {str(e)}")
     except socket.timeout:
-        logger.error(f"SSH connection timeout for {host}")
+        logger.error("SSH connection timeout for %s", host)
         raise Exception(f"SSH connection timeout for {host}")
     except Exception as e:
-        logger.error(f"SSH connection error for {host}: {e}")
+        logger.error("SSH connection error for %s: %s", host, e)
         raise Exception(f"SSH connection error: {str(e)}")
 
 
+def _nest_asyncio_available() -> bool:
+    """Import and apply nest_asyncio once, caching whether it is available."""
+    global _NEST_ASYNCIO_OK
+    if _NEST_ASYNCIO_OK is None:
+        try:
+            import nest_asyncio
+            nest_asyncio.apply()
+            _NEST_ASYNCIO_OK = True
+        except ImportError:
+            _NEST_ASYNCIO_OK = False
+    return _NEST_ASYNCIO_OK
+
+
+def _run_coroutine(coro):
+    """Run a coroutine to completion from synchronous code."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No running loop in this thread (the common case)
+        return asyncio.run(coro)
+    
+    # Event loop already running in this thread
+    if _nest_asyncio_available():
+        return asyncio.run(coro)
+    # Fallback: run on a fresh loop in a helper thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+async def _telnet_connect_async(
+    host: str,
+    port: int,
+    user_bytes: bytes,
+    pass_bytes: bytes,
+    cmd_bytes: bytes
+) -> str:
+    """Run a single login + command session using the telnetlib3 async API."""
+    try:
+        reader, writer = await TELNET_MODULE.open_connection(host, port)
+        # Read login prompt
+        data = await reader.readuntil(b"login:")
+        writer.write(user_bytes)
+        await writer.drain()
+        
+        # Read password prompt
+        data = await reader.readuntil(b"Password:")
+        writer.write(pass_bytes)
+        await writer.drain()
+        
+        # Wait for prompt
+        prompt_patterns = [b">", b"#", b"$", b"%"]
+        data = await reader.readuntil(prompt_patterns)
+        
+        # Execute command
+        logger.debug("Executing command: %r", cmd_bytes)
+        writer.write(cmd_bytes)
+        await writer.drain()
+        
+        # Read output
+        output = await reader.readuntil(prompt_patterns)
+        output_text = output.decode('ascii', errors='ignore')
+        
+        writer.close()
+        await writer.wait_closed()
+        return output_text
+    except Exception as e:
+        logger.error("Telnetlib3 connection error: %s", e)
+        raise
+
+
 def run_telnet_command(
     host: str,
     username: str,
@@ -137,7 +288,12 @@ def run_telnet_command(
         raise ImportError("telnetlib not available. Install telnetlib3 for Python 3.12+: pip install telnetlib3")
     
     try:
-        logger.debug(f"Connecting to {host}:{port} via Telnet")
+        logger.debug("Connecting to %s:%s via Telnet", host, port)
+        
+        # Encode the session inputs once; both telnet APIs write the same bytes
+        user_bytes = username.encode('ascii') + b"\n"
+        pass_bytes = password.encode('ascii') + b"\n"
+        cmd_bytes = command.encode('ascii') + b"\n"
         
         # Use telnetlib (Python < 3.12) or telnetlib3 (Python 3.12+)
         if TELNET_MODULE.__name__ == "telnetlib":
@@ -146,19 +302,19 @@ def run_telnet_command(
             
             # Read until login prompt
             tn.read_until(b"login:", timeout=timeout)
-            tn.write(username.encode('ascii') + b"\n")
+            tn.write(user_bytes)
             
             # Read until password prompt
             tn.read_until(b"Password:", timeout=timeout)
-            tn.write(password.encode('ascii') + b"\n")
+            tn.write(pass_bytes)
             
             # Wait for command prompt (common patterns)
             prompt_patterns = [b">", b"#", b"$", b"%"]
             tn.read_until(prompt_patterns, timeout=timeout)
             
             # Execute command
-            logger.debug(f"Executing command: {command}")
-            tn.write(command.encode('ascii') + b"\n")
+            logger.debug("Executing command: %s", command)
+            tn.write(cmd_bytes)
             
             # Read output until prompt appears again
             output = tn.read_until(prompt_patterns, timeout=timeout).decode('ascii', errors='ignore')
@@ -166,55 +322,9 @@ def run_telnet_command(
             tn.close()
         else:
             # telnetlib3 API (async, but we'll use it synchronously)
-            import asyncio
-            async def telnet_connect():
-                try:
-                    reader, writer = await TELNET_MODULE.open_connection(host, port)
-                    # Read login prompt
-                    data = await reader.readuntil(b"login:")
-                    writer.write(username.encode('ascii') + b"\n")
-                    await writer.drain()
-                    
-                    # Read password prompt
-                    data = await reader.readuntil(b"Password:")
-                    writer.write(password.encode('ascii') + b"\n")
-                    await writer.drain()
-                    
-                    # Wait for prompt
-                    prompt_patterns = [b">", b"#", b"$", b"%"]
-                    data = await reader.readuntil(prompt_patterns)
-                    
-                    # Execute command
-                    logger.debug(f"Executing command: {command}")
-                    writer.write(command.encode('ascii') + b"\n")
-                    await writer.drain()
-                    
-                    # Read output
-                    output = await reader.readuntil(prompt_patterns)
-                    output_text = output.decode('ascii', errors='ignore')
-                    
-                    writer.close()
-                    await writer.wait_closed()
-                    return output_text
-                except Exception as e:
-                    logger.error(f"Telnetlib3 connection error: {e}")
-                    raise
-            
-            # Run async function
-            try:
-                output = asyncio.run(telnet_connect())
-            except RuntimeError:
-                # Handle case where event loop is already running
-                import nest_asyncio
-                try:
-                    nest_asyncio.apply()
-                    output = asyncio.run(telnet_connect())
-                except ImportError:
-                    # Fallback: create new event loop
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    output = loop.run_until_complete(telnet_connect())
-                    loop.close()
+            output = _run_coroutine(
+                _telnet_connect_async(host, port, user_bytes, pass_bytes, cmd_bytes)
+            )
         
         # Clean up output (remove command echo and prompt)
         lines = output.split('\n')
@@ -225,13 +335,13 @@ def run_telnet_command(
         return output.strip()
     
     except socket.timeout:
-        logger.error(f"Telnet connection timeout for {host}")
+        logger.error("Telnet connection timeout for %s", host)
         raise Exception(f"Telnet connection timeout for {host}")
     except ConnectionRefusedError:
-        logger.error(f"Telnet connection refused for {host}")
+        logger.error("Telnet connection refused for %s", host)
         raise Exception(f"Telnet connection refused for {host}")
     except Exception as e:
-        logger.error(f"Telnet connection error for {host}: {e}")
+        logger.error("Telnet connection error for %s: %s", host, e)
         raise Exception(f"Telnet connection error: {str(e)}")
 
 
@@ -251,7 +361,7 @@ def get_device_identity(device: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     ip = device.get("ip")
     if not ip:
-        logger.debug(f"No IP address for device {device.get('name')}")
+        logger.debug("No IP address for device %s", device.get('name'))
         return None
     
     # Get credentials from environment
@@ -281,7 +391,7 @@ def get_device_identity(device: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 "success": True
             }
         except Exception as e:
-            logger.debug(f"SSH identity check failed for {device.get('name')}: {e}")
+            logger.debug("SSH identity check failed for %s: %s", device.get('name'), e)
     
     # Try Telnet if SSH failed or not available
     if telnet_user and telnet_pass:
@@ -304,7 +414,38 @@ def get_device_identity(device: Dict[str, Any]) -> Optional[Dict[str, Any]]:
                 "success": True
             }
         except Exception as e:
-            logger.debug(f"Telnet identity check failed for {device.get('name')}: {e}")
+            logger.debug("Telnet identity check failed for %s: %s", device.get('name'), e)
     
     return None
 
+
+def get_device_identities(
+    devices: List[Dict[str, Any]],
+    max_workers: int = 16
+) -> List[Optional[Dict[str, Any]]]:
+    """
+    Verify identity for many devices concurrently.
+    
+    SSH/Telnet checks are I/O-bound, so they are dispatched on a thread pool
+    (sharing the SSH connection pool) instead of one device at a time.
+    
+    Args:
+        devices: List of device dictionaries (see get_device_identity)
+        max_workers: Maximum number of concurrent connections (default: 16)
+        
+    Returns:
+        List of identity dictionaries (or None), in the same order as devices;
+        a device whose check raised gets None without affecting the others
+    """
+    if not devices:
+        return []
+    
+    def identity_or_none(device: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            return get_device_identity(device)
+        except Exception as e:
+            logger.debug("Identity verification failed for %s: %s", device.get('name'), e)
+            return None
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(devices))) as executor:
+        return list(executor.map(identity_or_none, devices))
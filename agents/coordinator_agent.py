@@ -3,11 +3,129 @@
 This module implements a coordinator that routes natural language queries to
 domain-specific sub-agents and combines their responses into unified insights.
 """
-from typing import Dict, List, Optional, Any, Tuple
+import asyncio
+import re
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Any, Sequence, Tuple
 from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Maximum time to wait for a single sub-agent to answer a query
+SUB_AGENT_TIMEOUT = 60
+
+# Try to import pyahocorasick for single-pass multi-keyword routing
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+    logger.debug("pyahocorasick not available, using substring keyword routing")
+
+# Routing keywords per sub-agent domain (substring matches, checked in this order)
+DOMAIN_KEYWORDS: Dict[str, frozenset] = {
+    # Inventory-related keywords
+    "inventory": frozenset({
+        "vlan", "device", "inventory", "which device", "list devices",
+        "device info", "show device", "device name", "sonic", "nexus",
+        "edgecore", "celtica", "nvidia", "role", "vendor", "os",
+        "mismatch", "netbox", "yam", "group devices", "inventory summary",
+        "inventory report", "generate report", "sonic leaf", "sonic switch"
+    }),
+    # Telemetry-related keywords
+    "telemetry": frozenset({
+        "telemetry", "utilization", "rx_errors", "tx_errors", "rx_bytes",
+        "tx_bytes", "bandwidth", "traffic", "interface status", "port",
+        "link health", "errors", "cpu", "memory", "high usage"
+    }),
+    # Config-related keywords
+    "config": frozenset({
+        "config", "configuration", "firmware", "version", "build",
+        "compliance", "drift", "outdated", "baseline", "validate"
+    }),
+    # Ticketing-related keywords
+    "ticketing": frozenset({
+        "ticket", "servicenow", "zendesk", "incident", "open tickets",
+        "priority", "high priority", "critical", "assigned", "status"
+    }),
+}
+
+# Stdlib fallback: one compiled alternation per domain keeps substring semantics
+# but scans the query in C instead of one Python `in` check per keyword
+_DOMAIN_PATTERNS: Dict[str, "re.Pattern"] = {
+    domain: re.compile("|".join(re.escape(keyword) for keyword in sorted(keywords)))
+    for domain, keywords in DOMAIN_KEYWORDS.items()
+}
+
+# Generic terms that suggest telemetry when no domain keyword matched
+_FALLBACK_TELEMETRY_TERMS = frozenset({"error", "health", "status", "show"})
+
+# Device-name pattern used when no domain keyword matched
+_DEVICE_RE = re.compile(r'\b(sonic-\S+|nexus-\S+|edgecore-\S+|celtica-\S+|\S+-\d+)\b', re.IGNORECASE)
+
+
+def _build_router_automaton():
+    """Build an Aho-Corasick automaton labelling each keyword with its domain."""
+    automaton = ahocorasick.Automaton()
+    for domain, keywords in DOMAIN_KEYWORDS.items():
+        for keyword in keywords:
+            # Keywords shared by several domains keep every label
+            existing = automaton.get(keyword, ())
+            automaton.add_word(keyword, existing + (domain,))
+    automaton.make_automaton()
+    return automaton
+
+
+def _extract_data(result: Any) -> Any:
+    """Return the "data" payload of a sub-agent result, if any."""
+    if isinstance(result, dict):
+        return result.get("data")
+    return None
+
+
+def _extract_list(result: Any) -> Sequence[Any]:
+    """Extract list data; anything else yields an empty tuple."""
+    data = _extract_data(result)
+    return data if isinstance(data, list) else ()
+
+
+def _extract_list_or_singleton(result: Any) -> Sequence[Any]:
+    """Extract list data, wrapping a single dict payload in a list."""
+    data = _extract_data(result)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return [data]
+    return ()
+
+
+def _extract_devices(result: Any) -> Sequence[Any]:
+    """Extract devices from a list payload or a {"devices": [...]} payload."""
+    data = _extract_data(result)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and "devices" in data:
+        return data["devices"]
+    return ()
+
+
+# Sub-agent name -> (combined result key, extractor)
+_EXTRACTORS = {
+    "inventory": ("devices", _extract_devices),
+    "telemetry": ("telemetry", _extract_list_or_singleton),
+    "config": ("config_issues", _extract_list),
+    "ticketing": ("tickets", _extract_list),
+}
+_COMBINED_KEYS = tuple(key for key, _ in _EXTRACTORS.values())
+
+
+def _failed_result(error: Exception) -> Dict[str, Any]:
+    """Result recorded for a sub-agent that raised or timed out."""
+    return {
+        "error": str(error),
+        "success": False
+    }
+
 
 class CoordinatorAgent:
     """
@@ -21,7 +139,11 @@ class CoordinatorAgent:
     def __init__(self):
         """Initialize the coordinator with sub-agent registry."""
         self.sub_agents = {}
+        self._router_automaton = _build_router_automaton() if AHOCORASICK_AVAILABLE else None
         self._register_sub_agents()
+        self._pool = ThreadPoolExecutor(
+            max_workers=len(self.sub_agents), thread_name_prefix="coordinator"
+        )
         logger.info("Coordinator agent initialized with sub-agents")
     
     def _register_sub_agents(self):
@@ -38,7 +160,7 @@ class CoordinatorAgent:
             "ticketing": TicketingAgent()
         }
         
-        logger.info(f"Registered {len(self.sub_agents)} sub-agents: {list(self.sub_agents.keys())}")
+        logger.info("Registered %s sub-agents: %s", len(self.sub_agents), list(self.sub_agents.keys()))
     
     def route_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> List[str]:
         """
@@ -55,66 +177,35 @@ class CoordinatorAgent:
             List of sub-agent names to invoke
         """
         query_lower = query.lower()
-        agents_to_call = []
-        
-        # Inventory-related keywords
-        inventory_keywords = [
-            "vlan", "device", "inventory", "which device", "list devices",
-            "device info", "show device", "device name", "sonic", "nexus",
-            "edgecore", "celtica", "nvidia", "role", "vendor", "os",
-            "mismatch", "netbox", "yam", "group devices", "inventory summary",
-            "inventory report", "generate report", "sonic leaf", "sonic switch"
-        ]
-        
-        # Telemetry-related keywords
-        telemetry_keywords = [
-            "telemetry", "utilization", "rx_errors", "tx_errors", "rx_bytes",
-            "tx_bytes", "bandwidth", "traffic", "interface status", "port",
-            "link health", "errors", "cpu", "memory", "high usage"
-        ]
-        
-        # Config-related keywords
-        config_keywords = [
-            "config", "configuration", "firmware", "version", "build",
-            "compliance", "drift", "outdated", "baseline", "validate"
-        ]
-        
-        # Ticketing-related keywords
-        ticketing_keywords = [
-            "ticket", "servicenow", "zendesk", "incident", "open tickets",
-            "priority", "high priority", "critical", "assigned", "status"
-        ]
         
         # Route to appropriate agents
-        if any(keyword in query_lower for keyword in inventory_keywords):
-            agents_to_call.append("inventory")
-        
-        if any(keyword in query_lower for keyword in telemetry_keywords):
-            agents_to_call.append("telemetry")
-        
-        if any(keyword in query_lower for keyword in config_keywords):
-            agents_to_call.append("config")
-        
-        if any(keyword in query_lower for keyword in ticketing_keywords):
-            agents_to_call.append("ticketing")
+        if self._router_automaton is not None:
+            # One linear pass over the query collects every matching domain
+            matched = set()
+            for _, domains in self._router_automaton.iter(query_lower):
+                matched.update(domains)
+            agents_to_call = [domain for domain in DOMAIN_KEYWORDS if domain in matched]
+        else:
+            agents_to_call = [
+                domain for domain, pattern in _DOMAIN_PATTERNS.items()
+                if pattern.search(query_lower)
+            ]
         
         # If no specific domain identified, try to infer from device names
         if not agents_to_call:
             # Check for device names - likely inventory query
-            import re
-            device_pattern = r'\b(sonic-\S+|nexus-\S+|edgecore-\S+|celtica-\S+|\S+-\d+)\b'
-            if re.search(device_pattern, query, re.IGNORECASE):
+            if _DEVICE_RE.search(query):
                 agents_to_call.append("inventory")
             
             # Check for error/health terms - likely telemetry
-            if any(term in query_lower for term in ["error", "health", "status", "show"]):
+            if any(term in query_lower for term in _FALLBACK_TELEMETRY_TERMS):
                 agents_to_call.append("telemetry")
         
         # Default to inventory if still nothing found
         if not agents_to_call:
             agents_to_call.append("inventory")
         
-        logger.info(f"[Coordinator] Routing query to agents: {agents_to_call}")
+        logger.info("[Coordinator] Routing query to agents: %s", agents_to_call)
         return agents_to_call
     
     def execute_query(
@@ -136,35 +227,54 @@ class CoordinatorAgent:
             - summary: Human-readable summary of the response
             - structured_data: Combined structured data from all agents
         """
-        logger.info(f"[Coordinator] Processing query: {query[:100]}")
-        
-        # Route query to appropriate agents
-        agents_to_call = self.route_query(query, context)
+        logger.info("[Coordinator] Processing query: %s", query[:100])
         
+        agents_to_call, futures, errors = self._submit(query, context)
         results = {}
-        errors = {}
         
-        # Execute each agent in parallel (simulated)
+        # Collect in routing order so results stay deterministic
+        for agent_name, future in futures.items():
+            try:
+                results[agent_name] = future.result(timeout=SUB_AGENT_TIMEOUT)
+            except Exception as e:
+                logger.error("[Coordinator] Error in %s agent: %s", agent_name, e, exc_info=True)
+                errors[agent_name] = str(e)
+                results[agent_name] = _failed_result(e)
+        
+        return self._build_response(query, agents_to_call, results, errors)
+    
+    def _submit(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]]
+    ) -> Tuple[List[str], Dict[str, Future], Dict[str, str]]:
+        """Route a query and submit every known sub-agent so they run concurrently.
+        
+        Returns the routed agent names, their futures in routing order, and
+        errors for routed agents that are not registered.
+        """
+        agents_to_call = self.route_query(query, context)
+        futures = {}
+        errors = {}
         for agent_name in agents_to_call:
             if agent_name not in self.sub_agents:
-                logger.warning(f"[Coordinator] Unknown agent: {agent_name}")
+                logger.warning("[Coordinator] Unknown agent: %s", agent_name)
                 errors[agent_name] = f"Agent {agent_name} not found"
                 continue
             
-            try:
-                agent = self.sub_agents[agent_name]
-                logger.debug(f"[Coordinator] Invoking {agent_name} agent")
-                result = agent.process_query(query, context)
-                results[agent_name] = result
-            except Exception as e:
-                logger.error(f"[Coordinator] Error in {agent_name} agent: {e}", exc_info=True)
-                errors[agent_name] = str(e)
-                results[agent_name] = {
-                    "error": str(e),
-                    "success": False
-                }
-        
-        # Combine results and generate summary
+            agent = self.sub_agents[agent_name]
+            logger.debug("[Coordinator] Invoking %s agent", agent_name)
+            futures[agent_name] = self._pool.submit(agent.process_query, query, context)
+        return agents_to_call, futures, errors
+    
+    def _build_response(
+        self,
+        query: str,
+        agents_to_call: List[str],
+        results: Dict[str, Any],
+        errors: Dict[str, str]
+    ) -> Dict[str, Any]:
+        """Combine sub-agent results into the execute_query response."""
         summary = self._generate_summary(query, results, errors)
         structured_data = self._combine_results(results)
         
@@ -178,6 +288,103 @@ class CoordinatorAgent:
             "success": len(errors) == 0
         }
     
+    async def execute_query_async(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of execute_query for callers running an event loop.
+        
+        Sub-agents run concurrently on the coordinator's pool and are awaited
+        together with asyncio.gather, so the loop stays free for user input
+        and other in-flight queries and no thread sits blocked collecting
+        results. A failed or timed-out agent is recorded in errors without
+        affecting the others.
+        
+        Args:
+            query: Natural language query
+            context: Optional context from conversation history
+            
+        Returns:
+            Same dictionary as execute_query
+        """
+        logger.info("[Coordinator] Processing query: %s", query[:100])
+        
+        agents_to_call, futures, errors = self._submit(query, context)
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(asyncio.wrap_future(future), SUB_AGENT_TIMEOUT) for future in futures.values()),
+            return_exceptions=True
+        )
+        results = {}
+        
+        # gather preserves submission order, so results stay in routing order
+        for agent_name, outcome in zip(futures, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("[Coordinator] Error in %s agent: %s", agent_name, outcome, exc_info=outcome)
+                errors[agent_name] = str(outcome)
+                results[agent_name] = _failed_result(outcome)
+            else:
+                results[agent_name] = outcome
+        
+        return self._build_response(query, agents_to_call, results, errors)
+    
+    async def execute_query_stream(
+        self,
+        query: str,
+        context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Execute a query and yield each sub-agent's result as soon as it finishes.
+        
+        Sub-agents run concurrently as in execute_query, but results arrive in
+        completion order, so callers can show the fastest agent's answer
+        without waiting for the slowest. A failed or timed-out agent yields
+        {"error": ..., "success": False}. Pass the collected results to
+        build_response for the full execute_query-style response.
+        
+        Args:
+            query: Natural language query
+            context: Optional context from conversation history
+            
+        Yields:
+            (agent_name, agent_result) tuples in completion order
+        """
+        logger.info("[Coordinator] Streaming query: %s", query[:100])
+        
+        _, futures, _ = self._submit(query, context)
+        
+        async def wait_for_agent(agent_name: str, future: Future) -> Tuple[str, Dict[str, Any]]:
+            try:
+                return agent_name, await asyncio.wait_for(asyncio.wrap_future(future), SUB_AGENT_TIMEOUT)
+            except Exception as e:
+                logger.error("[Coordinator] Error in %s agent: %s", agent_name, e, exc_info=True)
+                return agent_name, _failed_result(e)
+        
+        for next_done in asyncio.as_completed(
+            [wait_for_agent(agent_name, future) for agent_name, future in futures.items()]
+        ):
+            yield await next_done
+    
+    def build_response(self, query: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the execute_query response from results gathered via execute_query_stream.
+        
+        Args:
+            query: The query that was streamed
+            results: Mapping of agent name to the result it yielded
+            
+        Returns:
+            Same dictionary shape as execute_query, with agents listed in the
+            order their results were collected
+        """
+        errors = {
+            agent_name: result["error"]
+            for agent_name, result in results.items()
+            if isinstance(result, dict) and result.get("success") is False and "error" in result
+        }
+        return self._build_response(query, list(results), results, errors)
+    
     def _generate_summary(
         self,
         query: str,
@@ -211,49 +418,11 @@ class CoordinatorAgent:
     
     def _combine_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
         """Combine results from multiple agents into unified structure."""
-        combined = {
-            "devices": [],
-            "telemetry": [],
-            "config_issues": [],
-            "tickets": []
-        }
-        
-        # Extract devices from inventory
-        if "inventory" in results:
-            inv_result = results["inventory"]
-            if isinstance(inv_result, dict) and "data" in inv_result:
-                devices = inv_result["data"]
-                if isinstance(devices, list):
-                    combined["devices"] = devices
-                elif isinstance(devices, dict) and "devices" in devices:
-                    combined["devices"] = devices["devices"]
-        
-        # Extract telemetry data
-        if "telemetry" in results:
-            tel_result = results["telemetry"]
-            if isinstance(tel_result, dict) and "data" in tel_result:
-                telemetry = tel_result["data"]
-                if isinstance(telemetry, list):
-                    combined["telemetry"] = telemetry
-                elif isinstance(telemetry, dict):
-                    combined["telemetry"] = [telemetry]
-        
-        # Extract config issues
-        if "config" in results:
-            config_result = results["config"]
-            if isinstance(config_result, dict) and "data" in config_result:
-                issues = config_result["data"]
-                if isinstance(issues, list):
-                    combined["config_issues"] = issues
-        
-        # Extract tickets
-        if "ticketing" in results:
-            ticket_result = results["ticketing"]
-            if isinstance(ticket_result, dict) and "data" in ticket_result:
-                tickets = ticket_result["data"]
-                if isinstance(tickets, list):
-                    combined["tickets"] = tickets
-        
+        combined = {key: [] for key in _COMBINED_KEYS}
+        for agent_name, (key, extract) in _EXTRACTORS.items():
+            result = results.get(agent_name)
+            if result is not None:
+                combined[key] = extract(result) or []
         return combined
 
 
@@ -3,13 +3,26 @@
 This module provides tools for integrating with Telnet-based device CLIs
 and NetBox (source of truth) for topology and inventory management.
 """
+import asyncio
+import atexit
+import copy
 import json
+import re
+import sys
+import threading
 import time
 import os
+import numpy as np
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import Any, Dict, Iterator, Optional, List, Tuple
+from utils.credentials import credential_digest
 from utils.logger import setup_logger
+from utils.netbox_session import NETBOX_TIMEOUT, get_netbox_session
 
 # Handle telnetlib import - deprecated and removed in Python 3.12+
 try:
@@ -20,6 +33,21 @@ except ImportError:
     TELNETLIB_AVAILABLE = False
     telnetlib = None  # Set to None so code doesn't break
 
+# Prefer orjson (C parser) for NetBox payloads when installed; stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Optional asyncio Telnet client used by the async/batched status functions
+try:
+    import telnetlib3
+    TELNETLIB3_AVAILABLE = True
+except ImportError:
+    TELNETLIB3_AVAILABLE = False
+    telnetlib3 = None
+
 logger = setup_logger(__name__)
 
 # Log warning after logger is available
@@ -37,6 +65,540 @@ except ImportError:
     logger.debug("python-dotenv not installed, skipping .env file loading")
 
 
+@dataclass(frozen=True)
+class _EnvConfig:
+    """Report defaults read from the environment (and .env) once at import."""
+    netbox_url: str
+    netbox_token: str
+    telnet_host: str
+    telnet_username: str
+    telnet_password: str
+
+
+_ENV = _EnvConfig(
+    netbox_url=os.getenv("NETBOX_URL", "https://demo.netbox.dev/api/"),
+    netbox_token=os.getenv("NETBOX_TOKEN", ""),
+    telnet_host=os.getenv("TELNET_HOST", ""),
+    telnet_username=os.getenv("TELNET_USERNAME", ""),
+    telnet_password=os.getenv("TELNET_PASSWORD", "")
+)
+
+# Telnet prompts matched with Telnet.expect() (and telnetlib3's
+# readuntil_pattern on the async path), so reads return as soon as the device
+# is ready instead of after a fixed sleep. CLI prompts end in "#" (privileged),
+# ">" (user) or "$" (Linux shell, e.g. SONiC).
+_LOGIN_PROMPT_RE = re.compile(rb'(?:login|Username):\s*$')
+_PASSWORD_PROMPT_RE = re.compile(rb'Password:\s*$')
+_CLI_PROMPT_RE = re.compile(rb'(?:^|[\r\n])[^\r\n]*[#>$]\s*$')
+# Any output line ending in a prompt character, including its newline
+_PROMPT_LINE_RE = re.compile(rb'^[^\n]*[#>$][ \t\r\f\v]*(?:\n|\Z)', re.MULTILINE)
+
+# Logged-in Telnet sessions reused across commands, keyed by (host, username,
+# password digest) so a session is only reused with the password it logged in
+# with. A session is taken out of the pool while a command runs on it.
+TELNET_POOL_MAXSIZE = 32
+TELNET_KEEPALIVE_INTERVAL = 8.0
+_telnet_pool: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+_telnet_pool_lock = threading.Lock()
+_telnet_keepalive_stop = threading.Event()
+_telnet_keepalive_thread: Optional[threading.Thread] = None
+
+# Keep-alive NetBox session with retries, shared with the inventory agent
+_netbox_session = get_netbox_session()
+
+
+# Live topology results cached per (base_url, token) for _TOPOLOGY_TTL seconds.
+# Each entry is (timestamp, result, state); state holds devices/links keyed by
+# NetBox id plus the last_updated watermark used for delta refreshes.
+_TOPOLOGY_TTL = 30.0
+_TOPOLOGY_CACHE: Dict[Tuple[str, str], Tuple[float, dict, dict]] = {}
+_topology_cache_lock = threading.Lock()
+
+
+def invalidate_topology_cache(base_url: Optional[str] = None) -> None:
+    """
+    Drop cached NetBox topology results.
+    
+    Args:
+        base_url: Only drop entries for this NetBox URL (default: drop all),
+            e.g. from a NetBox change webhook
+    """
+    with _topology_cache_lock:
+        if base_url is None:
+            _TOPOLOGY_CACHE.clear()
+            return
+        base_url = _netbox_root(base_url)
+        for key in [k for k in _TOPOLOGY_CACHE if k[0] == base_url]:
+            del _TOPOLOGY_CACHE[key]
+
+
+def _netbox_root(url: str) -> str:
+    """Normalize a NetBox URL to its root: no trailing slashes and no /api suffix."""
+    root = url.rstrip('/')
+    if root.endswith('/api'):
+        root = root[:-len('/api')].rstrip('/')
+    return root
+
+
+# Sample topology used when no NetBox token is configured
+_SAMPLE_TOPOLOGY_PATH = Path(__file__).resolve().parent.parent / "data" / "netbox_sample.json"
+
+
+@lru_cache(maxsize=1)
+def _sample_topology_bytes() -> Optional[bytes]:
+    """Read the sample topology file once; None if it doesn't exist."""
+    try:
+        return _SAMPLE_TOPOLOGY_PATH.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+# Last ETag and decoded body per NetBox GET (url, params, token) for revalidation
+NETBOX_ETAG_CACHE_SIZE = 256
+_etag_cache: "OrderedDict[tuple, Tuple[str, dict]]" = OrderedDict()
+_etag_cache_lock = threading.Lock()
+
+# Page size requested from NetBox list endpoints (NetBox caps this at MAX_PAGE_SIZE)
+NETBOX_PAGE_SIZE = 1000
+
+
+def _loads_json(content: bytes):
+    """Decode a JSON document from raw bytes."""
+    return orjson.loads(content) if ORJSON_AVAILABLE else json.loads(content)
+
+
+def _netbox_get(url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> dict:
+    """
+    GET a NetBox endpoint on the shared session and return the decoded JSON.
+    
+    When the server sent an ETag for the same request before, it is revalidated
+    with If-None-Match and a 304 reuses the previously decoded body, so callers
+    must treat the returned data as read-only.
+    """
+    key = (url, tuple(sorted(params.items())) if params else (), headers.get("Authorization"))
+    with _etag_cache_lock:
+        cached = _etag_cache.get(key)
+    
+    request_headers = headers if cached is None else {**headers, "If-None-Match": cached[0]}
+    response = _netbox_session.get(url, headers=request_headers, params=params, timeout=NETBOX_TIMEOUT)
+    if response.status_code == 304 and cached is not None:
+        with _etag_cache_lock:
+            if key in _etag_cache:
+                _etag_cache.move_to_end(key)
+        return cached[1]
+    
+    response.raise_for_status()
+    data = _loads_json(response.content)
+    
+    etag = response.headers.get("ETag")
+    if etag:
+        with _etag_cache_lock:
+            _etag_cache[key] = (etag, data)
+            _etag_cache.move_to_end(key)
+            while len(_etag_cache) > NETBOX_ETAG_CACHE_SIZE:
+                _etag_cache.popitem(last=False)
+    return data
+
+
+def _iter_netbox_pages(url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> Iterator[List[dict]]:
+    """
+    Yield the records of a paginated NetBox list endpoint one page at a time.
+    
+    Follows the "next" link page by page, so records can be processed as each
+    page arrives instead of relying on a single oversized request.
+    """
+    page_params = {"limit": NETBOX_PAGE_SIZE}
+    if params:
+        page_params.update(params)
+    
+    data = _netbox_get(url, headers, page_params)
+    while True:
+        yield data.get("results", [])
+        next_url = data.get("next")
+        if not next_url:
+            break
+        # The next link already carries limit/offset and filters
+        data = _netbox_get(next_url, headers)
+
+
+def _iter_netbox(url: str, headers: Dict[str, str], params: Optional[Dict] = None) -> Iterator[dict]:
+    """Yield every record of a paginated NetBox list endpoint."""
+    for page in _iter_netbox_pages(url, headers, params):
+        yield from page
+
+
+def _netbox_count(url: str, headers: Dict[str, str]) -> int:
+    """Return the total record count of a NetBox list endpoint with a single 1-item request."""
+    data = _netbox_get(url, headers, {"limit": 1})
+    return data.get("count", len(data.get("results", [])))
+
+
+def _lookup(record: dict, *keys):
+    """Null-safe nested lookup: None as soon as a step is missing or not a dict."""
+    for key in keys:
+        if not isinstance(record, dict):
+            return None
+        record = record.get(key)
+    return record
+
+
+def _intern(value):
+    """Intern repeated categorical strings (site, role, status, ...) so records share one copy."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _topology_device(device: dict) -> dict:
+    """
+    Map a NetBox device record to the topology device format.
+    
+    Role and primary IP are read the same way as _graphql_device, so delta
+    refreshes over REST don't mix field dialects into a GraphQL-built cache:
+    role falls back to device_role (NetBox < 4.0), and the primary IP prefers
+    the IPv4 address over the device's primary IP.
+    """
+    _get = dict.get
+    device_type = _get(device, "device_type") or {}
+    role = _get(device, "role") or _get(device, "device_role") or {}
+    primary_ip = _get(device, "primary_ip4") or _get(device, "primary_ip") or {}
+    return {
+        "id": _get(device, "id"),
+        "name": _get(device, "name"),
+        "device_type": _intern(_get(device_type, "model")),
+        "manufacturer": _intern(_get(_get(device_type, "manufacturer") or {}, "name")),
+        "site": _intern(_get(_get(device, "site") or {}, "name")),
+        "status": _intern(_get(_get(device, "status") or {}, "value")),
+        "role": _intern(_get(role, "name")),
+        "primary_ip": _get(primary_ip, "address")
+    }
+
+
+def _topology_link(cable: dict) -> Optional[dict]:
+    """
+    Map a NetBox cable record to a topology link, or None if it lacks two terminations.
+    
+    NetBox >= 3.3 lists each end under a_terminations/b_terminations with the
+    interface as the termination "object", the same shape _graphql_link reads;
+    the older single "terminations" list is still accepted.
+    """
+    _get = dict.get
+    a_terms = _get(cable, "a_terminations")
+    b_terms = _get(cable, "b_terminations")
+    if a_terms and b_terms:
+        term_a = _get(a_terms[0] or {}, "object") or {}
+        term_b = _get(b_terms[0] or {}, "object") or {}
+        source_interface, target_interface = _get(term_a, "name"), _get(term_b, "name")
+    else:
+        terminations = _get(cable, "terminations") or ()
+        if len(terminations) < 2:
+            return None
+        term_a, term_b = terminations[0], terminations[1]
+        if not (term_a and term_b):
+            return None
+        source_interface = _get(_get(term_a, "interface") or {}, "name")
+        target_interface = _get(_get(term_b, "interface") or {}, "name")
+    
+    return {
+        "id": _get(cable, "id"),
+        "source_device": _get(_get(term_a, "device") or {}, "name"),
+        "source_interface": source_interface,
+        "target_device": _get(_get(term_b, "device") or {}, "name"),
+        "target_interface": target_interface,
+        "status": _intern(_get(_get(cable, "status") or {}, "value")),
+        "type": _intern(_get(_get(cable, "type") or {}, "value"))
+    }
+
+
+# Single GraphQL query selecting only the fields the topology needs
+_TOPOLOGY_GRAPHQL_QUERY = """
+query Topology {
+  device_list {
+    id
+    last_updated
+    name
+    device_type { model manufacturer { name } }
+    site { name }
+    status
+    role { name }
+    primary_ip4 { address }
+    primary_ip6 { address }
+  }
+  cable_list {
+    id
+    last_updated
+    status
+    type
+    a_terminations { ... on InterfaceType { name device { name } } }
+    b_terminations { ... on InterfaceType { name device { name } } }
+  }
+}
+"""
+
+
+def _graphql_fetch(base_url: str, headers: Dict[str, str], query: str) -> dict:
+    """POST a query to the NetBox GraphQL API and return its "data" payload."""
+    response = _netbox_session.post(
+        f"{base_url}/graphql/", headers=headers, json={"query": query}, timeout=NETBOX_TIMEOUT
+    )
+    response.raise_for_status()
+    payload = _loads_json(response.content)
+    if payload.get("errors"):
+        raise ValueError(f"GraphQL errors: {payload['errors']}")
+    return payload["data"]
+
+
+def _graphql_id(value):
+    """GraphQL returns IDs as strings; use ints like the REST API when possible."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def _graphql_enum(value: Optional[str]) -> Optional[str]:
+    """GraphQL returns choice fields as upper-case enum names; REST uses lower-case values."""
+    return sys.intern(value.lower()) if isinstance(value, str) else value
+
+
+def _newer_timestamp(current: Optional[str], value: Optional[str]) -> Optional[str]:
+    """Return the later of two NetBox last_updated timestamps (ISO strings compare in order)."""
+    if value and (current is None or value > current):
+        return value
+    return current
+
+
+def _latest_update(records: List[dict]) -> Optional[str]:
+    """Return the newest last_updated timestamp among records, or None."""
+    return max((record.get("last_updated") or "" for record in records), default=None) or None
+
+
+def _graphql_device(device: dict) -> dict:
+    """Map a GraphQL device node to the topology device format."""
+    device_type = device.get("device_type") or {}
+    return {
+        "id": _graphql_id(device.get("id")),
+        "name": device.get("name"),
+        "device_type": _intern(device_type.get("model")),
+        "manufacturer": _intern((device_type.get("manufacturer") or {}).get("name")),
+        "site": _intern((device.get("site") or {}).get("name")),
+        "status": _graphql_enum(device.get("status")),
+        "role": _intern((device.get("role") or {}).get("name")),
+        "primary_ip": (device.get("primary_ip4") or device.get("primary_ip6") or {}).get("address")
+    }
+
+
+def _graphql_link(cable: dict) -> Optional[dict]:
+    """Map a GraphQL cable node to a topology link, or None if it lacks two terminations."""
+    if not ((a_terms := cable.get("a_terminations")) and (b_terms := cable.get("b_terminations"))):
+        return None
+    term_a, term_b = a_terms[0], b_terms[0]
+    return {
+        "id": _graphql_id(cable.get("id")),
+        "source_device": (term_a.get("device") or {}).get("name"),
+        "source_interface": term_a.get("name"),
+        "target_device": (term_b.get("device") or {}).get("name"),
+        "target_interface": term_b.get("name"),
+        "status": _graphql_enum(cable.get("status")),
+        "type": _graphql_enum(cable.get("type"))
+    }
+
+
+def _fetch_topology_graphql(base_url: str, headers: Dict[str, str]) -> dict:
+    """Fetch devices and links with one GraphQL round-trip, and the interface count over REST."""
+    # Only the interface count is needed, so ask REST for it (limit=1) while
+    # GraphQL runs instead of selecting every interface record
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        interfaces_future = executor.submit(_netbox_count, f"{base_url}/api/dcim/interfaces/", headers)
+        data = _graphql_fetch(base_url, headers, _TOPOLOGY_GRAPHQL_QUERY)
+        total_interfaces = interfaces_future.result()
+    device_nodes, cable_nodes = data["device_list"], data["cable_list"]
+    
+    # Cables without both terminations are kept as None so the cable count
+    # stays comparable with NetBox's on delta refreshes
+    return {
+        "devices": {device["id"]: device for device in map(_graphql_device, device_nodes)},
+        "links": {_graphql_id(cable.get("id")): _graphql_link(cable) for cable in cable_nodes},
+        "interfaces": total_interfaces,
+        "watermark": _newer_timestamp(_latest_update(device_nodes), _latest_update(cable_nodes))
+    }
+
+
+def _fetch_topology_rest(base_url: str, headers: Dict[str, str]) -> dict:
+    """Fetch devices, interface count and links from the REST API concurrently."""
+    # Page through devices and cables; only the interface count is needed
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        devices_future = executor.submit(_collect_devices, f"{base_url}/api/dcim/devices/", headers)
+        interfaces_future = executor.submit(_netbox_count, f"{base_url}/api/dcim/interfaces/", headers)
+        links_future = executor.submit(_collect_links, f"{base_url}/api/dcim/cables/", headers)
+        # result() re-raises the first failure (e.g. HTTPError) to the caller
+        devices, devices_watermark = devices_future.result()
+        links, links_watermark = links_future.result()
+        return {
+            "devices": devices,
+            "links": links,
+            "interfaces": interfaces_future.result(),
+            "watermark": _newer_timestamp(devices_watermark, links_watermark)
+        }
+
+
+def _refresh_topology_rest(base_url: str, headers: Dict[str, str], state: dict) -> Optional[dict]:
+    """
+    Update a cached topology state with only the records changed since its watermark.
+    
+    Devices and cables are pulled with last_updated__gte and merged over the
+    cached records. Deletions don't show up in a delta, so the merged sizes are
+    checked against NetBox's counts; None is returned when they disagree and a
+    full fetch is needed.
+    """
+    devices_url = f"{base_url}/api/dcim/devices/"
+    cables_url = f"{base_url}/api/dcim/cables/"
+    params = {"last_updated__gte": state["watermark"]}
+    
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        devices_future = executor.submit(_collect_devices, devices_url, headers, params)
+        links_future = executor.submit(_collect_links, cables_url, headers, params)
+        device_count_future = executor.submit(_netbox_count, devices_url, headers)
+        cable_count_future = executor.submit(_netbox_count, cables_url, headers)
+        interfaces_future = executor.submit(_netbox_count, f"{base_url}/api/dcim/interfaces/", headers)
+        
+        changed_devices, devices_watermark = devices_future.result()
+        changed_links, links_watermark = links_future.result()
+        device_count = device_count_future.result()
+        cable_count = cable_count_future.result()
+        total_interfaces = interfaces_future.result()
+    
+    devices = {**state["devices"], **changed_devices}
+    links = dict(state["links"])
+    for cable_id, link in changed_links.items():
+        # Never let an unmappable record replace a link that is already known
+        if link is not None or links.get(cable_id) is None:
+            links[cable_id] = link
+    if len(devices) != device_count or len(links) != cable_count:
+        return None
+    
+    logger.debug("NetBox delta refresh: %d changed devices, %d changed cables",
+                 len(changed_devices), len(changed_links))
+    watermark = _newer_timestamp(state["watermark"], _newer_timestamp(devices_watermark, links_watermark))
+    return {"devices": devices, "links": links, "interfaces": total_interfaces, "watermark": watermark}
+
+
+def _collect_devices(url: str, headers: Dict[str, str], params: Optional[Dict] = None):
+    """Fetch NetBox devices keyed by id, plus their newest last_updated timestamp."""
+    devices = {}
+    watermark = None
+    for page in _iter_netbox_pages(url, headers, params):
+        devices.update({device.get("id"): _topology_device(device) for device in page})
+        watermark = _newer_timestamp(watermark, _latest_update(page))
+    return devices, watermark
+
+
+def _collect_links(url: str, headers: Dict[str, str], params: Optional[Dict] = None):
+    """
+    Fetch NetBox cables keyed by id, plus their newest last_updated timestamp.
+    
+    Cables without both terminations map to None rather than being dropped.
+    """
+    links = {}
+    watermark = None
+    for page in _iter_netbox_pages(url, headers, params):
+        links.update({cable.get("id"): _topology_link(cable) for cable in page})
+        watermark = _newer_timestamp(watermark, _latest_update(page))
+    return links, watermark
+
+
+def _telnet_login(host: str, username: str, password: str):
+    """Open a Telnet session and log in, returning once the CLI prompt is shown."""
+    logger.debug(f"Attempting Telnet connection to {host}")
+    tn = telnetlib.Telnet(host, timeout=10)
+    try:
+        # Wait for login prompt and send credentials
+        if username:
+            tn.expect([_LOGIN_PROMPT_RE], timeout=5)
+            tn.write(username.encode('ascii') + b"\n")
+        
+        if password:
+            tn.expect([_PASSWORD_PROMPT_RE], timeout=5)
+            tn.write(password.encode('ascii') + b"\n")
+        
+        # Wait for command prompt (user ">", privileged "#" or shell "$")
+        tn.expect([_CLI_PROMPT_RE], timeout=5)
+    except Exception:
+        tn.close()
+        raise
+    return tn
+
+
+def _take_telnet_session(host: str, username: str, password: str):
+    """Remove and return the pooled session for these credentials, if any."""
+    key = (host, username, credential_digest(password))
+    with _telnet_pool_lock:
+        return _telnet_pool.pop(key, None)
+
+
+def _return_telnet_session(host: str, username: str, password: str, tn) -> None:
+    """Put a session back in the pool, closing whatever no longer fits."""
+    global _telnet_keepalive_thread
+    key = (host, username, credential_digest(password))
+    evicted = []
+    with _telnet_pool_lock:
+        existing = _telnet_pool.pop(key, None)
+        if existing is not None:
+            evicted.append(existing)
+        _telnet_pool[key] = tn
+        while len(_telnet_pool) > TELNET_POOL_MAXSIZE:
+            evicted.append(_telnet_pool.popitem(last=False)[1])
+        if _telnet_keepalive_thread is None:
+            _telnet_keepalive_thread = threading.Thread(
+                target=_telnet_keepalive_loop, name="telnet-keepalive", daemon=True
+            )
+            _telnet_keepalive_thread.start()
+    for old_tn in evicted:
+        old_tn.close()
+
+
+def _telnet_keepalive_loop() -> None:
+    """Send IAC NOP on idle pooled sessions so devices don't time them out."""
+    while not _telnet_keepalive_stop.wait(TELNET_KEEPALIVE_INTERVAL):
+        with _telnet_pool_lock:
+            sessions = list(_telnet_pool.items())
+        for key, tn in sessions:
+            try:
+                tn.get_socket().sendall(telnetlib.IAC + telnetlib.NOP)
+            except OSError:
+                # Only close sessions still idle in the pool; one checked out
+                # meanwhile belongs to the request thread using it
+                with _telnet_pool_lock:
+                    if _telnet_pool.get(key) is not tn:
+                        continue
+                    del _telnet_pool[key]
+                tn.close()
+
+
+def close_telnet_pool() -> None:
+    """Close every pooled Telnet session."""
+    _telnet_keepalive_stop.set()
+    with _telnet_pool_lock:
+        sessions = list(_telnet_pool.values())
+        _telnet_pool.clear()
+    for tn in sessions:
+        try:
+            tn.close()
+        except Exception as e:
+            logger.debug("Error closing pooled Telnet session: %s", e)
+
+
+atexit.register(close_telnet_pool)
+
+
+def _run_telnet_command(tn, command: str) -> bytes:
+    """Send a command on a logged-in session and read up to the next prompt."""
+    logger.debug(f"Executing command: {command}")
+    tn.write(command.encode('ascii') + b"\n")
+    
+    # Read output up to the next prompt (whatever arrived if it times out)
+    _, _, output = tn.expect([_CLI_PROMPT_RE], timeout=10)
+    return output
+
+
 def get_device_status_from_telnet(
     host: str,
     username: str,
@@ -49,6 +611,9 @@ def get_device_status_from_telnet(
     This tool connects to SONiC, EdgeCore, Celtica DS4000, NVIDIA SN2700,
     or other network devices via Telnet and executes CLI commands.
     
+    Logged-in sessions are kept in a small pool per (host, username), so
+    repeated commands to the same device skip the connect and login steps.
+    
     Note: telnetlib was removed in Python 3.12+. For Python 3.12+, install
     telnetlib3: pip install telnetlib3
     
@@ -102,50 +667,28 @@ def get_device_status_from_telnet(
         return result
     
     try:
-        # Establish Telnet connection
-        logger.debug(f"Attempting Telnet connection to {host}")
-        tn = telnetlib.Telnet(host, timeout=10)
-        
-        # Wait for login prompt and send credentials
-        if username:
-            tn.read_until(b"login: ", timeout=5)
-            tn.write(username.encode('ascii') + b"\n")
-        
-        if password:
-            tn.read_until(b"Password: ", timeout=5)
-            tn.write(password.encode('ascii') + b"\n")
-        
-        # Wait for command prompt (common patterns)
-        time.sleep(1)
-        tn.read_until(b">", timeout=5)
-        tn.read_until(b"#", timeout=5)
-        
-        # Execute command
-        logger.debug(f"Executing command: {command}")
-        tn.write(command.encode('ascii') + b"\n")
-        
-        # Read output
-        time.sleep(2)
-        output = tn.read_until(b"#", timeout=10).decode('ascii', errors='ignore')
-        
-        # Clean up output (remove command echo and prompt)
-        lines = output.split('\n')
-        # Remove command echo and prompt lines
-        cleaned_lines = []
-        skip_next = False
-        for i, line in enumerate(lines):
-            if skip_next:
-                skip_next = False
-                continue
-            if command in line and i == 0:
-                continue  # Skip command echo
-            if line.strip().endswith('#') or line.strip().endswith('>'):
-                continue  # Skip prompt
-            cleaned_lines.append(line)
+        # Reuse a logged-in session for this device when one is pooled
+        output = None
+        tn = _take_telnet_session(host, username, password)
+        if tn is not None:
+            try:
+                tn.read_very_eager()  # discard anything sent while idle
+                output = _run_telnet_command(tn, command)
+            except (EOFError, OSError):
+                # Device closed the idle session; log in again below
+                logger.debug(f"Pooled Telnet session to {host} went stale, reconnecting")
+                tn.close()
         
-        output_clean = '\n'.join(cleaned_lines).strip()
+        if output is None:
+            tn = _telnet_login(host, username, password)
+            try:
+                output = _run_telnet_command(tn, command)
+            except Exception:
+                tn.close()
+                raise
         
-        tn.close()
+        _return_telnet_session(host, username, password, tn)
+        output_clean = _clean_telnet_output(output, command)
         
         result["success"] = True
         result["output"] = output_clean
@@ -165,12 +708,148 @@ def get_device_status_from_telnet(
     return result
 
 
+def _clean_telnet_output(raw: bytes, command: str) -> str:
+    """Remove the command echo and prompt lines from raw Telnet output."""
+    # Skip the command echo on the first line
+    first_line, _, rest = raw.partition(b"\n")
+    if command.encode('ascii', errors='ignore') in first_line:
+        raw = rest
+    # Strip prompt lines in one pass, decoding only what is left
+    return _PROMPT_LINE_RE.sub(b"", raw).decode('ascii', errors='ignore').strip()
+
+
+async def _telnet_session_async(host: str, username: str, password: str, command: str) -> bytes:
+    """Log in and run one command with telnetlib3, awaiting each prompt instead of sleeping."""
+    reader, writer = await asyncio.wait_for(
+        telnetlib3.open_connection(host, 23, encoding=False, connect_minwait=0.1), timeout=10
+    )
+    try:
+        # Same prompt patterns as the telnetlib path (_telnet_login)
+        if username:
+            await asyncio.wait_for(reader.readuntil_pattern(_LOGIN_PROMPT_RE), timeout=5)
+            writer.write(username.encode('ascii') + b"\n")
+        
+        if password:
+            await asyncio.wait_for(reader.readuntil_pattern(_PASSWORD_PROMPT_RE), timeout=5)
+            writer.write(password.encode('ascii') + b"\n")
+        
+        # Wait for the command prompt before sending the command
+        await asyncio.wait_for(reader.readuntil_pattern(_CLI_PROMPT_RE), timeout=5)
+        
+        logger.debug("Executing command: %s", command)
+        writer.write(command.encode('ascii') + b"\n")
+        return await asyncio.wait_for(reader.readuntil_pattern(_CLI_PROMPT_RE), timeout=10)
+    finally:
+        writer.close()
+
+
+async def get_device_status_from_telnet_async(
+    host: str,
+    username: str,
+    password: str,
+    command: str
+) -> dict:
+    """
+    Async variant of get_device_status_from_telnet.
+    
+    Uses telnetlib3 when installed so many sessions share one event loop;
+    otherwise runs the telnetlib implementation on a worker thread.
+    
+    Returns:
+        Same dictionary as get_device_status_from_telnet
+    """
+    if not TELNETLIB3_AVAILABLE:
+        return await asyncio.to_thread(get_device_status_from_telnet, host, username, password, command)
+    
+    logger.info("Connecting to device via Telnet (async): %s, command: %s", host, command)
+    
+    result = {
+        "success": False,
+        "host": host,
+        "command": command,
+        "output": "",
+        "error": None
+    }
+    
+    if not host or not isinstance(host, str):
+        result["error"] = "Invalid host parameter"
+        logger.error("Invalid host parameter provided")
+        return result
+    
+    if not command or not isinstance(command, str):
+        result["error"] = "Invalid command parameter"
+        logger.error("Invalid command parameter provided")
+        return result
+    
+    try:
+        output = await _telnet_session_async(host, username, password, command)
+        result["success"] = True
+        result["output"] = _clean_telnet_output(output, command)
+        logger.info("Successfully executed command on %s", host)
+    except asyncio.TimeoutError:
+        result["error"] = "Connection timeout"
+        logger.error("Telnet connection timeout to %s", host)
+    except ConnectionRefusedError:
+        result["error"] = "Connection refused - device may be unreachable or Telnet disabled"
+        logger.error("Connection refused to %s", host)
+    except Exception as e:
+        result["error"] = f"Telnet error: {str(e)}"
+        logger.error("Error executing Telnet command on %s: %s", host, e)
+    
+    return result
+
+
+async def get_many_device_status_async(
+    hosts: List[str],
+    username: str,
+    password: str,
+    command: str,
+    max_concurrency: int = 32
+) -> List[dict]:
+    """Run a Telnet command on many devices concurrently, returning results in host order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def _status(host: str) -> dict:
+        async with semaphore:
+            return await get_device_status_from_telnet_async(host, username, password, command)
+    
+    return await asyncio.gather(*(_status(host) for host in hosts))
+
+
+def get_many_device_status(
+    hosts: List[str],
+    username: str,
+    password: str,
+    command: str,
+    max_concurrency: int = 32
+) -> List[dict]:
+    """
+    Run a Telnet command on many devices concurrently.
+    
+    Device sessions overlap, so a sweep takes roughly as long as the slowest
+    device rather than the sum of all of them. Call get_many_device_status_async
+    instead from code that already runs an event loop.
+    
+    Args:
+        hosts: Device hostnames or IP addresses
+        username: Telnet username
+        password: Telnet password
+        command: CLI command to execute on every device
+        max_concurrency: Maximum number of simultaneous sessions (default: 32)
+        
+    Returns:
+        List of get_device_status_from_telnet result dictionaries, in host order
+    """
+    return asyncio.run(get_many_device_status_async(hosts, username, password, command, max_concurrency))
+
+
 def get_topology_from_netbox(base_url: str, token: str) -> dict:
     """
     Fetch network topology from NetBox (source of truth).
     
-    This tool connects to NetBox's REST API to retrieve devices, interfaces,
-    and links, building a graph representation of the network topology.
+    This tool connects to NetBox's GraphQL API (falling back to the REST API)
+    to retrieve devices, interfaces, and links, building a graph
+    representation of the network topology.
     
     Maps to Aviz NCP functionality:
     - Retrieves device inventory from NetBox (source of truth)
@@ -217,13 +896,17 @@ def get_topology_from_netbox(base_url: str, token: str) -> dict:
         use_sample_data = True
     
     if use_sample_data:
-        # Try to load sample NetBox data from local file
-        sample_data_path = Path(__file__).parent.parent / "data" / "netbox_sample.json"
-        if sample_data_path.exists():
-            logger.info(f"Loading sample NetBox data from {sample_data_path}")
+        # Try to load sample NetBox data from local file (read once, then cached)
+        try:
+            sample_bytes = _sample_topology_bytes()
+        except OSError as e:
+            logger.warning(f"Failed to load sample data: {e}")
+            result["error"] = f"No NetBox token provided and sample data unavailable: {str(e)}"
+            return result
+        if sample_bytes is not None:
+            logger.info(f"Loading sample NetBox data from {_SAMPLE_TOPOLOGY_PATH}")
             try:
-                with open(sample_data_path, 'r') as f:
-                    sample_data = json.load(f)
+                sample_data = _loads_json(sample_bytes)
                 result["success"] = True
                 result["devices"] = sample_data.get("devices", [])
                 result["links"] = sample_data.get("links", [])
@@ -244,8 +927,15 @@ def get_topology_from_netbox(base_url: str, token: str) -> dict:
             logger.error("No token and sample data file missing")
             return result
     
-    # Clean up base_url (remove trailing slash)
-    base_url = base_url.rstrip('/')
+    # Clean up base_url (remove trailing slashes and any /api suffix)
+    base_url = _netbox_root(base_url)
+    
+    cache_key = (base_url, token)
+    with _topology_cache_lock:
+        cached = _TOPOLOGY_CACHE.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < _TOPOLOGY_TTL:
+        logger.debug("Returning cached NetBox topology for %s", base_url)
+        return copy.deepcopy(cached[1])
     
     headers = {
         "Authorization": f"Token {token}",
@@ -254,73 +944,43 @@ def get_topology_from_netbox(base_url: str, token: str) -> dict:
     }
     
     try:
-        # Fetch devices
-        logger.debug("Fetching devices from NetBox")
-        devices_url = f"{base_url}/api/dcim/devices/"
-        devices_response = requests.get(devices_url, headers=headers, timeout=10)
-        devices_response.raise_for_status()
-        devices_data = devices_response.json()
-        
-        devices_list = []
-        for device in devices_data.get("results", []):
-            device_info = {
-                "id": device.get("id"),
-                "name": device.get("name"),
-                "device_type": device.get("device_type", {}).get("model"),
-                "manufacturer": device.get("device_type", {}).get("manufacturer", {}).get("name"),
-                "site": device.get("site", {}).get("name"),
-                "status": device.get("status", {}).get("value"),
-                "role": device.get("device_role", {}).get("name"),
-                "primary_ip": device.get("primary_ip", {}).get("address") if device.get("primary_ip") else None
-            }
-            devices_list.append(device_info)
-        
-        # Fetch interfaces for each device
-        logger.debug("Fetching interfaces from NetBox")
-        interfaces_url = f"{base_url}/api/dcim/interfaces/"
-        interfaces_response = requests.get(interfaces_url, headers=headers, timeout=10, params={"limit": 1000})
-        interfaces_response.raise_for_status()
-        interfaces_data = interfaces_response.json()
-        
-        # Fetch cables/links
-        logger.debug("Fetching cables/links from NetBox")
-        cables_url = f"{base_url}/api/dcim/cables/"
-        cables_response = requests.get(cables_url, headers=headers, timeout=10)
-        cables_response.raise_for_status()
-        cables_data = cables_response.json()
+        # An expired entry with a watermark only needs the records changed since
+        state = None
+        if cached is not None and cached[2].get("watermark"):
+            try:
+                state = _refresh_topology_rest(base_url, headers, cached[2])
+            except Exception as e:
+                logger.debug("NetBox delta refresh failed (%s), doing a full fetch", e)
         
-        # Build links from cables
-        links_list = []
-        for cable in cables_data.get("results", []):
-            term_a = cable.get("terminations", [{}])[0] if cable.get("terminations") else {}
-            term_b = cable.get("terminations", [{}])[1] if len(cable.get("terminations", [])) > 1 else {}
-            
-            if term_a and term_b:
-                link = {
-                    "id": cable.get("id"),
-                    "source_device": term_a.get("device", {}).get("name") if isinstance(term_a.get("device"), dict) else None,
-                    "source_interface": term_a.get("interface", {}).get("name") if isinstance(term_a.get("interface"), dict) else None,
-                    "target_device": term_b.get("device", {}).get("name") if isinstance(term_b.get("device"), dict) else None,
-                    "target_interface": term_b.get("interface", {}).get("name") if isinstance(term_b.get("interface"), dict) else None,
-                    "status": cable.get("status", {}).get("value"),
-                    "type": cable.get("type", {}).get("value")
-                }
-                links_list.append(link)
+        # GraphQL pulls only the needed fields in one round-trip; fall back
+        # to REST on servers without GraphQL or with a different schema
+        if state is None:
+            try:
+                logger.debug("Fetching topology from NetBox GraphQL API")
+                state = _fetch_topology_graphql(base_url, headers)
+            except Exception as e:
+                logger.debug("NetBox GraphQL fetch failed (%s), using REST API", e)
+                state = _fetch_topology_rest(base_url, headers)
         
-        # Calculate statistics
-        total_interfaces = len(interfaces_data.get("results", []))
+        devices_list = list(state["devices"].values())
+        links_list = [link for link in state["links"].values() if link is not None]
         
         result["success"] = True
         result["devices"] = devices_list
         result["links"] = links_list
         result["statistics"] = {
             "total_devices": len(devices_list),
-            "total_interfaces": total_interfaces,
+            "total_interfaces": state["interfaces"],
             "total_links": len(links_list)
         }
         
         logger.info(f"Successfully fetched topology: {len(devices_list)} devices, {len(links_list)} links")
         
+        # The cached result shares records with state; callers only ever get copies
+        with _topology_cache_lock:
+            _TOPOLOGY_CACHE[cache_key] = (time.monotonic(), result, state)
+        return copy.deepcopy(result)
+        
     except requests.exceptions.ConnectionError:
         result["error"] = "Connection error - NetBox server may be unreachable"
         logger.error(f"Connection error to NetBox: {base_url}")
@@ -342,6 +1002,69 @@ def get_topology_from_netbox(base_url: str, token: str) -> dict:
     return result
 
 
+async def get_topology_from_netbox_async(base_url: str, token: str) -> dict:
+    """
+    Async variant of get_topology_from_netbox for callers running an event loop.
+    
+    The fetch runs on a worker thread so the loop stays free while NetBox
+    responds; it shares the topology cache, GraphQL/REST fallback and the
+    pooled keep-alive session with the synchronous function.
+    """
+    return await asyncio.to_thread(get_topology_from_netbox, base_url, token)
+
+
+def get_topology_as_arrays(base_url: str, token: str) -> dict:
+    """
+    Fetch network topology from NetBox as parallel NumPy arrays.
+    
+    Struct-of-arrays form of get_topology_from_netbox for graph analysis:
+    devices can be filtered vectorized (e.g. device_status == "active") and
+    the src/dst edge arrays feed scipy.sparse / csgraph directly.
+    
+    Args:
+        base_url: NetBox base URL (e.g., "https://netbox.example.com")
+        token: NetBox API token for authentication
+        
+    Returns:
+        Dictionary containing:
+        - success: Boolean indicating if topology fetch succeeded
+        - device_ids: int32 NetBox device IDs (-1 where missing)
+        - device_names: Device names
+        - device_status: Device status values
+        - src: int32 positions in the device arrays of each link's source
+        - dst: int32 positions in the device arrays of each link's target
+          (links whose endpoints aren't both known devices are left out)
+        - error: Error message if fetch failed
+    """
+    topology = get_topology_from_netbox(base_url, token)
+    devices = topology.get("devices", [])
+    
+    names = [device.get("name") or "" for device in devices]
+    position = {name: i for i, name in enumerate(names) if name}
+    edges = np.array(
+        [
+            (position[link["source_device"]], position[link["target_device"]])
+            for link in topology.get("links", [])
+            if link.get("source_device") in position and link.get("target_device") in position
+        ],
+        dtype=np.int32
+    ).reshape(-1, 2)
+    
+    return {
+        "success": topology.get("success", False),
+        "device_ids": np.fromiter(
+            (-1 if device.get("id") is None else device["id"] for device in devices),
+            dtype=np.int32,
+            count=len(devices)
+        ),
+        "device_names": np.array(names, dtype=str),
+        "device_status": np.array([device.get("status") or "" for device in devices], dtype=str),
+        "src": edges[:, 0],
+        "dst": edges[:, 1],
+        "error": topology.get("error")
+    }
+
+
 def get_device_and_interface_report(
     netbox_url: Optional[str] = None,
     netbox_token: Optional[str] = None,
@@ -405,29 +1128,38 @@ def get_device_and_interface_report(
         "error": None
     }
     
-    # Load configuration from environment variables if not provided
-    if not netbox_url:
-        netbox_url = os.getenv("NETBOX_URL", "https://demo.netbox.dev/api/")
-    if not netbox_token:
-        netbox_token = os.getenv("NETBOX_TOKEN", "")
-    if not telnet_host:
-        telnet_host = os.getenv("TELNET_HOST", "")
-    if not telnet_username:
-        telnet_username = os.getenv("TELNET_USERNAME", "")
-    if not telnet_password:
-        telnet_password = os.getenv("TELNET_PASSWORD", "")
-    
-    # Step 1: Fetch devices from NetBox
+    # Fall back to the environment configuration for anything not provided
+    netbox_url = netbox_url or _ENV.netbox_url
+    netbox_token = netbox_token or _ENV.netbox_token
+    telnet_host = telnet_host or _ENV.telnet_host
+    telnet_username = telnet_username or _ENV.telnet_username
+    telnet_password = telnet_password or _ENV.telnet_password
+    
+    # NetBox and Telnet steps are independent, so run them side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        netbox_future = executor.submit(_report_netbox_devices, netbox_url, netbox_token)
+        telnet_future = executor.submit(
+            _report_telnet_output, telnet_host, telnet_username, telnet_password, telnet_command
+        )
+        steps = (netbox_future.result(), telnet_future.result())
+    
+    # Merge in step order so a Telnet error is reported over a NetBox one
+    for step in steps:
+        error = step.pop("error")
+        result.update(step)
+        if error:
+            result["error"] = error
+    
+    logger.info(f"Report generation complete: NetBox={result['NetBox_Status']}, Telnet={result['Telnet_Status']}")
+    return result
+
+
+def _report_netbox_devices(netbox_url: str, netbox_token: str) -> Dict:
+    """Report step 1: fetch the first NetBox devices (NetBox_Devices, NetBox_Status, error)."""
+    result = {"NetBox_Devices": [], "NetBox_Status": "Not Run", "error": None}
+    
     logger.info(f"Fetching devices from NetBox: {netbox_url}")
     try:
-        base_url = netbox_url.rstrip('/')
-        if not base_url.endswith('/api'):
-            # Ensure we have /api/ in the URL
-            if not base_url.endswith('/api/'):
-                base_url = f"{base_url.rstrip('/')}/api/"
-        else:
-            base_url = f"{base_url}/"
-        
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
@@ -437,22 +1169,19 @@ def get_device_and_interface_report(
         if netbox_token and netbox_token != "":
             headers["Authorization"] = f"Token {netbox_token}"
         
-        devices_url = f"{base_url}dcim/devices/"
+        devices_url = f"{_netbox_root(netbox_url)}/api/dcim/devices/"
         logger.debug(f"NetBox devices URL: {devices_url}")
         
-        devices_response = requests.get(devices_url, headers=headers, timeout=10)
-        devices_response.raise_for_status()
-        devices_data = devices_response.json()
-        
-        # Extract device names and roles
-        devices_list = []
-        for device in devices_data.get("results", [])[:10]:  # Limit to first 10 for demo
-            device_info = {
+        # Extract device names and roles from a single page of 10 (demo limit)
+        devices_page = _netbox_get(devices_url, headers, {"limit": 10})
+        devices_list = [
+            {
                 "name": device.get("name"),
-                "role": device.get("device_role", {}).get("name") if isinstance(device.get("device_role"), dict) else None,
-                "status": device.get("status", {}).get("value") if isinstance(device.get("status"), dict) else None
+                "role": _lookup(device, "device_role", "name"),
+                "status": _lookup(device, "status", "value")
             }
-            devices_list.append(device_info)
+            for device in devices_page.get("results", [])[:10]
+        ]
         
         result["NetBox_Devices"] = [d["name"] for d in devices_list if d["name"]]
         result["NetBox_Status"] = "Success"
@@ -483,7 +1212,18 @@ def get_device_and_interface_report(
         result["error"] = f"NetBox error: {str(e)}"
         logger.error(f"NetBox error: {e}")
     
-    # Step 2: Connect via Telnet and run command
+    return result
+
+
+def _report_telnet_output(
+    telnet_host: str,
+    telnet_username: str,
+    telnet_password: str,
+    telnet_command: str
+) -> Dict:
+    """Report step 2: connect via Telnet and run the command (Telnet_Output, Telnet_Status, error)."""
+    result = {"Telnet_Output": "", "Telnet_Status": "Not Run", "error": None}
+    
     # TODO: FastDI Integration - Replace this Telnet call with FastDI API client
     # Example: fastdi_client.get_device_interfaces(device_id=telnet_host)
     # This would provide structured interface data without CLI parsing
@@ -518,6 +1258,5 @@ def get_device_and_interface_report(
         result["Telnet_Status"] = "Skipped"
         result["Telnet_Output"] = "No Telnet host configured in .env or parameters"
     
-    logger.info(f"Report generation complete: NetBox={result['NetBox_Status']}, Telnet={result['Telnet_Status']}")
     return result
 
@@ -10,41 +10,222 @@ Production-style Inventory Insight Agent with:
 - Optional SSH/Telnet identity verification
 - Multiple output formats (table, JSON, Markdown, HTML)
 """
-import yaml
 import json
 import os
+import threading
+import requests
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Literal
+from typing import Dict, Iterator, List, Optional, Any, Literal
+from collections import defaultdict
+from functools import cached_property, lru_cache
+from operator import itemgetter
+from dataclasses import dataclass, replace
 from datetime import datetime
 from utils.logger import setup_logger
+from utils.netbox_session import NETBOX_TIMEOUT, get_netbox_session
 from agents.inventory_models import (
     Device, InventorySnapshot, InventoryMismatch, InventoryReport, VLAN
 )
-from agents.connection_manager import get_device_identity
-# Resolve data path helper
+# Resolve data path helper. Found paths are cached so repeated loads skip the
+# filesystem probes; misses are not cached, so a file created later is still found.
+# Relative results assume a fixed working directory (call clear_inventory_caches
+# or reload_device_inventory after chdir).
+_data_path_cache: Dict[str, str] = {}
+
+
 def resolve_data_path(filename: str) -> str:
     """Resolve path to data file, checking multiple locations."""
-    from pathlib import Path
-    # Check current directory
-    current = Path(filename)
-    if current.exists():
-        return str(current)
-    # Check data/ directory
-    data_dir = Path("data") / filename
-    if data_dir.exists():
-        return str(data_dir)
-    # Check parent data/ directory
-    parent_data = Path(__file__).parent.parent / "data" / filename
-    if parent_data.exists():
-        return str(parent_data)
+    cached = _data_path_cache.get(filename)
+    if cached is not None:
+        return cached
+    # Check current directory, then data/, then the repository's data/
+    for candidate in (
+        Path(filename),
+        Path("data") / filename,
+        Path(__file__).parent.parent / "data" / filename,
+    ):
+        if candidate.exists():
+            resolved = _data_path_cache[filename] = str(candidate)
+            return resolved
     # Return default path
     return str(Path("data") / filename)
 
 logger = setup_logger(__name__)
 
-# Global cache for device inventory
-_devices_data: Optional[Dict[str, Any]] = None
-_devices_list: Optional[List[Dict[str, Any]]] = None
+
+@lru_cache(maxsize=None)
+def _yaml_loader():
+    """Return libyaml's C-backed SafeLoader, falling back to the pure-Python one.
+    
+    PyYAML is imported here on first parse rather than at module import.
+    """
+    import yaml
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    if loader is yaml.SafeLoader:
+        logger.warning("libyaml not available, using pure-Python YAML loader (slower)")
+    return loader
+
+
+# Prefer orjson (C parser) for NetBox payloads when installed; stdlib json otherwise
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Page size requested when paging NetBox devices on the shared session
+NETBOX_PAGE_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class _InventoryState:
+    """A loaded device inventory with its lookup indexes and groupings.
+    
+    get_device_info returns these shared structures directly: treat them as
+    read-only and copy (e.g. list(...)) before mutating.
+    """
+    data: Dict[str, Any]
+    devices: tuple
+    by_name_lower: Dict[str, Dict[str, Any]]
+    vlan_index: Dict[Any, List[Dict[str, Any]]]
+    groups: Dict[str, Dict[Any, List[Dict[str, Any]]]]
+    # Per device (parallel to devices): its VLANs as (vlan_id, vlan_name,
+    # vlan_dict) triples, with bare integer IDs expanded to {"id", "name"} dicts
+    device_vlans: tuple = ()
+    cache_key: Optional[tuple] = None
+    
+    @cached_property
+    def sonic_devices(self) -> tuple:
+        """Devices whose OS is SONiC (case-insensitive)."""
+        return tuple(d for d in self.devices if d.get("os", "").lower() == "sonic")
+    
+    @cached_property
+    def vlan_table(self) -> List[Dict[str, Any]]:
+        """VLAN entries with the devices on each VLAN, sorted by VLAN ID."""
+        vlan_map = {}  # vlan_id -> list of devices
+        
+        for device, vlans in zip(self.devices, self.device_vlans):
+            if not vlans:
+                continue
+            # One read-only member entry per device, shared by all its VLANs
+            member = {
+                "name": device.get("name", "unknown"),
+                "ip": device.get("ip"),
+                "role": device.get("role")
+            }
+            
+            for vlan_id, vlan_name, _ in vlans:
+                entry = vlan_map.get(vlan_id)
+                if entry is None:
+                    entry = vlan_map[vlan_id] = {
+                        "vlan_id": vlan_id,
+                        "vlan_name": vlan_name,
+                        "devices": []
+                    }
+                entry["devices"].append(member)
+        
+        # Convert to list sorted by VLAN ID
+        return sorted(vlan_map.values(), key=itemgetter("vlan_id"))
+
+
+# Global cache for device inventory. A load builds a complete new state and
+# publishes it with a single rebind, so readers that take a local reference
+# never see a half-built inventory; the lock only serializes loads.
+_inventory: Optional[_InventoryState] = None
+_inventory_lock = threading.Lock()
+
+
+# Parsed inventories are cached by (absolute path, mtime_ns, size); editing the
+# file changes the key, so an unchanged file is never re-parsed and a changed
+# one never served stale. Cached snapshots are shared and must not be mutated.
+_SNAPSHOT_CACHE_SIZE = 8
+_snapshot_cache: Dict[tuple, InventorySnapshot] = {}
+
+# merge_inventories results for recent (YAML, NetBox) snapshot pairs. Cached
+# snapshots keep their identity while their files are unchanged, so repeated
+# queries reuse the merge; entries hold both inputs, so their ids stay unique.
+_MERGE_CACHE_SIZE = 8
+_merge_cache: Dict[tuple, tuple] = {}
+
+
+def _file_cache_key(path: str) -> tuple:
+    """Return a cache key that changes whenever the file is modified."""
+    st = os.stat(path)
+    return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+
+def _bounded_put(cache: Dict[tuple, Any], key: tuple, value: Any, maxsize: int) -> None:
+    """Insert into a small cache, evicting the oldest entry when full."""
+    if len(cache) >= maxsize:
+        cache.pop(next(iter(cache)), None)
+    cache[key] = value
+
+
+def clear_inventory_caches() -> None:
+    """Drop cached YAML/sample snapshots, merge results and resolved data paths."""
+    _snapshot_cache.clear()
+    _merge_cache.clear()
+    _data_path_cache.clear()
+
+
+def _normalize_vlans(vlans) -> tuple:
+    """Canonicalize a device's VLAN list to (vlan_id, vlan_name, vlan_dict) triples.
+    
+    Dict entries are kept as-is, bare integers become {"id": n, "name": "unknown"}
+    and anything else is dropped.
+    """
+    normalized = []
+    for vlan in vlans:
+        if isinstance(vlan, dict):
+            normalized.append((vlan.get("id"), vlan.get("name", "unknown"), vlan))
+        elif isinstance(vlan, int):
+            normalized.append((vlan, "unknown", {"id": vlan, "name": "unknown"}))
+    return tuple(normalized)
+
+
+def _build_inventory_state(data: Dict[str, Any], cache_key: Optional[tuple] = None) -> _InventoryState:
+    """Index devices by name and VLAN ID and group them by role/vendor/OS in one pass."""
+    devices = data.get("devices", [])
+    
+    by_name: Dict[str, Dict[str, Any]] = {}
+    device_vlans: List[tuple] = []
+    vlan_index: Dict[Any, List[Dict[str, Any]]] = {}
+    by_role: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    by_vendor: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    by_os: Dict[Any, List[Dict[str, Any]]] = defaultdict(list)
+    for device in devices:
+        # First device wins, matching a front-to-back scan
+        by_name.setdefault(device.get("name", "").lower(), device)
+        by_role[device.get("role", "unknown")].append(device)
+        by_vendor[device.get("vendor", "unknown")].append(device)
+        by_os[device.get("os", "unknown")].append(device)
+        
+        vlans = _normalize_vlans(device.get("vlans", ()))
+        device_vlans.append(vlans)
+        
+        seen_vlans = set()
+        for vlan_id, _, vlan_info in vlans:
+            if vlan_id is None or vlan_id in seen_vlans:
+                continue
+            seen_vlans.add(vlan_id)
+            vlan_index.setdefault(vlan_id, []).append({
+                "name": device.get("name"),
+                "ip": device.get("ip"),
+                "vendor": device.get("vendor"),
+                "os": device.get("os"),
+                "role": device.get("role"),
+                "vlan": vlan_info
+            })
+    
+    return _InventoryState(
+        data=data,
+        devices=tuple(devices),
+        by_name_lower=by_name,
+        vlan_index=vlan_index,
+        groups={"role": dict(by_role), "vendor": dict(by_vendor), "os": dict(by_os)},
+        device_vlans=tuple(device_vlans),
+        cache_key=cache_key
+    )
 
 
 def load_device_inventory(yaml_path: Optional[str] = None) -> Dict[str, Any]:
@@ -61,7 +242,7 @@ def load_device_inventory(yaml_path: Optional[str] = None) -> Dict[str, Any]:
         FileNotFoundError: If YAML file doesn't exist
         yaml.YAMLError: If YAML file is malformed
     """
-    global _devices_data, _devices_list
+    global _inventory
     
     if yaml_path is None:
         yaml_path = resolve_data_path("devices.yaml")
@@ -70,45 +251,102 @@ def load_device_inventory(yaml_path: Optional[str] = None) -> Dict[str, Any]:
     if not yaml_file.exists():
         raise FileNotFoundError(f"Device inventory file not found: {yaml_path}")
     
-    logger.info(f"Loading device inventory from: {yaml_path}")
+    cache_key = _file_cache_key(yaml_path)
+    state = _inventory
+    if state is not None and state.cache_key == cache_key:
+        logger.debug(f"Device inventory unchanged, reusing loaded copy: {yaml_path}")
+        return state.data
+    
+    import yaml
     
-    try:
-        with open(yaml_file, 'r') as f:
-            data = yaml.safe_load(f)
+    with _inventory_lock:
+        # Another thread may have loaded the same file while we waited
+        state = _inventory
+        if state is not None and state.cache_key == cache_key:
+            return state.data
         
-        if not data or "devices" not in data:
-            logger.warning("Device inventory YAML missing 'devices' key")
-            data = {"devices": []}
+        logger.info(f"Loading device inventory from: {yaml_path}")
         
-        _devices_data = data
-        _devices_list = data.get("devices", [])
+        try:
+            with open(yaml_file, 'rb') as f:
+                data = yaml.load(f, Loader=_yaml_loader())
+            
+            if not data or "devices" not in data:
+                logger.warning("Device inventory YAML missing 'devices' key")
+                data = {"devices": []}
+            
+            state = _build_inventory_state(data, cache_key)
+            _inventory = state
+            
+            logger.info(f"Loaded {len(state.devices)} devices from inventory")
+            return data
         
-        logger.info(f"Loaded {len(_devices_list)} devices from inventory")
-        return data
-    
-    except yaml.YAMLError as e:
-        logger.error(f"Error parsing YAML file: {e}")
-        raise
-    except Exception as e:
-        logger.error(f"Error loading device inventory: {e}")
-        raise
+        except yaml.YAMLError as e:
+            logger.error(f"Error parsing YAML file: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error loading device inventory: {e}")
+            raise
 
 
-def get_device_info(device_name: Optional[str] = None, query_type: Optional[str] = None) -> Dict[str, Any]:
+def reload_device_inventory(yaml_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Force the device inventory to be re-read, even if the file looks unchanged.
+    
+    The current inventory keeps serving readers until the reload publishes
+    its replacement. Cached snapshots and merge results are dropped as well.
+    
+    Args:
+        yaml_path: Path to devices.yaml file (defaults to data/devices.yaml)
+        
+    Returns:
+        Dictionary containing device inventory data
+    """
+    global _inventory
+    
+    with _inventory_lock:
+        if _inventory is not None:
+            _inventory = replace(_inventory, cache_key=None)
+    clear_inventory_caches()
+    return load_device_inventory(yaml_path)
+
+
+# get_device_info query_type aliases (lower-cased) -> query kind
+_QUERY_TYPES = {
+    "all": "all",
+    "sonic": "sonic",
+    "sonic devices": "sonic",
+    "by_role": "role",
+    "role": "role",
+    "by_vendor": "vendor",
+    "vendor": "vendor",
+    "by_os": "os",
+    "os": "os",
+}
+
+
+def get_device_info(
+    device_name: Optional[str] = None,
+    query_type: Optional[str] = None,
+    include_devices: bool = True
+) -> Dict[str, Any]:
     """
     Get device information from inventory.
     
     Args:
         device_name: Name of the device to query (optional, returns all if not provided)
         query_type: Type of query - "all", "basic", "vlans", "by_role", "by_vendor", "by_os" (optional)
+        include_devices: For grouped queries (by_role/by_vendor/by_os), also return
+            the flat device list; pass False to get only the grouping (count is then 0)
         
     Returns:
-        Dictionary containing device information or list of devices
+        Dictionary containing device information or list of devices. Device
+        lists and groupings are shared with the loaded inventory and must not
+        be mutated; a single device lookup returns its own copy.
     """
-    global _devices_list
-    
-    # Load inventory if not already loaded
-    if _devices_list is None:
+    # Load inventory if not already loaded; later reads all use this one state
+    inventory = _inventory
+    if inventory is None:
         try:
             load_device_inventory()
         except Exception as e:
@@ -118,6 +356,7 @@ def get_device_info(device_name: Optional[str] = None, query_type: Optional[str]
                 "message": str(e),
                 "devices": []
             }
+        inventory = _inventory
     
     result = {
         "success": True,
@@ -126,13 +365,10 @@ def get_device_info(device_name: Optional[str] = None, query_type: Optional[str]
     
     # If device_name is provided, find specific device
     if device_name:
-        device = None
-        for d in _devices_list:
-            if d.get("name", "").lower() == device_name.lower():
-                device = d.copy()
-                break
+        device = inventory.by_name_lower.get(device_name.lower())
         
         if device:
+            device = device.copy()
             result["device"] = device
             result["devices"] = [device]
         else:
@@ -142,47 +378,19 @@ def get_device_info(device_name: Optional[str] = None, query_type: Optional[str]
     
     # If query_type is specified, filter devices
     elif query_type:
-        query_type_lower = query_type.lower()
+        query_kind = _QUERY_TYPES.get(query_type.lower())
         
-        if query_type_lower == "all":
-            result["devices"] = _devices_list.copy()
-        elif query_type_lower in ["sonic", "sonic devices"]:
-            result["devices"] = [d for d in _devices_list if d.get("os", "").lower() == "sonic"]
-        elif query_type_lower in ["by_role", "role"]:
-            # Group by role
-            roles = {}
-            for d in _devices_list:
-                role = d.get("role", "unknown")
-                if role not in roles:
-                    roles[role] = []
-                roles[role].append(d)
-            result["devices"] = _devices_list.copy()
-            result["grouped_by_role"] = roles
-        elif query_type_lower in ["by_vendor", "vendor"]:
-            # Group by vendor
-            vendors = {}
-            for d in _devices_list:
-                vendor = d.get("vendor", "unknown")
-                if vendor not in vendors:
-                    vendors[vendor] = []
-                vendors[vendor].append(d)
-            result["devices"] = _devices_list.copy()
-            result["grouped_by_vendor"] = vendors
-        elif query_type_lower in ["by_os", "os"]:
-            # Group by OS
-            os_types = {}
-            for d in _devices_list:
-                os_type = d.get("os", "unknown")
-                if os_type not in os_types:
-                    os_types[os_type] = []
-                os_types[os_type].append(d)
-            result["devices"] = _devices_list.copy()
-            result["grouped_by_os"] = os_types
+        if query_kind == "sonic":
+            result["devices"] = inventory.sonic_devices
+        elif query_kind in ("role", "vendor", "os"):
+            result["devices"] = inventory.devices if include_devices else []
+            result[f"grouped_by_{query_kind}"] = inventory.groups[query_kind]
         else:
-            result["devices"] = _devices_list.copy()
+            # "all" and unrecognized query types return every device
+            result["devices"] = inventory.devices
     else:
         # Return all devices if no filter specified
-        result["devices"] = _devices_list.copy()
+        result["devices"] = inventory.devices
     
     result["count"] = len(result["devices"])
     return result
@@ -198,10 +406,9 @@ def list_devices_by_vlan(vlan_id: int) -> Dict[str, Any]:
     Returns:
         Dictionary containing list of devices with that VLAN and their VLAN details
     """
-    global _devices_list
-    
-    # Load inventory if not already loaded
-    if _devices_list is None:
+    # Load inventory if not already loaded; later reads all use this one state
+    inventory = _inventory
+    if inventory is None:
         try:
             load_device_inventory()
         except Exception as e:
@@ -212,33 +419,9 @@ def list_devices_by_vlan(vlan_id: int) -> Dict[str, Any]:
                 "vlan_id": vlan_id,
                 "devices": []
             }
+        inventory = _inventory
     
-    matching_devices = []
-    
-    for device in _devices_list:
-        vlans = device.get("vlans", [])
-        device_vlan_info = None
-        
-        # Check if device has this VLAN
-        for vlan in vlans:
-            if isinstance(vlan, dict):
-                if vlan.get("id") == vlan_id:
-                    device_vlan_info = vlan
-                    break
-            elif isinstance(vlan, int) and vlan == vlan_id:
-                device_vlan_info = {"id": vlan_id, "name": "unknown"}
-                break
-        
-        if device_vlan_info:
-            device_info = {
-                "name": device.get("name"),
-                "ip": device.get("ip"),
-                "vendor": device.get("vendor"),
-                "os": device.get("os"),
-                "role": device.get("role"),
-                "vlan": device_vlan_info
-            }
-            matching_devices.append(device_info)
+    matching_devices = list(inventory.vlan_index.get(vlan_id, ()))
     
     return {
         "vlan_id": vlan_id,
@@ -254,10 +437,9 @@ def get_vlan_table() -> Dict[str, Any]:
     Returns:
         Dictionary containing VLAN table data
     """
-    global _devices_list
-    
-    # Load inventory if not already loaded
-    if _devices_list is None:
+    # Load inventory if not already loaded; later reads all use this one state
+    inventory = _inventory
+    if inventory is None:
         try:
             load_device_inventory()
         except Exception as e:
@@ -267,43 +449,15 @@ def get_vlan_table() -> Dict[str, Any]:
                 "message": str(e),
                 "vlan_table": []
             }
+        inventory = _inventory
     
-    vlan_map = {}  # vlan_id -> list of devices
-    
-    for device in _devices_list:
-        device_name = device.get("name", "unknown")
-        vlans = device.get("vlans", [])
-        
-        for vlan in vlans:
-            if isinstance(vlan, dict):
-                vlan_id = vlan.get("id")
-                vlan_name = vlan.get("name", "unknown")
-            elif isinstance(vlan, int):
-                vlan_id = vlan
-                vlan_name = "unknown"
-            else:
-                continue
-            
-            if vlan_id not in vlan_map:
-                vlan_map[vlan_id] = {
-                    "vlan_id": vlan_id,
-                    "vlan_name": vlan_name,
-                    "devices": []
-                }
-            
-            vlan_map[vlan_id]["devices"].append({
-                "name": device_name,
-                "ip": device.get("ip"),
-                "role": device.get("role")
-            })
-    
-    # Convert to list sorted by VLAN ID
-    vlan_table = sorted(vlan_map.values(), key=lambda x: x["vlan_id"])
+    # Built once per loaded inventory and shared; treat as read-only
+    vlan_table = inventory.vlan_table
     
     return {
         "vlan_table": vlan_table,
         "total_vlans": len(vlan_table),
-        "total_devices": len(_devices_list)
+        "total_devices": len(inventory.devices)
     }
 
 
@@ -319,26 +473,33 @@ def load_yaml_inventory(path: Optional[str] = None) -> InventorySnapshot:
         path: Path to devices.yaml file (defaults to data/devices.yaml)
         
     Returns:
-        InventorySnapshot object
+        InventorySnapshot object (shared while the file is unchanged; do not mutate)
     """
     if path is None:
         path = resolve_data_path("devices.yaml")
     
+    cache_key = _file_cache_key(path)
+    cached = _snapshot_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
     logger.info(f"Loading YAML inventory from: {path}")
     
-    with open(path, 'r') as f:
-        data = yaml.safe_load(f)
+    import yaml
+    with open(path, 'rb') as f:
+        data = yaml.load(f, Loader=_yaml_loader())
     
-    devices = []
-    for device_dict in data.get("devices", []):
-        device = Device.from_dict(device_dict)
-        devices.append(device)
+    from_dict = Device.from_dict
+    devices = [from_dict(device_dict) for device_dict in data.get("devices", [])]
     
-    return InventorySnapshot(
+    snapshot = InventorySnapshot(
         devices=devices,
         generated_at=datetime.now(),
         source="yaml"
     )
+    
+    _bounded_put(_snapshot_cache, cache_key, snapshot, _SNAPSHOT_CACHE_SIZE)
+    return snapshot
 
 
 def load_netbox_inventory(
@@ -364,17 +525,14 @@ def load_netbox_inventory(
     # If no credentials, try to load from sample file
     if not base_url or not token:
         logger.info("NetBox credentials not provided, loading from sample file")
-        sample_path = resolve_data_path("netbox_sample.json")
-        if Path(sample_path).exists():
-            with open(sample_path, 'r') as f:
-                data = json.load(f)
-        else:
+        snapshot = _netbox_sample_snapshot()
+        if snapshot is None:
             logger.warning("No NetBox credentials and no sample file found")
             return InventorySnapshot(devices=[], generated_at=datetime.now(), source="netbox")
+        return snapshot
     else:
         # Try to fetch from NetBox API
         try:
-            import requests
             headers = {
                 "Authorization": f"Token {token}",
                 "Content-Type": "application/json",
@@ -382,123 +540,159 @@ def load_netbox_inventory(
             }
             url = f"{base_url.rstrip('/')}/api/dcim/devices/"
             logger.info(f"Attempting to fetch devices from NetBox: {url}")
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            logger.info(f"Successfully fetched {data.get('count', len(data.get('results', [])))} devices from NetBox")
+            # Follow NetBox pagination on the pooled session, converting each
+            # page to Devices as it arrives so only one raw page is held at a time
+            session = get_netbox_session()
+            fetched = []
+            next_url, params = url, {"limit": NETBOX_PAGE_SIZE}
+            while next_url:
+                response = session.get(next_url, headers=headers, params=params, timeout=NETBOX_TIMEOUT)
+                response.raise_for_status()
+                page = _json_loads(response.content)
+                fetched.extend(_build_device(device_dict) for device_dict in page.get("results", []))
+                # The next link already carries limit/offset
+                next_url, params = page.get("next"), None
+            logger.info(f"Successfully fetched {len(fetched)} devices from NetBox")
+            return InventorySnapshot(
+                devices=fetched,
+                generated_at=datetime.now(),
+                source="netbox"
+            )
         except requests.exceptions.Timeout:
-            error_msg = f"NetBox API request timed out for {base_url}"
-            logger.error(error_msg)
-            logger.info("Falling back to sample file")
-            sample_path = resolve_data_path("netbox_sample.json")
-            if Path(sample_path).exists():
-                with open(sample_path, 'r') as f:
-                    data = json.load(f)
-            else:
-                logger.error("Sample file not found, returning empty snapshot")
-                return InventorySnapshot(devices=[], generated_at=datetime.now(), source="netbox")
+            logger.error(f"NetBox API request timed out for {base_url}")
         except requests.exceptions.RequestException as e:
-            error_msg = f"NetBox API request failed: {str(e)}"
-            logger.error(error_msg)
-            logger.info("Falling back to sample file")
-            sample_path = resolve_data_path("netbox_sample.json")
-            if Path(sample_path).exists():
-                with open(sample_path, 'r') as f:
-                    data = json.load(f)
-            else:
-                logger.error("Sample file not found, returning empty snapshot")
-                return InventorySnapshot(devices=[], generated_at=datetime.now(), source="netbox")
+            logger.error(f"NetBox API request failed: {str(e)}")
         except Exception as e:
-            error_msg = f"Unexpected error fetching from NetBox: {str(e)}"
-            logger.error(error_msg, exc_info=True)
-            logger.info("Falling back to sample file")
-            sample_path = resolve_data_path("netbox_sample.json")
-            if Path(sample_path).exists():
-                with open(sample_path, 'r') as f:
-                    data = json.load(f)
-            else:
-                logger.error("Sample file not found, returning empty snapshot")
-                return InventorySnapshot(devices=[], generated_at=datetime.now(), source="netbox")
-    
-    devices = []
-    device_list = data.get("devices", data.get("results", []))
-    
-    for device_dict in device_list:
-        # Normalize NetBox fields to canonical format
-        vendor = _normalize_vendor(device_dict.get("manufacturer", device_dict.get("vendor", "")))
-        os_type = _normalize_os(device_dict.get("device_type", ""))
-        role = _normalize_role(device_dict.get("role", ""))
-        region = device_dict.get("site", device_dict.get("region"))
-        
-        # Extract IP from primary_ip
-        primary_ip = device_dict.get("primary_ip", "")
-        ip = primary_ip.split("/")[0] if primary_ip else ""
+            logger.error(f"Unexpected error fetching from NetBox: {str(e)}", exc_info=True)
         
-        device = Device(
-            name=device_dict.get("name", ""),
-            ip=ip,
-            vendor=vendor,
-            os=os_type,
-            role=role,
-            region=region,
-            vlans=[],  # NetBox typically doesn't include VLANs in device list
-            interfaces=None
-        )
-        devices.append(device)
+        logger.info("Falling back to sample file")
+        snapshot = _netbox_sample_snapshot()
+        if snapshot is None:
+            logger.error("Sample file not found, returning empty snapshot")
+            return InventorySnapshot(devices=[], generated_at=datetime.now(), source="netbox")
+        return snapshot
+
+
+def _netbox_sample_snapshot() -> Optional[InventorySnapshot]:
+    """Snapshot of data/netbox_sample.json, or None if it doesn't exist.
     
-    return InventorySnapshot(
-        devices=devices,
+    Cached like YAML snapshots while the file is unchanged (shared; do not mutate).
+    """
+    sample_path = resolve_data_path("netbox_sample.json")
+    if not Path(sample_path).exists():
+        return None
+    
+    cache_key = _file_cache_key(sample_path)
+    cached = _snapshot_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    with open(sample_path, 'rb') as f:
+        data = _json_loads(f.read())
+    snapshot = InventorySnapshot(
+        devices=[_build_device(device_dict) for device_dict in _sample_device_list(data)],
         generated_at=datetime.now(),
         source="netbox"
     )
+    _bounded_put(_snapshot_cache, cache_key, snapshot, _SNAPSHOT_CACHE_SIZE)
+    return snapshot
+
+
+def _sample_device_list(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Return the device records from sample data.
+    
+    netbox_sample.json uses a top-level "devices" list; a saved NetBox API
+    page uses "results". "devices" wins if both are present.
+    """
+    if "devices" in data:
+        return data["devices"]
+    return data.get("results", [])
+
+
+def _build_device(device_dict: Dict[str, Any]) -> Device:
+    """Build a Device from a NetBox device record, normalizing its fields."""
+    # Normalize NetBox fields to canonical format
+    vendor = _normalize_vendor(device_dict.get("manufacturer", device_dict.get("vendor", "")))
+    os_type = _normalize_os(device_dict.get("device_type", ""))
+    role = _normalize_role(device_dict.get("role", ""))
+    region = device_dict.get("site", device_dict.get("region"))
+    
+    # Extract IP from primary_ip
+    primary_ip = device_dict.get("primary_ip", "")
+    ip = primary_ip.split("/")[0] if primary_ip else ""
+    
+    return Device(
+        name=device_dict.get("name", ""),
+        ip=ip,
+        vendor=vendor,
+        os=os_type,
+        role=role,
+        region=region,
+        vlans=(),  # NetBox typically doesn't include VLANs in device list
+        interfaces=None
+    )
+
+
+# Canonical names for normalization. OS and role rules are flat
+# (needle, canonical) pairs checked in order (first needle found in the value
+# wins), so their priority is explicit.
+_VENDOR_NAMES = {
+    "edgecore": "EdgeCore",
+    "cisco": "Cisco",
+    "arista": "Arista",
+    "celtica": "Celtica",
+    "nvidia": "NVIDIA",
+    "nvidia corporation": "NVIDIA"
+}
+_OS_RULES = (
+    ("sonic", "SONiC"),
+    ("nx-os", "NX-OS"),
+    ("nexus", "NX-OS"),
+    ("ios", "IOS"),
+    ("custom", "Custom"),
+)
+_ROLE_RULES = (
+    ("spine", "spine"),
+    ("leaf", "leaf"),
+    ("core", "core"),
+    ("agg", "aggregation"),  # also covers "aggregation"
+)
 
 
+def _match_rule(value_lower: str, rules) -> Optional[str]:
+    """Return the canonical name of the first rule whose needle is in value_lower."""
+    for needle, canonical in rules:
+        if needle in value_lower:
+            return canonical
+    return None
+
+
+# NetBox inventories repeat the same few vendor/OS/role strings, so each
+# normalizer is memoized on its raw input.
+@lru_cache(maxsize=1024)
 def _normalize_vendor(vendor: str) -> str:
     """Normalize vendor name to canonical format (lowercase, trimmed)."""
     if not vendor:
         return "Unknown"
     vendor = vendor.strip().lower()
-    mappings = {
-        "edgecore": "EdgeCore",
-        "cisco": "Cisco",
-        "arista": "Arista",
-        "celtica": "Celtica",
-        "nvidia": "NVIDIA",
-        "nvidia corporation": "NVIDIA"
-    }
-    return mappings.get(vendor, vendor.title())
+    return _VENDOR_NAMES.get(vendor) or vendor.title()
 
 
+@lru_cache(maxsize=1024)
 def _normalize_os(os_type: str) -> str:
     """Normalize OS name to canonical format (lowercase, trimmed)."""
     if not os_type:
         return "Unknown"
-    os_lower = os_type.strip().lower()
-    if "sonic" in os_lower:
-        return "SONiC"
-    elif "nx-os" in os_lower or "nexus" in os_lower:
-        return "NX-OS"
-    elif "ios" in os_lower:
-        return "IOS"
-    elif "custom" in os_lower:
-        return "Custom"
-    return os_type.strip().title()
+    return _match_rule(os_type.strip().lower(), _OS_RULES) or os_type.strip().title()
 
 
+@lru_cache(maxsize=1024)
 def _normalize_role(role: str) -> str:
     """Normalize device role to canonical format (lowercase, trimmed)."""
     if not role:
         return "unknown"
     role_lower = role.strip().lower()
-    if "spine" in role_lower:
-        return "spine"
-    elif "leaf" in role_lower:
-        return "leaf"
-    elif "core" in role_lower:
-        return "core"
-    elif "aggregation" in role_lower or "agg" in role_lower:
-        return "aggregation"
-    return role_lower
+    return _match_rule(role_lower, _ROLE_RULES) or role_lower
 
 
 def merge_inventories(
@@ -516,27 +710,29 @@ def merge_inventories(
         netbox_snapshot: InventorySnapshot from NetBox
         
     Returns:
-        Merged InventorySnapshot
+        Merged InventorySnapshot (shared for repeated calls with the same
+        snapshots; do not mutate)
     """
+    cache_key = (id(yaml_snapshot), id(netbox_snapshot))
+    cached = _merge_cache.get(cache_key)
+    if cached is not None:
+        return cached[2]
+    
     merged_devices = []
-    yaml_by_name = {d.name.lower(): d for d in yaml_snapshot.devices}
-    yaml_by_ip = {d.ip: d for d in yaml_snapshot.devices if d.ip}
-    netbox_by_name = {d.name.lower(): d for d in netbox_snapshot.devices}
-    netbox_by_ip = {d.ip: d for d in netbox_snapshot.devices if d.ip}
+    yaml_by_name = yaml_snapshot.by_name_lower
+    yaml_by_ip = yaml_snapshot.by_ip
+    # Names already covered by NetBox come from the snapshot's cached index
+    netbox_by_name = netbox_snapshot.by_name_lower
     
     # Process NetBox devices first (preferred source)
-    processed_names = set()
     for netbox_device in netbox_snapshot.devices:
-        name_key = netbox_device.name.lower()
-        processed_names.add(name_key)
-        
         # Try to find matching YAML device
-        yaml_device = yaml_by_name.get(name_key) or yaml_by_ip.get(netbox_device.ip)
+        yaml_device = yaml_by_name.get(netbox_device.name_key) or yaml_by_ip.get(netbox_device.ip)
         
         if yaml_device:
             # Merge: prefer NetBox but keep YAML VLANs
-            merged_device = Device(
-                name=netbox_device.name,
+            merged_device = replace(
+                netbox_device,
                 ip=netbox_device.ip or yaml_device.ip,
                 vendor=netbox_device.vendor or yaml_device.vendor,
                 os=netbox_device.os or yaml_device.os,
@@ -552,16 +748,18 @@ def merge_inventories(
         merged_devices.append(merged_device)
     
     # Add YAML-only devices
-    for yaml_device in yaml_snapshot.devices:
-        name_key = yaml_device.name.lower()
-        if name_key not in processed_names:
-            merged_devices.append(yaml_device)
+    merged_devices.extend(
+        yaml_device for yaml_device in yaml_snapshot.devices
+        if yaml_device.name_key not in netbox_by_name
+    )
     
-    return InventorySnapshot(
+    merged = InventorySnapshot(
         devices=merged_devices,
         generated_at=datetime.now(),
         source="merged"
     )
+    _bounded_put(_merge_cache, cache_key, (yaml_snapshot, netbox_snapshot, merged), _MERGE_CACHE_SIZE)
+    return merged
 
 
 def group_by(
@@ -576,21 +774,52 @@ def group_by(
         key: Field to group by (vendor, role, region, os)
         
     Returns:
-        Dictionary mapping key values to lists of devices
+        Dictionary mapping key values to lists of devices. The grouping is
+        memoized on the snapshot as tuples; each call gets its own lists.
     """
-    groups: Dict[str, List[Device]] = {}
+    groups = snapshot._groupings.get(key)
+    if groups is None:
+        grouped: Dict[str, List[Device]] = defaultdict(list)
+        
+        for device in snapshot.devices:
+            value = getattr(device, key, "unknown")
+            grouped["unknown" if value is None else str(value)].append(device)
+        
+        groups = snapshot._groupings[key] = {value: tuple(devices) for value, devices in grouped.items()}
+    
+    # Plain dict so lookups of absent keys don't insert empty groups
+    return {value: list(devices) for value, devices in groups.items()}
+
+
+def count_by(
+    snapshot: InventorySnapshot,
+    key: Literal["vendor", "role", "region", "os"]
+) -> Dict[str, int]:
+    """
+    Count devices per value of a key.
+    
+    Same keys and order as group_by, without building the per-group device
+    lists; use it when only the group sizes are needed.
+    
+    Args:
+        snapshot: InventorySnapshot to count
+        key: Field to group by (vendor, role, region, os)
+        
+    Returns:
+        Dictionary mapping key values to device counts
+    """
+    counts: Dict[str, int] = {}
     
     for device in snapshot.devices:
         value = getattr(device, key, "unknown")
-        if value is None:
-            value = "unknown"
-        value_str = str(value)
-        
-        if value_str not in groups:
-            groups[value_str] = []
-        groups[value_str].append(device)
+        value_str = "unknown" if value is None else str(value)
+        counts[value_str] = counts.get(value_str, 0) + 1
     
-    return groups
+    return counts
+
+
+# detect_mismatches groups results in this order; field mismatches sort last
+_MISMATCH_ORDER = {"MISSING_IN_NETBOX": 0, "MISSING_IN_YAML": 1}
 
 
 def detect_mismatches(
@@ -613,81 +842,100 @@ def detect_mismatches(
         netbox_snapshot: NetBox inventory snapshot
         
     Returns:
-        List of InventoryMismatch objects
+        List of InventoryMismatch objects (missing in NetBox, missing in YAML,
+        then field mismatches)
     """
-    mismatches = []
+    mismatches = list(iter_mismatches(yaml_snapshot, netbox_snapshot))
+    # Stable sort keeps device order within each group
+    mismatches.sort(key=lambda m: _MISMATCH_ORDER.get(m.category, 2))
+    return mismatches
+
+
+def iter_mismatches(
+    yaml_snapshot: InventorySnapshot,
+    netbox_snapshot: InventorySnapshot
+) -> Iterator[InventoryMismatch]:
+    """
+    Yield mismatches between YAML and NetBox inventories as they are found.
     
-    yaml_by_name = {d.name.lower(): d for d in yaml_snapshot.devices}
-    yaml_by_ip = {d.ip: d for d in yaml_snapshot.devices if d.ip}
-    netbox_by_name = {d.name.lower(): d for d in netbox_snapshot.devices}
-    netbox_by_ip = {d.ip: d for d in netbox_snapshot.devices if d.ip}
+    Same checks as detect_mismatches, but without building a list: YAML
+    devices are checked first (missing in NetBox and field mismatches, in
+    device order), then NetBox devices missing from YAML.
+    
+    Args:
+        yaml_snapshot: YAML inventory snapshot
+        netbox_snapshot: NetBox inventory snapshot
+        
+    Yields:
+        InventoryMismatch objects
+    """
+    yaml_by_name = yaml_snapshot.by_name_lower
+    yaml_by_ip = yaml_snapshot.by_ip
+    netbox_by_name = netbox_snapshot.by_name_lower
+    netbox_by_ip = netbox_snapshot.by_ip
     
-    # Check for devices missing in NetBox
     for yaml_device in yaml_snapshot.devices:
-        name_key = yaml_device.name.lower()
-        if name_key not in netbox_by_name and yaml_device.ip not in netbox_by_ip:
-            mismatches.append(InventoryMismatch(
+        netbox_device = netbox_by_name.get(yaml_device.name_key) or netbox_by_ip.get(yaml_device.ip)
+        
+        # Check for devices missing in NetBox
+        if netbox_device is None:
+            yield InventoryMismatch(
                 category="MISSING_IN_NETBOX",
                 expected=yaml_device.name,
                 observed="Not found in NetBox",
                 device_name=yaml_device.name,
                 details=f"Device {yaml_device.name} ({yaml_device.ip}) exists in YAML but not in NetBox"
-            ))
+            )
+            continue
+        
+        # Check role mismatch
+        if yaml_device.role and netbox_device.role and yaml_device.role.lower() != netbox_device.role.lower():
+            yield InventoryMismatch(
+                category="ROLE_MISMATCH",
+                expected=yaml_device.role,
+                observed=netbox_device.role,
+                device_name=yaml_device.name,
+                details=f"Role mismatch for {yaml_device.name}"
+            )
+        
+        # Check vendor mismatch
+        if yaml_device.vendor and netbox_device.vendor and yaml_device.vendor.lower() != netbox_device.vendor.lower():
+            yield InventoryMismatch(
+                category="VENDOR_MISMATCH",
+                expected=yaml_device.vendor,
+                observed=netbox_device.vendor,
+                device_name=yaml_device.name,
+                details=f"Vendor mismatch for {yaml_device.name}"
+            )
     
     # Check for devices missing in YAML
     for netbox_device in netbox_snapshot.devices:
-        name_key = netbox_device.name.lower()
-        if name_key not in yaml_by_name and netbox_device.ip not in yaml_by_ip:
-            mismatches.append(InventoryMismatch(
+        if netbox_device.name_key not in yaml_by_name and netbox_device.ip not in yaml_by_ip:
+            yield InventoryMismatch(
                 category="MISSING_IN_YAML",
                 expected="Not found in YAML",
                 observed=netbox_device.name,
                 device_name=netbox_device.name,
                 details=f"Device {netbox_device.name} ({netbox_device.ip}) exists in NetBox but not in YAML"
-            ))
-    
-    # Check for mismatches in matching devices
-    for yaml_device in yaml_snapshot.devices:
-        name_key = yaml_device.name.lower()
-        netbox_device = netbox_by_name.get(name_key) or netbox_by_ip.get(yaml_device.ip)
-        
-        if netbox_device:
-            # Check role mismatch
-            if yaml_device.role and netbox_device.role and yaml_device.role.lower() != netbox_device.role.lower():
-                mismatches.append(InventoryMismatch(
-                    category="ROLE_MISMATCH",
-                    expected=yaml_device.role,
-                    observed=netbox_device.role,
-                    device_name=yaml_device.name,
-                    details=f"Role mismatch for {yaml_device.name}"
-                ))
-            
-            # Check vendor mismatch
-            if yaml_device.vendor and netbox_device.vendor and yaml_device.vendor.lower() != netbox_device.vendor.lower():
-                mismatches.append(InventoryMismatch(
-                    category="VENDOR_MISMATCH",
-                    expected=yaml_device.vendor,
-                    observed=netbox_device.vendor,
-                    device_name=yaml_device.name,
-                    details=f"Vendor mismatch for {yaml_device.name}"
-                ))
-    
-    return mismatches
+            )
 
 
 def optional_identity_verify(
     devices: List[Device],
-    enabled: bool = True
+    enabled: bool = True,
+    max_workers: int = 16
 ) -> List[InventoryMismatch]:
     """
     Optionally verify device identity via SSH/Telnet.
     
     For each device with IP and credentials, run a lightweight command
-    and compare hostname/vendor to expected values.
+    and compare hostname/vendor to expected values. Checks run concurrently
+    through connection_manager.get_device_identities.
     
     Args:
         devices: List of Device objects to verify
         enabled: Whether to enable identity verification
+        max_workers: Maximum number of concurrent connections (default: 16)
         
     Returns:
         List of InventoryMismatch objects for verification failures
@@ -695,31 +943,37 @@ def optional_identity_verify(
     if not enabled:
         return []
     
-    mismatches = []
-    
-    for device in devices:
-        if not device.ip:
-            continue
-        
-        try:
-            identity = get_device_identity(device.to_dict())
-            if identity:
-                # Check hostname match (basic check)
-                hostname = identity.get("hostname", "").lower()
-                device_name_lower = device.name.lower()
-                
-                # Simple hostname matching (may not always match exactly)
-                if hostname and device_name_lower not in hostname and hostname not in device_name_lower:
-                    mismatches.append(InventoryMismatch(
-                        category="IDENTITY_MISMATCH",
-                        expected=device.name,
-                        observed=hostname,
-                        device_name=device.name,
-                        details=f"Device identity verification: expected hostname matching {device.name}, got {hostname}"
-                    ))
-        except Exception as e:
-            logger.debug(f"Identity verification failed for {device.name}: {e}")
-            # Don't add mismatch for connection failures, only for mismatches
+    targets = [device for device in devices if device.ip]
+    if not targets:
+        return []
     
-    return mismatches
+    # Imported here: connection_manager pulls in paramiko, which only
+    # identity verification needs
+    from agents.connection_manager import get_device_identities
+    
+    identities = get_device_identities([device.to_dict() for device in targets], max_workers)
+    mismatches = (_identity_mismatch(device, identity) for device, identity in zip(targets, identities))
+    return [mismatch for mismatch in mismatches if mismatch is not None]
+
+
+def _identity_mismatch(device: Device, identity: Optional[Dict[str, Any]]) -> Optional[InventoryMismatch]:
+    """Compare one device's reported hostname against its inventory name."""
+    # No mismatch for connection failures (no identity), only for mismatches
+    if not identity:
+        return None
+    
+    # Check hostname match (basic check)
+    hostname = identity.get("hostname", "").lower()
+    device_name_lower = device.name_key
+    
+    # Simple hostname matching (may not always match exactly)
+    if hostname and device_name_lower not in hostname and hostname not in device_name_lower:
+        return InventoryMismatch(
+            category="IDENTITY_MISMATCH",
+            expected=device.name,
+            observed=hostname,
+            device_name=device.name,
+            details=f"Device identity verification: expected hostname matching {device.name}, got {hostname}"
+        )
+    return None
 
@@ -3,17 +3,18 @@
 This wraps the existing inventory_agent functions into a class-based interface
 for the coordinator system. Also provides access to production inventory tools.
 """
+import re
 from typing import Dict, Any, Optional
 from utils.logger import setup_logger
 from agents.inventory_agent import (
     get_device_info,
     list_devices_by_vlan,
     get_vlan_table,
-    load_device_inventory,
     load_yaml_inventory,
     load_netbox_inventory,
     merge_inventories,
     group_by,
+    count_by,
     detect_mismatches,
     optional_identity_verify
 )
@@ -21,17 +22,30 @@ from agents.inventory_models import InventoryReport
 
 logger = setup_logger(__name__)
 
+# Query patterns, compiled once at import instead of on every process_query call
+_VLAN_RE = re.compile(r'vlan\s+(\d+)')
+_DEVICE_RE = re.compile(r'\b(sonic-\S+|nexus-\S+|edgecore-\S+|celtica-\S+|\S+-\d+)\b', re.IGNORECASE)
+
+# Keyword routes tried in order after the VLAN and device-name patterns. Each
+# route lists alternatives; an alternative matches when every one of its
+# substrings occurs in the lower-cased query.
+_KEYWORD_ROUTES = (
+    ((("list all",), ("show all",)), "_handle_device_list"),
+    ((("sonic", "leaf"), ("sonic", "switch"), ("sonic", "device")), "_handle_sonic_devices"),
+    ((("group", "vendor"),), "_handle_group_by_vendor"),
+    ((("mismatch",), ("yam", "netbox")), "_handle_mismatches"),
+    ((("inventory report",), ("generate", "report")), "_handle_inventory_report"),
+)
+
 
 class InventoryAgent:
     """Agent for handling device inventory queries."""
     
     def __init__(self):
-        """Initialize the inventory agent."""
-        # Ensure inventory is loaded
-        try:
-            load_device_inventory()
-        except Exception as e:
-            logger.warning(f"Failed to load device inventory: {e}")
+        """Initialize the inventory agent.
+        
+        The device inventory is loaded on the first query that needs it.
+        """
         logger.info("Inventory agent initialized")
     
     def process_query(self, query: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
@@ -48,8 +62,7 @@ class InventoryAgent:
         query_lower = query.lower()
         
         # Extract VLAN ID if present
-        import re
-        vlan_match = re.search(r'vlan\s+(\d+)', query_lower)
+        vlan_match = _VLAN_RE.search(query_lower)
         if vlan_match:
             vlan_id = int(vlan_match.group(1))
             result = list_devices_by_vlan(vlan_id)
@@ -73,8 +86,7 @@ class InventoryAgent:
             }
         
         # Extract device name if present
-        device_pattern = r'\b(sonic-\S+|nexus-\S+|edgecore-\S+|celtica-\S+|\S+-\d+)\b'
-        device_match = re.search(device_pattern, query, re.IGNORECASE)
+        device_match = _DEVICE_RE.search(query)
         if device_match:
             device_name = device_match.group(1)
             result = get_device_info(device_name=device_name)
@@ -96,117 +108,126 @@ class InventoryAgent:
                     "summary": f"Device {device_name} not found in inventory"
                 }
         
-        # Check for list all devices queries
-        if "list all" in query_lower or "show all" in query_lower:
-            if "sonic" in query_lower:
-                result = get_device_info(query_type="sonic")
-            else:
-                result = get_device_info(query_type="all")
-            
-            count = result.get("count", 0)
-            return {
-                "success": True,
-                "agent": "inventory",
-                "query_type": "device_list",
-                "data": result,
-                "summary": f"Found {count} device(s) in inventory"
-            }
+        # Keyword-routed queries: the first route with a matching alternative wins
+        for alternatives, handler_name in _KEYWORD_ROUTES:
+            if any(all(keyword in query_lower for keyword in keywords) for keywords in alternatives):
+                return getattr(self, handler_name)(query_lower)
         
-        # Check for new production inventory queries
-        # "Show SONiC leaf switches" or "List SONiC devices"
-        if "sonic" in query_lower and ("leaf" in query_lower or "switch" in query_lower or "device" in query_lower):
-            yaml_snap = load_yaml_inventory()
-            netbox_snap = load_netbox_inventory()
-            merged = merge_inventories(yaml_snap, netbox_snap)
-            # Filter by OS and role
-            devices = [d for d in merged.devices if d.os.lower() == "sonic" and ("leaf" in d.role.lower() if "leaf" in query_lower else True)]
-            return {
-                "success": True,
-                "agent": "inventory",
-                "query_type": "device_list",
-                "data": {"devices": [d.to_dict() for d in devices], "count": len(devices)},
-                "summary": f"Found {len(devices)} SONiC device(s)"
-            }
+        # Default: return all devices
+        result = get_device_info(query_type="all")
+        return {
+            "success": True,
+            "agent": "inventory",
+            "query_type": "device_list",
+            "data": result,
+            "summary": f"Retrieved {result.get('count', 0)} device(s) from inventory"
+        }
+    
+    def _handle_device_list(self, query_lower: str) -> Dict[str, Any]:
+        """List all devices, or only SONiC devices when the query mentions SONiC."""
+        if "sonic" in query_lower:
+            result = get_device_info(query_type="sonic")
+        else:
+            result = get_device_info(query_type="all")
         
-        # "Group devices by vendor" or "Show inventory summary"
-        if "group" in query_lower and ("vendor" in query_lower or "by vendor" in query_lower):
-            yaml_snap = load_yaml_inventory()
-            netbox_snap = load_netbox_inventory()
-            merged = merge_inventories(yaml_snap, netbox_snap)
-            vendor_groups = group_by(merged, "vendor")
-            groups_dict = {k: [d.to_dict() for d in v] for k, v in vendor_groups.items()}
-            return {
-                "success": True,
-                "agent": "inventory",
-                "query_type": "inventory_summary",
-                "data": {"by_vendor": groups_dict},
-                "summary": f"Grouped {len(merged.devices)} devices by vendor"
-            }
+        count = result.get("count", 0)
+        return {
+            "success": True,
+            "agent": "inventory",
+            "query_type": "device_list",
+            "data": result,
+            "summary": f"Found {count} device(s) in inventory"
+        }
+    
+    def _handle_sonic_devices(self, query_lower: str) -> Dict[str, Any]:
+        """List SONiC devices from the merged inventory ("Show SONiC leaf switches")."""
+        yaml_snap = load_yaml_inventory()
+        netbox_snap = load_netbox_inventory()
+        merged = merge_inventories(yaml_snap, netbox_snap)
+        # Filter by OS and role
+        devices = [d for d in merged.devices if d.os.lower() == "sonic" and ("leaf" in d.role.lower() if "leaf" in query_lower else True)]
+        return {
+            "success": True,
+            "agent": "inventory",
+            "query_type": "device_list",
+            "data": {"devices": [d.to_dict() for d in devices], "count": len(devices)},
+            "summary": f"Found {len(devices)} SONiC device(s)"
+        }
+    
+    def _handle_group_by_vendor(self, query_lower: str) -> Dict[str, Any]:
+        """Group merged inventory devices by vendor ("Group devices by vendor")."""
+        yaml_snap = load_yaml_inventory()
+        netbox_snap = load_netbox_inventory()
+        merged = merge_inventories(yaml_snap, netbox_snap)
+        vendor_groups = group_by(merged, "vendor")
+        groups_dict = {k: [d.to_dict() for d in v] for k, v in vendor_groups.items()}
+        return {
+            "success": True,
+            "agent": "inventory",
+            "query_type": "inventory_summary",
+            "data": {"by_vendor": groups_dict},
+            "summary": f"Grouped {len(merged.devices)} devices by vendor"
+        }
+    
+    def _handle_mismatches(self, query_lower: str) -> Dict[str, Any]:
+        """Compare YAML and NetBox inventories ("Any mismatches between YAML and NetBox?")."""
+        yaml_snap = load_yaml_inventory()
+        netbox_snap = load_netbox_inventory()
+        mismatches = detect_mismatches(yaml_snap, netbox_snap)
+        return {
+            "success": True,
+            "agent": "inventory",
+            "query_type": "inventory_mismatches",
+            "data": {"mismatches": [m.to_dict() for m in mismatches], "count": len(mismatches)},
+            "summary": f"Found {len(mismatches)} mismatch(es) between YAML and NetBox"
+        }
+    
+    def _handle_inventory_report(self, query_lower: str) -> Dict[str, Any]:
+        """Build an inventory validation report ("Generate an inventory report")."""
+        yaml_snap = load_yaml_inventory()
+        netbox_snap = load_netbox_inventory()
+        merged = merge_inventories(yaml_snap, netbox_snap)
+        mismatches = detect_mismatches(yaml_snap, netbox_snap)
         
-        # "Any mismatches between YAML and NetBox?" or "Check mismatches"
-        if "mismatch" in query_lower or ("yam" in query_lower and "netbox" in query_lower):
-            yaml_snap = load_yaml_inventory()
-            netbox_snap = load_netbox_inventory()
-            mismatches = detect_mismatches(yaml_snap, netbox_snap)
-            return {
-                "success": True,
-                "agent": "inventory",
-                "query_type": "inventory_mismatches",
-                "data": {"mismatches": [m.to_dict() for m in mismatches], "count": len(mismatches)},
-                "summary": f"Found {len(mismatches)} mismatch(es) between YAML and NetBox"
+        report = InventoryReport(
+            passed=len(merged.devices) - len(mismatches),
+            failed=len(mismatches),
+            not_run=0,
+            mismatches=mismatches,
+            groups={
+                "vendor": count_by(merged, "vendor"),
+                "role": count_by(merged, "role"),
+                "os": count_by(merged, "os"),
+                "region": count_by(merged, "region")
             }
+        )
         
-        # "Generate an inventory report" or "Inventory report"
-        if "inventory report" in query_lower or ("generate" in query_lower and "report" in query_lower):
-            yaml_snap = load_yaml_inventory()
-            netbox_snap = load_netbox_inventory()
-            merged = merge_inventories(yaml_snap, netbox_snap)
-            mismatches = detect_mismatches(yaml_snap, netbox_snap)
-            vendor_groups = group_by(merged, "vendor")
-            role_groups = group_by(merged, "role")
-            os_groups = group_by(merged, "os")
-            region_groups = group_by(merged, "region")
-            
-            report = InventoryReport(
-                passed=len(merged.devices) - len(mismatches),
-                failed=len(mismatches),
-                not_run=0,
-                mismatches=mismatches,
-                groups={
-                    "vendor": {k: len(v) for k, v in vendor_groups.items()},
-                    "role": {k: len(v) for k, v in role_groups.items()},
-                    "os": {k: len(v) for k, v in os_groups.items()},
-                    "region": {k: len(v) for k, v in region_groups.items()}
+        export_format = "none"
+        if "html" in query_lower:
+            export_format = "html"
+        elif "markdown" in query_lower or "md" in query_lower:
+            export_format = "md"
+        elif "json" in query_lower:
+            export_format = "json"
+        
+        # The full device serialization is only needed when exporting
+        if export_format != "none":
+            data: Dict[str, Any] = {"snapshot": merged.to_dict()}
+        else:
+            data = {
+                "snapshot_summary": {
+                    "device_count": len(merged.devices),
+                    "generated_at": merged.generated_at.isoformat(),
+                    "source": merged.source
                 }
-            )
-            
-            export_format = "none"
-            if "html" in query_lower:
-                export_format = "html"
-            elif "markdown" in query_lower or "md" in query_lower:
-                export_format = "md"
-            elif "json" in query_lower:
-                export_format = "json"
-            
-            return {
-                "success": True,
-                "agent": "inventory",
-                "query_type": "inventory_report",
-                "data": {
-                    "snapshot": merged.to_dict(),
-                    "report": report.to_dict(),
-                    "export_format": export_format
-                },
-                "summary": f"Inventory report: {len(merged.devices)} devices, {len(mismatches)} mismatches"
             }
+        data["report"] = report.to_dict()
+        data["export_format"] = export_format
         
-        # Default: return all devices
-        result = get_device_info(query_type="all")
         return {
             "success": True,
             "agent": "inventory",
-            "query_type": "device_list",
-            "data": result,
-            "summary": f"Retrieved {result.get('count', 0)} device(s) from inventory"
+            "query_type": "inventory_report",
+            "data": data,
+            "summary": f"Inventory report: {len(merged.devices)} devices, {len(mismatches)} mismatches"
         }
-
@@ -4,11 +4,12 @@ This module defines typed data structures for device inventory, snapshots,
 mismatches, and reports using dataclasses for type safety and serialization.
 """
 from dataclasses import dataclass, field, asdict
-from typing import List, Optional, Dict, Any, Literal
+from functools import cached_property, lru_cache
+from typing import List, Optional, Dict, Any, Literal, Tuple
 from datetime import datetime
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VLAN:
     """VLAN information."""
     id: int
@@ -19,20 +20,55 @@ class VLAN:
         return {"id": self.id, "name": self.name}
 
 
-@dataclass
+# VLANs are immutable and repeat across many devices, so from_dict shares one
+# instance per (id, name) instead of constructing a new one each time.
+@lru_cache(maxsize=4096, typed=True)
+def _shared_vlan(vlan_id: Any, name: Any) -> VLAN:
+    return VLAN(vlan_id, name)
+
+
+@dataclass(slots=True, frozen=True)
 class Device:
-    """Device information model."""
+    """Device information model.
+    
+    Immutable and slotted: devices are shared across YAML, NetBox and merged
+    snapshots, so use dataclasses.replace() to derive a modified copy.
+    """
     name: str
     ip: str
     vendor: str
     os: str
     role: str
     region: Optional[str] = None
-    vlans: List[VLAN] = field(default_factory=list)
-    interfaces: Optional[List[str]] = None
+    vlans: Tuple[VLAN, ...] = ()
+    interfaces: Optional[Tuple[str, ...]] = None
+    # Lower-cased name used for case-insensitive matching, computed once
+    name_key: str = field(init=False, repr=False, compare=False)
+    # Serialized fields behind to_dict(), built on first call (never handed out)
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "name_key", (self.name or "").lower())
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization."""
+        """Convert to dictionary for JSON serialization.
+        
+        The serialized fields are built once per device (it is immutable) and
+        each call returns a fresh copy, so callers may mutate the result.
+        """
+        cached = self._dict_cache
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, "_dict_cache", cached)
+        result = dict(cached)
+        if "vlans" in result:
+            result["vlans"] = [dict(v) for v in result["vlans"]]
+        if "interfaces" in result:
+            result["interfaces"] = list(result["interfaces"])
+        return result
+    
+    def _build_dict(self) -> Dict[str, Any]:
+        """Serialize the device's fields (uncached)."""
         result = {
             "name": self.name,
             "ip": self.ip,
@@ -45,32 +81,51 @@ class Device:
         if self.vlans:
             result["vlans"] = [v.to_dict() for v in self.vlans]
         if self.interfaces:
-            result["interfaces"] = self.interfaces
+            result["interfaces"] = list(self.interfaces)
         return result
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Device":
         """Create Device from dictionary."""
-        vlans = []
+        get = data.get
+        vlans = ()
         if "vlans" in data:
-            for vlan_data in data["vlans"]:
-                if isinstance(vlan_data, dict):
-                    vlans.append(VLAN(id=vlan_data.get("id", 0), name=vlan_data.get("name", "")))
-                elif isinstance(vlan_data, int):
-                    vlans.append(VLAN(id=vlan_data, name="unknown"))
+            vlan_list = [v for v in data["vlans"] if isinstance(v, (dict, int))]
+            try:
+                vlans = tuple([
+                    _shared_vlan(v.get("id", 0), v.get("name", "")) if isinstance(v, dict)
+                    else _shared_vlan(v, "unknown")
+                    for v in vlan_list
+                ])
+            except TypeError:
+                # Unhashable VLAN fields (malformed input) can't be shared
+                vlans = tuple([
+                    VLAN(v.get("id", 0), v.get("name", "")) if isinstance(v, dict)
+                    else VLAN(v, "unknown")
+                    for v in vlan_list
+                ])
+        
+        interfaces = get("interfaces")
         
         return cls(
-            name=data.get("name", ""),
-            ip=data.get("ip", ""),
-            vendor=data.get("vendor", ""),
-            os=data.get("os", ""),
-            role=data.get("role", ""),
-            region=data.get("region"),
+            name=get("name", ""),
+            ip=get("ip", ""),
+            vendor=get("vendor", ""),
+            os=get("os", ""),
+            role=get("role", ""),
+            region=get("region"),
             vlans=vlans,
-            interfaces=data.get("interfaces")
+            interfaces=tuple(interfaces) if interfaces is not None else None
         )
 
 
+# Snapshots reloaded from the same export share a timestamp string, so the
+# parsed value is cached rather than re-parsed on every from_dict call.
+@lru_cache(maxsize=256)
+def _parse_iso(ts: str) -> datetime:
+    return datetime.fromisoformat(ts)
+
+
 @dataclass
 class InventorySnapshot:
     """Inventory snapshot from a source."""
@@ -78,6 +133,23 @@ class InventorySnapshot:
     generated_at: datetime
     source: Literal["netbox", "yaml", "merged"] = "yaml"
     
+    # Lookup indexes are built on first use and cached; snapshots are treated
+    # as immutable once created, so they never need rebuilding.
+    @cached_property
+    def by_name_lower(self) -> Dict[str, Device]:
+        """Devices keyed by lower-cased name (last one wins on duplicates)."""
+        return {d.name_key: d for d in self.devices}
+    
+    @cached_property
+    def by_ip(self) -> Dict[str, Device]:
+        """Devices keyed by IP address, skipping devices without one."""
+        return {d.ip: d for d in self.devices if d.ip}
+    
+    @cached_property
+    def _groupings(self) -> Dict[str, Dict[str, Tuple[Device, ...]]]:
+        """group_by groupings memoized per key as tuples (filled in by group_by)."""
+        return {}
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
         return {
@@ -92,7 +164,7 @@ class InventorySnapshot:
         devices = [Device.from_dict(d) for d in data.get("devices", [])]
         generated_at_str = data.get("generated_at")
         if isinstance(generated_at_str, str):
-            generated_at = datetime.fromisoformat(generated_at_str)
+            generated_at = _parse_iso(generated_at_str)
         else:
             generated_at = datetime.now()
         
@@ -103,7 +175,7 @@ class InventorySnapshot:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class InventoryMismatch:
     """Inventory mismatch/difference between sources."""
     category: str
@@ -125,7 +197,7 @@ class InventoryMismatch:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class InventoryReport:
     """Inventory validation report."""
     passed: int = 0
@@ -39,6 +39,44 @@ def get_port_telemetry() -> dict:
     return telemetry
 
 
+def get_port_telemetry_batch(n: int) -> List[Dict]:
+    """
+    Simulate n port telemetry samples in one vectorized draw.
+    
+    Produces the same fields and value ranges as get_port_telemetry, but
+    generates each metric for all samples at once with NumPy instead of
+    calling random per field, which is much faster for large telemetry sweeps.
+    
+    Args:
+        n: Number of telemetry samples to generate
+        
+    Returns:
+        List of n telemetry dictionaries shaped like get_port_telemetry's result
+    """
+    import numpy as np  # deferred: only bulk polling needs NumPy
+    
+    logger.info(f"Collecting {n} SONiC port telemetry samples")
+    rng = np.random.default_rng()
+    rx_bytes = rng.integers(10_000, 10_000_001, n).tolist()
+    tx_bytes = rng.integers(10_000, 10_000_001, n).tolist()
+    rx_errors = rng.integers(0, 11, n).tolist()
+    tx_errors = rng.integers(0, 11, n).tolist()
+    utilization = np.round(rng.uniform(0.2, 0.95, n), 2).tolist()
+    
+    return [
+        {
+            "switch": "sonic-leaf-01",
+            "interface": "Ethernet12",
+            "rx_bytes": rx,
+            "tx_bytes": tx,
+            "rx_errors": rxe,
+            "tx_errors": txe,
+            "utilization": util,
+        }
+        for rx, tx, rxe, txe, util in zip(rx_bytes, tx_bytes, rx_errors, tx_errors, utilization)
+    ]
+
+
 def get_network_topology() -> dict:
     """
     Return a mock network topology with multiple device types.
@@ -5,63 +5,467 @@ This script can be run directly to test the coordinator agent without the
 full interactive CLI interface.
 
 Usage:
+    python coordinator_agent.py --help
     python coordinator_agent.py
     python coordinator_agent.py "Which VLAN is sonic-leaf-01 on?"
     python coordinator_agent.py "Show devices with rx_errors > 5"
 """
-import sys
+import asyncio
+import atexit
+import hashlib
+import importlib.util
+import io
 import json
-from agents.coordinator_agent import get_coordinator
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+from utils.logger import setup_logger
+
+# prompt_toolkit gives non-blocking interactive input; it is only imported
+# once an interactive terminal session starts
+PROMPT_TOOLKIT_AVAILABLE = importlib.util.find_spec("prompt_toolkit") is not None
+
+# Interactive inputs that end the session
+_EXIT_COMMANDS = frozenset({"quit", "exit", "q"})
+
+# Interactive query history, shared by the prompt_toolkit and readline prompts
+HISTORY_FILE = os.path.expanduser(os.getenv("AVIZ_HISTORY", "~/.aviz_history"))
+HISTORY_LENGTH = 1000
+
+# Prefer orjson for (de)serializing cached results when installed; stdlib json otherwise
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=str).encode()
+    
+    _loads = json.loads
+
+logger = setup_logger(__name__)
+
+# Result cache: repeated queries within the TTL skip the agent pipeline.
+# Results persist in a SQLite file so repeated command-line invocations hit it
+# too; if the file cannot be opened the cache falls back to process memory.
+# Keys are SHA256 hashes of the normalized query, stored with the result time.
+CACHE_TTL = float(os.getenv("AVIZ_CACHE_TTL", "3600"))
+CACHE_DB = Path(os.getenv("AVIZ_CACHE_DB", Path.home() / ".cache" / "aviz" / "coord.db"))
+_CACHE_PREFIX = "aviz:coord:"
+# Case, runs of whitespace and trailing punctuation don't change a query's meaning
+_NORM_WS = re.compile(r"\s+")
+_NORM_PUNCT = re.compile(r"[?.!,;:]+$")
+_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_cache_db: Optional[sqlite3.Connection] = None
+_cache_db_failed = False
+
+
+def _normalize(query: str) -> str:
+    """Canonicalize a query so equivalent phrasings share a cache key."""
+    query = _NORM_WS.sub(" ", query.strip().lower())
+    return _NORM_PUNCT.sub("", query)
+
+
+def _cache_key(query: str) -> str:
+    """Build the cache key for a query."""
+    digest = hashlib.sha256(_normalize(query).encode()).hexdigest()
+    return _CACHE_PREFIX + digest
+
+
+def _get_cache_db() -> Optional[sqlite3.Connection]:
+    """Open the on-disk cache on first use, dropping expired results."""
+    global _cache_db, _cache_db_failed
+    if _cache_db is None and not _cache_db_failed:
+        try:
+            CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(CACHE_DB)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS results "
+                "(key TEXT PRIMARY KEY, ts REAL NOT NULL, value BLOB NOT NULL)"
+            )
+            db.execute("DELETE FROM results WHERE ts < ?", (time.time() - CACHE_TTL,))
+            db.commit()
+            _cache_db = db
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Result cache %s unavailable, caching in memory: %s", CACHE_DB, e)
+            _cache_db_failed = True
+    return _cache_db
+
+
+def _cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached result for a key if it is younger than CACHE_TTL."""
+    db = _get_cache_db()
+    if db is None:
+        entry = _CACHE.get(key)
+    else:
+        try:
+            row = db.execute("SELECT ts, value FROM results WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Result cache read failed: %s", e)
+            return None
+        entry = (row[0], _loads(row[1])) if row else None
+    if entry is not None and time.time() - entry[0] < CACHE_TTL:
+        return entry[1]
+    return None
+
+
+def _cache_put(key: str, result: Dict[str, Any]) -> None:
+    """Store a result under a key, stamped with the current time."""
+    db = _get_cache_db()
+    if db is None:
+        _CACHE[key] = (time.time(), result)
+        return
+    try:
+        db.execute(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+            (key, time.time(), _dumps(result))
+        )
+        db.commit()
+    except sqlite3.Error as e:
+        logger.warning("Result cache write failed: %s", e)
+
+
+def _cacheable(result: Dict[str, Any]) -> bool:
+    """Whether a result may be cached: failures and timeouts are transient."""
+    return bool(result.get("success")) and not result.get("errors")
+
+
+async def _cached_execute(coordinator, query: str) -> Dict[str, Any]:
+    """Execute a query, reusing a cached result younger than CACHE_TTL."""
+    key = _cache_key(query)
+    result = _cache_get(key)
+    if result is None:
+        result = await coordinator.execute_query_async(query)
+        if _cacheable(result):
+            _cache_put(key, result)
+    return result
+
+
+def invalidate(query: str) -> bool:
+    """Drop the cached result for a query; returns whether one was cached."""
+    key = _cache_key(query)
+    db = _get_cache_db()
+    if db is None:
+        return _CACHE.pop(key, None) is not None
+    deleted = db.execute("DELETE FROM results WHERE key = ?", (key,)).rowcount
+    db.commit()
+    return deleted > 0
+
+
+def clear() -> None:
+    """Drop every cached result."""
+    _CACHE.clear()
+    db = _get_cache_db()
+    if db is not None:
+        db.execute("DELETE FROM results")
+        db.commit()
+
+
+# Shared stand-in for a result without "data" (rendered, never mutated)
+_NO_DATA: Dict[str, Any] = {}
+
+
+def _render_agent_result(out: io.StringIO, agent: str, agent_result: Any) -> None:
+    """Render one sub-agent's block of the interactive-mode view into out."""
+    if not isinstance(agent_result, dict):
+        out.write(f"\n  {agent}:\n")
+        return
+
+    query_type = agent_result.get("query_type", "N/A")
+    summary = agent_result.get("summary", "N/A")
+    out.write(f"\n  {agent}:\n    Query Type: {query_type}\n    Summary: {summary}\n")
+    match agent_result.get("data", _NO_DATA):
+        case {"device": device} if device is not None:
+            out.write(f"    Device: {device.get('name', 'N/A')}\n")
+        case list() as items:
+            out.write(f"    Items: {len(items)}\n")
+        case dict() as data:
+            out.write(f"    Data keys: {list(data)}\n")
+
+
+def _render(result: Dict[str, Any]) -> str:
+    """Render the interactive-mode view of a complete coordinator result."""
+    agents_called = result.get("agents_called", [])
+    results = result.get("results", {})
+    out = io.StringIO()
+    out.write(f"\nSummary: {result.get('summary', 'N/A')}\n")
+    out.write(f"Agents called: {', '.join(agents_called)}\n")
+    out.write("\nResults:\n")
+    for agent, agent_result in results.items():
+        _render_agent_result(out, agent, agent_result)
+    out.write("\n")
+    return out.getvalue()
+
+
+def _write(text: str) -> None:
+    """Write a rendered chunk with one write and one flush."""
+    sys.stdout.write(text)
+    sys.stdout.flush()
+
+
+async def _stream_query(coordinator, query: str) -> None:
+    """Answer an interactive query, printing each sub-agent's result as it arrives.
+
+    Cached results print in full at once. Otherwise the fastest agent's block
+    shows without waiting for the slowest, and the combined summary follows
+    once every agent has answered. Each block is rendered into a buffer and
+    written in one call rather than line by line.
+    """
+    key = _cache_key(query)
+    cached = _cache_get(key)
+    if cached is not None:
+        _write(_render(cached))
+        return
+
+    results: Dict[str, Any] = {}
+    async for agent, agent_result in coordinator.execute_query_stream(query):
+        out = io.StringIO()
+        if not results:
+            out.write(f"\nResults for: {query}\n")
+        results[agent] = agent_result
+        _render_agent_result(out, agent, agent_result)
+        _write(out.getvalue())
+
+    result = coordinator.build_response(query, results)
+    if _cacheable(result):
+        _cache_put(key, result)
+    _write(
+        f"\nSummary: {result['summary']}\n"
+        f"Agents called: {', '.join(result['agents_called'])}\n\n"
+    )
+
+
+def _on_query_done(task: "asyncio.Task") -> None:
+    """Report an interactive query that failed."""
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"Error: {error}")
+
+
+def _stdin_reader(loop: asyncio.AbstractEventLoop, lines: "asyncio.Queue") -> None:
+    """Feed stdin lines into the event loop's queue (None marks EOF).
+
+    Reads the raw file descriptor instead of sys.stdin: a read blocked on the
+    terminal then holds no interpreter-level lock, so the daemon thread can be
+    abandoned at exit.
+    """
+    fd = sys.stdin.fileno()
+    encoding = sys.stdin.encoding or "utf-8"
+    partial = b""
+    while True:
+        chunk = os.read(fd, 4096)
+        if not chunk:
+            if partial:
+                loop.call_soon_threadsafe(lines.put_nowait, partial.decode(encoding, "replace"))
+            loop.call_soon_threadsafe(lines.put_nowait, None)
+            return
+        *complete, partial = (partial + chunk).split(b"\n")
+        for raw in complete:
+            loop.call_soon_threadsafe(lines.put_nowait, raw.decode(encoding, "replace"))
+
+
+def _readline_reader(loop: asyncio.AbstractEventLoop, lines: "asyncio.Queue") -> None:
+    """Feed input() lines, edited through GNU readline, into the event loop's queue.
+
+    Only used when stdin and stdout are both terminals: input() then reads
+    through readline rather than the sys.stdin buffer, so this daemon thread
+    can also be abandoned at exit.
+    """
+    while True:
+        try:
+            line = input("> ")
+        except EOFError:
+            loop.call_soon_threadsafe(lines.put_nowait, None)
+            return
+        loop.call_soon_threadsafe(lines.put_nowait, line)
+
+
+def _setup_readline() -> bool:
+    """Enable readline editing, persistent history and history completion.
+
+    Returns False when the readline module is unavailable (e.g. Windows).
+    """
+    try:
+        import readline
+    except ImportError:
+        return False
+
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass  # No history yet
+    readline.set_history_length(HISTORY_LENGTH)
+    atexit.register(_write_readline_history, readline)
+
+    def complete_from_history(text: str, state: int) -> Optional[str]:
+        entries = (readline.get_history_item(i) for i in range(readline.get_current_history_length(), 0, -1))
+        matches = list(dict.fromkeys(entry for entry in entries if entry and entry.startswith(text)))
+        return matches[state] if state < len(matches) else None
+
+    # Complete whole queries, not single words
+    readline.set_completer_delims("")
+    readline.set_completer(complete_from_history)
+    readline.parse_and_bind("tab: complete")
+    return True
+
+
+def _write_readline_history(readline) -> None:
+    """Save readline history at exit, ignoring an unwritable history file."""
+    try:
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+async def _read_queries():
+    """Yield interactive input lines without blocking the event loop.
+
+    On a terminal, uses prompt_toolkit when installed, otherwise input() with
+    GNU readline; both keep query history in HISTORY_FILE. Piped input is read
+    from the raw stdin descriptor. The fallbacks run in a daemon thread.
+    """
+    if PROMPT_TOOLKIT_AVAILABLE and sys.stdin.isatty():
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
+        from prompt_toolkit.history import History
+        from prompt_toolkit.patch_stdout import patch_stdout
+        
+        class PlainFileHistory(History):
+            """One query per line, the same file format readline uses."""
+            
+            def load_history_strings(self):
+                try:
+                    with open(HISTORY_FILE, encoding="utf-8") as f:
+                        entries = f.read().splitlines()
+                except OSError:
+                    return []
+                return reversed(entries[-HISTORY_LENGTH:])
+            
+            def store_string(self, string: str) -> None:
+                try:
+                    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+                        f.write(string.replace("\n", " ") + "\n")
+                except OSError:
+                    pass
+        
+        session = PromptSession(
+            history=PlainFileHistory(),
+            auto_suggest=AutoSuggestFromHistory()
+        )
+        # Results printed by finished queries appear above the live prompt
+        with patch_stdout():
+            while True:
+                yield await session.prompt_async("> ")
+    else:
+        use_readline = sys.stdin.isatty() and sys.stdout.isatty() and _setup_readline()
+        lines: asyncio.Queue = asyncio.Queue()
+        threading.Thread(
+            target=_readline_reader if use_readline else _stdin_reader,
+            args=(asyncio.get_running_loop(), lines),
+            name="coordinator-input",
+            daemon=True
+        ).start()
+        while True:
+            if not use_readline:
+                # input() prints the prompt itself on the readline path
+                sys.stdout.write("> ")
+                sys.stdout.flush()
+            line = await lines.get()
+            if line is None:
+                raise EOFError
+            yield line
+
+
+async def _one_shot(coordinator, query: str) -> None:
+    """Run a single command-line query and print the full result as JSON."""
+    print(f"Query: {query}\n")
+    result = await _cached_execute(coordinator, query)
+    print("\n" + "=" * 70)
+    print("Coordinator Result")
+    print("=" * 70)
+    from utils.renderers import to_json
+    print(to_json(result, sort_keys=False))
+
+
+async def _interactive(coordinator) -> None:
+    """Read queries while earlier ones are still running.
+
+    Each query runs as its own task and prints its results as they arrive,
+    so the prompt returns immediately. Quitting waits for in-flight queries;
+    Ctrl-C cancels them.
+    """
+    print("Aviz Coordinator Agent - Interactive Mode")
+    print("Type queries or 'quit' to exit ('!clear' or '!invalidate <query>' reset the result cache)\n")
+
+    pending: Set[asyncio.Task] = set()
+    queries = _read_queries()
+    try:
+        async for line in queries:
+            query = line.strip()
+            if not query:
+                continue
+            if query.lower() in _EXIT_COMMANDS:
+                break
+            if query == "!clear":
+                clear()
+                print("Result cache cleared\n")
+                continue
+            if query.startswith("!invalidate "):
+                cached_query = query[len("!invalidate "):]
+                if invalidate(cached_query):
+                    print(f"Dropped cached result for: {cached_query}\n")
+                else:
+                    print(f"No cached result for: {cached_query}\n")
+                continue
+            task = asyncio.create_task(_stream_query(coordinator, query))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            task.add_done_callback(_on_query_done)
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        print("\nGoodbye!")
+        for task in pending:
+            task.cancel()
+    except EOFError:
+        pass
+    finally:
+        await queries.aclose()
+
+    # Let queries still in flight finish (or finish cancelling)
+    await asyncio.gather(*pending, return_exceptions=True)
+
 
 def main():
     """Run coordinator agent with command-line query or interactive mode."""
+    if sys.argv[1:] in (["-h"], ["--help"]):
+        print(__doc__.strip())
+        return
+
+    # Imported here so --help does not pay for loading the agents
+    from agents.coordinator_agent import get_coordinator
     coordinator = get_coordinator()
-    
+
     if len(sys.argv) > 1:
         # Command-line query mode
-        query = " ".join(sys.argv[1:])
-        print(f"Query: {query}\n")
-        result = coordinator.execute_query(query)
-        print("\n" + "=" * 70)
-        print("Coordinator Result")
-        print("=" * 70)
-        print(json.dumps(result, indent=2))
+        asyncio.run(_one_shot(coordinator, " ".join(sys.argv[1:])))
     else:
         # Interactive mode
-        print("Aviz Coordinator Agent - Interactive Mode")
-        print("Type queries or 'quit' to exit\n")
-        
-        while True:
-            try:
-                query = input("> ").strip()
-                if not query:
-                    continue
-                if query.lower() in ["quit", "exit", "q"]:
-                    break
-                result = coordinator.execute_query(query)
-                print("\nSummary:", result.get("summary", "N/A"))
-                print("Agents called:", ", ".join(result.get("agents_called", [])))
-                print("\nResults:")
-                for agent, agent_result in result.get("results", {}).items():
-                    print(f"\n  {agent}:")
-                    if isinstance(agent_result, dict):
-                        print(f"    Query Type: {agent_result.get('query_type', 'N/A')}")
-                        print(f"    Summary: {agent_result.get('summary', 'N/A')}")
-                        data = agent_result.get("data", {})
-                        if isinstance(data, dict) and "device" in data:
-                            device = data["device"]
-                            print(f"    Device: {device.get('name', 'N/A')}")
-                        elif isinstance(data, list):
-                            print(f"    Items: {len(data)}")
-                        elif isinstance(data, dict):
-                            print(f"    Data keys: {list(data.keys())}")
-                print()
-            except KeyboardInterrupt:
-                print("\nGoodbye!")
-                break
-            except Exception as e:
-                print(f"Error: {e}")
+        try:
+            asyncio.run(_interactive(coordinator))
+        except KeyboardInterrupt:
+            # asyncio.run re-raises Ctrl-C after _interactive has said goodbye
+            pass
 
 if __name__ == "__main__":
     main()
-
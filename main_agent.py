@@ -1201,7 +1201,7 @@ def _parse_inventory_command(args: List[str]) -> Optional[Dict[str, Any]]:
     # Import inventory functions
     from agents.inventory_agent import (
         load_yaml_inventory, load_netbox_inventory, merge_inventories,
-        group_by, detect_mismatches, optional_identity_verify
+        count_by, detect_mismatches, optional_identity_verify
     )
     from agents.inventory_models import InventoryReport
     from utils.renderers import to_table, to_json, to_markdown_report, to_html_report
@@ -1231,17 +1231,12 @@ def _parse_inventory_command(args: List[str]) -> Optional[Dict[str, Any]]:
             return {"success": True}
         
         elif subcommand == "summary":
-            vendor_groups = group_by(merged, "vendor")
-            role_groups = group_by(merged, "role")
-            os_groups = group_by(merged, "os")
-            region_groups = group_by(merged, "region")
-            
             totals = {
                 "total_devices": len(merged.devices),
-                "by_vendor": {k: len(v) for k, v in vendor_groups.items()},
-                "by_role": {k: len(v) for k, v in role_groups.items()},
-                "by_os": {k: len(v) for k, v in os_groups.items()},
-                "by_region": {k: len(v) for k, v in region_groups.items()}
+                "by_vendor": count_by(merged, "vendor"),
+                "by_role": count_by(merged, "role"),
+                "by_os": count_by(merged, "os"),
+                "by_region": count_by(merged, "region")
             }
             
             if format_type == "json":
@@ -1305,10 +1300,6 @@ def _parse_inventory_command(args: List[str]) -> Optional[Dict[str, Any]]:
         
         elif subcommand == "report":
             mismatches = detect_mismatches(yaml_snap, netbox_snap)
-            vendor_groups = group_by(merged, "vendor")
-            role_groups = group_by(merged, "role")
-            os_groups = group_by(merged, "os")
-            region_groups = group_by(merged, "region")
             
             report = InventoryReport(
                 passed=len(merged.devices) - len(mismatches),
@@ -1316,10 +1307,10 @@ def _parse_inventory_command(args: List[str]) -> Optional[Dict[str, Any]]:
                 not_run=0,
                 mismatches=mismatches,
                 groups={
-                    "vendor": {k: len(v) for k, v in vendor_groups.items()},
-                    "role": {k: len(v) for k, v in role_groups.items()},
-                    "os": {k: len(v) for k, v in os_groups.items()},
-                    "region": {k: len(v) for k, v in region_groups.items()}
+                    "vendor": count_by(merged, "vendor"),
+                    "role": count_by(merged, "role"),
+                    "os": count_by(merged, "os"),
+                    "region": count_by(merged, "region")
                 }
             )
             
@@ -1343,9 +1334,10 @@ def _parse_inventory_command(args: List[str]) -> Optional[Dict[str, Any]]:
                         f.write(html)
                     print(f"Report exported to: {file_path}")
                 elif export_format == "json":
-                    report_data = {"snapshot": merged.to_dict(), "report": report.to_dict()}
+                    # to_json serializes the models itself, no intermediate to_dict()
+                    report_data = {"snapshot": merged, "report": report}
                     file_path = artifacts_dir / f"inventory_report_{timestamp}.json"
-                    with open(file_path, 'w') as f:
+                    with open(file_path, 'w', encoding='utf-8') as f:
                         f.write(to_json(report_data))
                     print(f"Report exported to: {file_path}")
             else:
@@ -23,7 +23,7 @@ from agents.inventory_agent import (
     load_yaml_inventory,
     load_netbox_inventory,
     merge_inventories,
-    group_by,
+    count_by,
     detect_mismatches,
     optional_identity_verify
 )
@@ -979,18 +979,13 @@ def inventory_summary(format: str = "table") -> dict:
         netbox_snapshot = load_netbox_inventory()
         merged_snapshot = merge_inventories(yaml_snapshot, netbox_snapshot)
         
-        # Generate groupings
-        vendor_groups = group_by(merged_snapshot, "vendor")
-        role_groups = group_by(merged_snapshot, "role")
-        os_groups = group_by(merged_snapshot, "os")
-        region_groups = group_by(merged_snapshot, "region")
-        
+        # Count devices per grouping
         totals = {
             "total_devices": len(merged_snapshot.devices),
-            "by_vendor": {k: len(v) for k, v in vendor_groups.items()},
-            "by_role": {k: len(v) for k, v in role_groups.items()},
-            "by_os": {k: len(v) for k, v in os_groups.items()},
-            "by_region": {k: len(v) for k, v in region_groups.items()}
+            "by_vendor": count_by(merged_snapshot, "vendor"),
+            "by_role": count_by(merged_snapshot, "role"),
+            "by_os": count_by(merged_snapshot, "os"),
+            "by_region": count_by(merged_snapshot, "region")
         }
         
         # Render in requested format
@@ -1171,23 +1166,17 @@ def inventory_report(
         # Detect mismatches
         mismatches = detect_mismatches(yaml_snapshot, netbox_snapshot)
         
-        # Generate groupings
-        vendor_groups = group_by(merged_snapshot, "vendor")
-        role_groups = group_by(merged_snapshot, "role")
-        os_groups = group_by(merged_snapshot, "os")
-        region_groups = group_by(merged_snapshot, "region")
-        
-        # Create report
+        # Create report (group sizes only, no per-group device lists)
         report = InventoryReport(
             passed=len(merged_snapshot.devices) - len(mismatches),
             failed=len(mismatches),
             not_run=0,
             mismatches=mismatches,
             groups={
-                "vendor": {k: len(v) for k, v in vendor_groups.items()},
-                "role": {k: len(v) for k, v in role_groups.items()},
-                "os": {k: len(v) for k, v in os_groups.items()},
-                "region": {k: len(v) for k, v in region_groups.items()}
+                "vendor": count_by(merged_snapshot, "vendor"),
+                "role": count_by(merged_snapshot, "role"),
+                "os": count_by(merged_snapshot, "os"),
+                "region": count_by(merged_snapshot, "region")
             }
         )
         
@@ -1219,12 +1208,13 @@ def inventory_report(
                 with open(file_path, 'w') as f:
                     f.write(html)
             elif export == "json":
+                # to_json serializes the models itself, no intermediate to_dict()
                 report_data = {
-                    "snapshot": merged_snapshot.to_dict(),
-                    "report": report.to_dict()
+                    "snapshot": merged_snapshot,
+                    "report": report
                 }
                 file_path = artifacts_dir / f"inventory_report_{timestamp}.json"
-                with open(file_path, 'w') as f:
+                with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(to_json(report_data))
         
         return {
@@ -0,0 +1,154 @@
+"""Behavior tests for the link health model in agents/ai_agent.py.
+
+Run:
+    python -m pytest -q test_ai_agent.py
+"""
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from agents import ai_agent
+from agents.ai_agent import (
+    MAX_WAIT_MS,
+    _MicroBatcher,
+    predict_link_health,
+    predict_link_health_batch,
+    predict_link_health_scores,
+)
+
+ROWS = [(0, 0, 0.1), (5, 3, 0.5), (120, 80, 0.95), (1, 0, 0.0)]
+
+
+def test_batch_matches_single_predictions():
+    batch = predict_link_health_batch(ROWS)
+    assert [r["inputs"] for r in batch] == [
+        {"rx_errors": rx, "tx_errors": tx, "utilization": util} for rx, tx, util in ROWS
+    ]
+    for row, result in zip(ROWS, batch):
+        single = predict_link_health(*row)
+        assert result["health_score"] == single["health_score"]
+        assert result["status"] == single["status"]
+
+
+def test_batch_sanitizes_inputs_and_handles_empty():
+    assert predict_link_health_batch([]) == []
+    [result] = predict_link_health_batch([(-4, -2, 1.5)])
+    assert result["inputs"] == {"rx_errors": 4, "tx_errors": 2, "utilization": 1.0}
+    assert result["health_score"] == predict_link_health(4, 2, 1.0)["health_score"]
+
+
+def test_scores_match_batch_results():
+    scores = predict_link_health_scores(ROWS + [(-5, -3, 2.0)])
+    assert scores.shape == (len(ROWS) + 1,)
+    assert scores.dtype == np.float32
+    assert np.all((scores >= 0.0) & (scores <= 1.0))
+    expected = [r["health_score"] for r in predict_link_health_batch(ROWS + [(5, 3, 1.0)])]
+    assert np.round(scores, 3).tolist() == pytest.approx(expected)
+
+
+def _best_per_call(fn, calls=100, rounds=5):
+    """Best-of-rounds mean latency of fn(i) in seconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for i in range(calls):
+            fn(i)
+        best = min(best, (time.perf_counter() - start) / calls)
+    return best
+
+
+def test_sequential_predictions_do_not_wait_for_the_batch_window(monkeypatch):
+    import torch
+
+    # Time the prediction path, not the per-call log line
+    monkeypatch.setattr(ai_agent.logger, "disabled", True)
+    predict_link_health(1, 1, 0.5)
+    per_call = _best_per_call(lambda i: predict_link_health(i % 7, 1, 0.3))
+
+    # Baseline: the eager PyTorch forward the agent used before batching
+    model = ai_agent._build_health_model()
+    with torch.no_grad():
+        baseline = _best_per_call(
+            lambda i: model(torch.tensor([[i % 7, 1, 0.3]], dtype=torch.float32)).item()
+        )
+
+    assert per_call < MAX_WAIT_MS / 1000.0 / 4
+    assert per_call < baseline
+
+
+def test_concurrent_callers_get_their_own_scores():
+    batcher = _MicroBatcher()
+    rows = [(i, i % 3, (i % 10) / 10) for i in range(64)]
+    expected = predict_link_health_scores(rows).tolist()
+    results = [None] * len(rows)
+    barrier = threading.Barrier(len(rows))
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher.predict(rows[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    np.testing.assert_allclose(results, expected, rtol=1e-5)
+    assert batcher._in_flight == 0
+    assert batcher._arriving == 0
+
+
+def test_batcher_propagates_forward_errors(monkeypatch):
+    def fail(rows):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(ai_agent, "_forward_batch", fail)
+    batcher = _MicroBatcher()
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.predict((1, 1, 0.5))
+    with pytest.raises(RuntimeError, match="model unavailable"):
+        batcher.submit((1, 1, 0.5)).result(timeout=5)
+
+    result = predict_link_health(1, 1, 0.5)
+    assert result["status"] == "error"
+    assert result["health_score"] is None
+
+
+def test_int8_scores_do_not_depend_on_concurrent_callers(monkeypatch):
+    ai_agent._get_weights()
+    int8_model = ai_agent._build_int8_model(ai_agent._build_health_model())
+    if int8_model is None:
+        pytest.skip("INT8 quantization unavailable on this build")
+    monkeypatch.setattr(ai_agent, "_int8_model", int8_model)
+
+    batcher = _MicroBatcher()
+    rows = [(i * 7, i * 3, (i % 10) / 10) for i in range(32)]
+    alone = [batcher.predict(row) for row in rows]
+    results = [None] * len(rows)
+    barrier = threading.Barrier(len(rows))
+
+    def call(i):
+        barrier.wait()
+        results[i] = batcher.predict(rows[i])
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(len(rows))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results == alone
+
+
+def test_building_int8_model_keeps_torch_thread_count():
+    import torch
+
+    threads = torch.get_num_threads()
+    torch.set_num_threads(threads + 1)
+    try:
+        ai_agent._build_int8_model(ai_agent._build_health_model())
+        assert torch.get_num_threads() == threads + 1
+    finally:
+        torch.set_num_threads(threads)
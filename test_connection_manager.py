@@ -0,0 +1,128 @@
+"""Behavior tests for the pooled SSH clients in agents/connection_manager.py.
+
+Run:
+    python -m pytest -q test_connection_manager.py
+"""
+import threading
+
+import pytest
+
+from agents import connection_manager as cm
+
+pytestmark = pytest.mark.skipif(not cm.PARAMIKO_AVAILABLE, reason="paramiko not installed")
+
+
+class FakeTransport:
+    def __init__(self):
+        self.active = True
+
+    def is_active(self):
+        return self.active
+
+
+class FakeSSHClient:
+    """Stand-in for paramiko.SSHClient that records connects and closes."""
+
+    instances = []
+    connect_hook = None
+
+    def __init__(self):
+        self.transport = None
+        self.closed = False
+        FakeSSHClient.instances.append(self)
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, **kwargs):
+        if FakeSSHClient.connect_hook is not None:
+            FakeSSHClient.connect_hook()
+        self.transport = FakeTransport()
+
+    def get_transport(self):
+        return self.transport
+
+    def close(self):
+        self.closed = True
+        if self.transport is not None:
+            self.transport.active = False
+
+
+@pytest.fixture(autouse=True)
+def fake_paramiko(monkeypatch):
+    FakeSSHClient.instances = []
+    FakeSSHClient.connect_hook = None
+    monkeypatch.setattr(cm.paramiko, "SSHClient", FakeSSHClient)
+    cm.close_ssh_pool()
+    yield
+    cm.close_ssh_pool()
+
+
+def test_client_is_reused_per_host_port_user():
+    first = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+    assert cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5) is first
+    other = cm._get_ssh_client("10.0.0.1", 22, "oper", "pw", 5)
+    assert other is not first
+    assert len(FakeSSHClient.instances) == 2
+
+
+def test_client_is_not_reused_with_a_different_password():
+    first = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+    other = cm._get_ssh_client("10.0.0.1", 22, "admin", "wrong", 5)
+    assert other is not first
+    assert cm._get_ssh_client("10.0.0.1", 22, "admin", "", 5) not in (first, other)
+    assert cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5) is first
+    assert len(FakeSSHClient.instances) == 3
+    assert "pw" not in repr(list(cm._ssh_pool))
+
+
+def test_stale_client_is_replaced():
+    first = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+    first.transport.active = False
+    second = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+    assert second is not first
+    assert first.closed
+    assert not second.closed
+
+
+def test_least_recently_used_client_is_evicted(monkeypatch):
+    monkeypatch.setattr(cm, "SSH_POOL_MAXSIZE", 2)
+    a = cm._get_ssh_client("a", 22, "u", "pw", 5)
+    b = cm._get_ssh_client("b", 22, "u", "pw", 5)
+    cm._get_ssh_client("a", 22, "u", "pw", 5)
+    cm._get_ssh_client("c", 22, "u", "pw", 5)
+    assert b.closed
+    assert not a.closed
+    assert [key[:3] for key in cm._ssh_pool] == [("a", 22, "u"), ("c", 22, "u")]
+
+
+def test_concurrent_misses_share_one_client():
+    barrier = threading.Barrier(2)
+    FakeSSHClient.connect_hook = lambda: barrier.wait(timeout=5)
+    results = [None, None]
+
+    def connect(i):
+        results[i] = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+
+    threads = [threading.Thread(target=connect, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert results[0] is results[1]
+    assert not results[0].closed
+    assert list(cm._ssh_pool.values()) == [results[0]]
+    assert sum(client.closed for client in FakeSSHClient.instances) == 1
+
+
+def test_discard_and_close_pool():
+    client = cm._get_ssh_client("10.0.0.1", 22, "admin", "pw", 5)
+    cm._discard_ssh_client("10.0.0.1", 22, "admin", "pw")
+    assert client.closed
+    assert not cm._ssh_pool
+
+    clients = [cm._get_ssh_client(host, 22, "u", "pw", 5) for host in ("a", "b")]
+    cm.close_ssh_pool()
+    assert all(c.closed for c in clients)
+    assert not cm._ssh_pool
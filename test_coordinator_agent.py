@@ -0,0 +1,40 @@
+"""Behavior tests for result combining in agents/coordinator_agent.py.
+
+Run:
+    python -m pytest -q test_coordinator_agent.py
+"""
+import json
+
+import pytest
+
+from agents.coordinator_agent import CoordinatorAgent
+
+
+@pytest.fixture(scope="module")
+def coordinator():
+    return CoordinatorAgent()
+
+
+def test_structured_data_values_are_lists(coordinator):
+    combined = coordinator._combine_results({
+        "inventory": {"data": {"devices": [{"name": "sonic-leaf-01"}]}},
+        "telemetry": {"data": {"interface": "Ethernet0"}},
+        "config": {"data": "not a list"},
+    })
+    assert combined == {
+        "devices": [{"name": "sonic-leaf-01"}],
+        "telemetry": [{"interface": "Ethernet0"}],
+        "config_issues": [],
+        "tickets": [],
+    }
+    assert all(type(value) is list for value in combined.values())
+
+
+def test_structured_data_survives_a_json_round_trip(coordinator):
+    # Cached answers are read back from JSON, so they must compare equal
+    combined = coordinator._combine_results({"ticketing": {"data": []}})
+    assert json.loads(json.dumps(combined)) == combined
+
+    empty = coordinator._combine_results({})
+    empty["devices"].append("mutated")
+    assert coordinator._combine_results({})["devices"] == []
@@ -0,0 +1,179 @@
+"""Behavior tests for the result cache in the standalone coordinator_agent.py script.
+
+Every test points the cache at a temporary SQLite file.
+
+Run:
+    python -m pytest -q test_coordinator_cache.py
+"""
+import asyncio
+
+import pytest
+
+import coordinator_agent as coord
+
+
+@pytest.fixture(autouse=True)
+def cache_db(tmp_path, monkeypatch):
+    """Point the result cache at a fresh SQLite file for each test."""
+    path = tmp_path / "coord.db"
+    monkeypatch.setattr(coord, "CACHE_DB", path)
+    monkeypatch.setattr(coord, "_cache_db", None)
+    monkeypatch.setattr(coord, "_cache_db_failed", False)
+    monkeypatch.setattr(coord, "_CACHE", {})
+    yield path
+    if coord._cache_db is not None:
+        coord._cache_db.close()
+
+
+def _reopen():
+    """Simulate a process restart: drop the open connection."""
+    coord._cache_db.close()
+    coord._cache_db = None
+
+
+def _result(query, success=True, errors=None):
+    return {
+        "query": query,
+        "agents_called": ["inventory"],
+        "results": {"inventory": {"success": success, "summary": "ok"}},
+        "errors": errors or {},
+        "summary": "Inventory: ok",
+        "structured_data": {},
+        "success": success,
+    }
+
+
+class FakeCoordinator:
+    """Counts executions and returns queued results."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def execute_query_async(self, query):
+        self.calls += 1
+        return self.results.pop(0)
+
+
+def test_equivalent_queries_share_a_cache_key():
+    assert coord._cache_key("List  devices?") == coord._cache_key("list devices")
+    assert coord._cache_key("list devices") != coord._cache_key("list vlans")
+    assert coord._cache_key("list devices").startswith(coord._CACHE_PREFIX)
+
+
+def test_results_persist_in_sqlite_across_restarts(cache_db):
+    key = coord._cache_key("list devices")
+    coord._cache_put(key, _result("list devices"))
+    assert cache_db.exists()
+
+    _reopen()
+    assert coord._cache_get(key) == _result("list devices")
+    assert coord._CACHE == {}
+
+
+def test_expired_results_are_not_returned(monkeypatch):
+    key = coord._cache_key("list devices")
+    coord._cache_put(key, _result("list devices"))
+    monkeypatch.setattr(coord, "CACHE_TTL", 0.0)
+    assert coord._cache_get(key) is None
+
+    # Expired rows are purged when the cache is next opened
+    _reopen()
+    db = coord._get_cache_db()
+    assert db.execute("SELECT COUNT(*) FROM results").fetchone()[0] == 0
+
+
+def test_invalidate_and_clear():
+    coord._cache_put(coord._cache_key("list devices"), _result("list devices"))
+    coord._cache_put(coord._cache_key("list vlans"), _result("list vlans"))
+
+    assert coord.invalidate("List devices?")
+    assert not coord.invalidate("list devices")
+    assert coord._cache_get(coord._cache_key("list devices")) is None
+    assert coord._cache_get(coord._cache_key("list vlans")) is not None
+
+    coord.clear()
+    assert coord._cache_get(coord._cache_key("list vlans")) is None
+
+
+def test_falls_back_to_memory_when_the_db_cannot_be_opened(tmp_path, monkeypatch):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    monkeypatch.setattr(coord, "CACHE_DB", blocker / "coord.db")
+
+    key = coord._cache_key("list devices")
+    coord._cache_put(key, _result("list devices"))
+    assert coord._cache_db_failed
+    assert coord._cache_get(key) == _result("list devices")
+    assert coord.invalidate("list devices")
+    assert coord._cache_get(key) is None
+
+
+def test_cached_execute_reuses_successful_results():
+    coordinator = FakeCoordinator(_result("list devices"))
+    first = asyncio.run(coord._cached_execute(coordinator, "list devices"))
+    second = asyncio.run(coord._cached_execute(coordinator, "List devices!"))
+    assert coordinator.calls == 1
+    assert second == first
+
+
+@pytest.mark.parametrize("failed", [
+    _result("show errors", success=False, errors={"telemetry": "boom"}),
+    _result("show errors", errors={"telemetry": ""}),
+])
+def test_cached_execute_does_not_cache_failures(failed):
+    coordinator = FakeCoordinator(failed, _result("show errors"))
+    assert asyncio.run(coord._cached_execute(coordinator, "show errors")) == failed
+    assert coord._cache_get(coord._cache_key("show errors")) is None
+
+    assert asyncio.run(coord._cached_execute(coordinator, "show errors")) == _result("show errors")
+    assert coordinator.calls == 2
+    assert coord._cache_get(coord._cache_key("show errors")) == _result("show errors")
+
+
+class FakeStreamingCoordinator:
+    """Streams queued per-agent results and builds responses like CoordinatorAgent."""
+
+    def __init__(self, *runs):
+        self.runs = list(runs)
+        self.calls = 0
+
+    async def execute_query_stream(self, query):
+        self.calls += 1
+        for agent, agent_result in self.runs.pop(0).items():
+            yield agent, agent_result
+
+    def build_response(self, query, results):
+        errors = {
+            name: r["error"] for name, r in results.items()
+            if r.get("success") is False and "error" in r
+        }
+        return {
+            "query": query,
+            "agents_called": list(results),
+            "results": results,
+            "errors": errors,
+            "summary": "done",
+            "structured_data": {},
+            "success": not errors,
+        }
+
+
+def test_stream_query_caches_only_successful_results(capsys):
+    timed_out = {"inventory": {"success": True, "summary": "ok"},
+                 "telemetry": {"success": False, "error": "timed out"}}
+    answered = {"inventory": {"success": True, "summary": "ok"},
+                "telemetry": {"success": True, "summary": "fine"}}
+    coordinator = FakeStreamingCoordinator(timed_out, answered)
+
+    asyncio.run(coord._stream_query(coordinator, "show errors"))
+    assert coord._cache_get(coord._cache_key("show errors")) is None
+
+    asyncio.run(coord._stream_query(coordinator, "show errors"))
+    asyncio.run(coord._stream_query(coordinator, "Show errors?"))
+    assert coordinator.calls == 2
+    assert coord._cache_get(coord._cache_key("show errors"))["results"] == answered
+
+    out = capsys.readouterr().out
+    assert out.count("Results for: show errors") == 2
+    assert "Summary: done" in out
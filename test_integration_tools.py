@@ -0,0 +1,395 @@
+"""Behavior tests for the NetBox topology fetch and Telnet sessions in agents/integration_tools.py.
+
+NetBox is replaced by an in-memory fake behind the shared requests session,
+and devices by a local telnetlib3 server.
+
+Run:
+    python -m pytest -q test_integration_tools.py
+"""
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from agents import integration_tools as it
+
+BASE_URL = "https://netbox.test"
+TOKEN = "test-token"
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(payload).encode()
+        self.headers = {}
+        self.reason = "OK"
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise it.requests.exceptions.HTTPError(response=self)
+
+
+class FakeNetBox:
+    """Serves NetBox 4 shaped REST list endpoints and the GraphQL topology query."""
+
+    def __init__(self, interfaces=3):
+        self.devices = {}
+        self.cables = {}
+        self.interfaces = interfaces
+        self.requests = []
+        self.graphql_queries = []
+
+    def add_device(self, device_id, name, role, address, updated):
+        self.devices[device_id] = {
+            "id": device_id,
+            "name": name,
+            "last_updated": updated,
+            "device_type": {"model": "AS7726", "manufacturer": {"name": "Edgecore"}},
+            "site": {"name": "lab"},
+            "status": {"value": "active"},
+            "role": {"name": role},
+            "primary_ip4": {"address": address},
+            "primary_ip": {"address": address},
+        }
+
+    def add_cable(self, cable_id, a, b, updated):
+        self.cables[cable_id] = {
+            "id": cable_id,
+            "last_updated": updated,
+            "status": {"value": "connected"},
+            "type": {"value": "cat6"},
+            "a_terminations": [{
+                "object_type": "dcim.interface",
+                "object_id": cable_id * 2,
+                "object": {"id": cable_id * 2, "name": "Ethernet0", "device": {"name": a}},
+            }],
+            "b_terminations": [{
+                "object_type": "dcim.interface",
+                "object_id": cable_id * 2 + 1,
+                "object": {"id": cable_id * 2 + 1, "name": "Ethernet4", "device": {"name": b}},
+            }],
+        }
+
+    def _list(self, records, params):
+        if params.get("limit") == 1:
+            return {"count": len(records), "next": None, "results": records[:1]}
+        since = params.get("last_updated__gte")
+        if since:
+            records = [r for r in records if r["last_updated"] >= since]
+        return {"count": len(records), "next": None, "results": records}
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        params = params or {}
+        self.requests.append((url, dict(params)))
+        path = url[len(BASE_URL):]
+        if path == "/api/dcim/devices/":
+            return FakeResponse(self._list(list(self.devices.values()), params))
+        if path == "/api/dcim/cables/":
+            return FakeResponse(self._list(list(self.cables.values()), params))
+        if path == "/api/dcim/interfaces/":
+            return FakeResponse({"count": self.interfaces, "next": None, "results": [{"id": 1}]})
+        return FakeResponse({}, status_code=404)
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.graphql_queries.append(json["query"])
+        devices = [{
+            "id": str(d["id"]),
+            "last_updated": d["last_updated"],
+            "name": d["name"],
+            "device_type": d["device_type"],
+            "site": d["site"],
+            "status": d["status"]["value"].upper(),
+            "role": d["role"],
+            "primary_ip4": d["primary_ip4"],
+        } for d in self.devices.values()]
+        cables = [{
+            "id": str(c["id"]),
+            "last_updated": c["last_updated"],
+            "status": c["status"]["value"].upper(),
+            "type": c["type"]["value"].upper(),
+            "a_terminations": [{k: t["object"][k] for k in ("name", "device")} for t in c["a_terminations"]],
+            "b_terminations": [{k: t["object"][k] for k in ("name", "device")} for t in c["b_terminations"]],
+        } for c in self.cables.values()]
+        return FakeResponse({"data": {"device_list": devices, "cable_list": cables}})
+
+
+@pytest.fixture
+def netbox(monkeypatch):
+    fake = FakeNetBox()
+    fake.add_device(1, "dev1", "leaf", "10.0.0.1/24", "2024-01-01T00:00:00Z")
+    fake.add_device(2, "dev2", "spine", "10.0.0.2/24", "2024-01-01T00:00:00Z")
+    fake.add_device(3, "dev3", "leaf", "10.0.0.3/24", "2024-01-01T00:00:00Z")
+    fake.add_cable(10, "dev1", "dev2", "2024-01-01T00:00:00Z")
+    monkeypatch.setattr(it, "_netbox_session", fake)
+    it.invalidate_topology_cache()
+    it._etag_cache.clear()
+    yield fake
+    it.invalidate_topology_cache()
+    it._etag_cache.clear()
+
+
+def test_graphql_fetch_counts_interfaces_without_listing_them(netbox):
+    result = it.get_topology_from_netbox(BASE_URL, TOKEN)
+
+    assert result["success"]
+    assert len(netbox.graphql_queries) == 1
+    assert "interface_list" not in netbox.graphql_queries[0]
+    assert (f"{BASE_URL}/api/dcim/interfaces/", {"limit": 1}) in netbox.requests
+    assert result["statistics"] == {"total_devices": 3, "total_interfaces": 3, "total_links": 1}
+    assert {d["name"]: d["status"] for d in result["devices"]} == {
+        "dev1": "active", "dev2": "active", "dev3": "active"
+    }
+
+
+def test_cached_topology_is_returned_as_a_copy(netbox):
+    first = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    first["devices"][0]["name"] = "mutated"
+    first["devices"].clear()
+
+    second = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    assert len(netbox.graphql_queries) == 1
+    assert [d["name"] for d in second["devices"]] == ["dev1", "dev2", "dev3"]
+
+
+def _expire_topology_cache():
+    with it._topology_cache_lock:
+        for key, (_, result, state) in list(it._TOPOLOGY_CACHE.items()):
+            it._TOPOLOGY_CACHE[key] = (0.0, result, state)
+
+
+def test_delta_refresh_merges_changed_devices_in_the_same_dialect(netbox):
+    full = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    assert {d["name"]: (d["role"], d["primary_ip"]) for d in full["devices"]}["dev3"] == ("leaf", "10.0.0.3/24")
+
+    netbox.add_device(3, "dev3", "leaf", "10.0.0.33/24", "2024-02-01T00:00:00Z")
+    netbox.requests.clear()
+    _expire_topology_cache()
+    refreshed = it.get_topology_from_netbox(BASE_URL, TOKEN)
+
+    # Only the delta went over REST; no second full GraphQL fetch
+    assert len(netbox.graphql_queries) == 1
+    assert (f"{BASE_URL}/api/dcim/devices/",
+            {"limit": it.NETBOX_PAGE_SIZE, "last_updated__gte": "2024-01-01T00:00:00Z"}) in netbox.requests
+    assert {d["name"]: (d["role"], d["primary_ip"]) for d in refreshed["devices"]} == {
+        "dev1": ("leaf", "10.0.0.1/24"),
+        "dev2": ("spine", "10.0.0.2/24"),
+        "dev3": ("leaf", "10.0.0.33/24"),
+    }
+    assert refreshed["devices"] == [
+        dict(d, primary_ip="10.0.0.33/24") if d["name"] == "dev3" else d for d in full["devices"]
+    ]
+
+
+def test_delta_refresh_reads_pre_4_0_device_role(netbox):
+    it.get_topology_from_netbox(BASE_URL, TOKEN)
+    netbox.add_device(2, "dev2", "spine", "10.0.0.2/24", "2024-02-01T00:00:00Z")
+    record = netbox.devices[2]
+    record["device_role"] = record.pop("role")
+    del record["primary_ip4"]
+    _expire_topology_cache()
+
+    refreshed = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    dev2 = next(d for d in refreshed["devices"] if d["name"] == "dev2")
+    assert (dev2["role"], dev2["primary_ip"]) == ("spine", "10.0.0.2/24")
+
+
+def test_delta_refresh_keeps_links_of_refetched_cables(netbox):
+    full = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    assert full["links"] == [{
+        "id": 10, "source_device": "dev1", "source_interface": "Ethernet0",
+        "target_device": "dev2", "target_interface": "Ethernet4",
+        "status": "connected", "type": "cat6",
+    }]
+
+    # last_updated__gte re-fetches the cable at the watermark on every refresh
+    for _ in range(2):
+        _expire_topology_cache()
+        refreshed = it.get_topology_from_netbox(BASE_URL, TOKEN)
+        assert len(netbox.graphql_queries) == 1
+        assert refreshed["links"] == full["links"]
+        assert refreshed["statistics"]["total_links"] == 1
+
+    netbox.add_cable(11, "dev2", "dev3", "2024-02-01T00:00:00Z")
+    _expire_topology_cache()
+    refreshed = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    assert len(netbox.graphql_queries) == 1
+    assert [(l["source_device"], l["target_device"]) for l in refreshed["links"]] == [
+        ("dev1", "dev2"), ("dev2", "dev3")
+    ]
+
+
+def test_delta_refresh_falls_back_to_full_fetch_after_deletions(netbox):
+    it.get_topology_from_netbox(BASE_URL, TOKEN)
+    del netbox.devices[2]
+    _expire_topology_cache()
+
+    refreshed = it.get_topology_from_netbox(BASE_URL, TOKEN)
+    assert len(netbox.graphql_queries) == 2
+    assert [d["name"] for d in refreshed["devices"]] == ["dev1", "dev3"]
+
+
+async def _sonic_shell(reader, writer):
+    """A device with a "Username:" banner and a Linux shell "$" prompt."""
+    writer.write("Welcome to SONiC\r\nUsername: ")
+    await reader.readline()
+    writer.write("Password: ")
+    await reader.readline()
+    writer.write("\r\nadmin@sonic:~$ ")
+    while True:
+        command = (await reader.readline()).strip()
+        if not command:
+            break
+        writer.write(f"{command}\r\nSONiC.202311\r\nadmin@sonic:~$ ")
+
+
+@pytest.fixture
+def telnet_device(monkeypatch):
+    """Serve _sonic_shell on a local port and point both Telnet clients at it."""
+    telnetlib3 = pytest.importorskip("telnetlib3")
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(telnetlib3.create_server(
+        host="127.0.0.1", port=0, shell=_sonic_shell, connect_maxwait=0.5
+    ))
+    port = server.sockets[0].getsockname()[1]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    open_connection = telnetlib3.open_connection
+    monkeypatch.setattr(it.telnetlib3, "open_connection",
+                        lambda host, _port, **kwargs: open_connection(host, port, **kwargs))
+    if it.TELNETLIB_AVAILABLE:
+        telnet = it.telnetlib.Telnet
+        monkeypatch.setattr(it.telnetlib, "Telnet", lambda host, timeout: telnet(host, port, timeout=timeout))
+    yield
+    with it._telnet_pool_lock:
+        sessions = list(it._telnet_pool.values())
+        it._telnet_pool.clear()
+    for tn in sessions:
+        tn.close()
+    server.close()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+
+def test_async_telnet_session_handles_username_banner_and_shell_prompt(telnet_device):
+    start = time.monotonic()
+    result = asyncio.run(it.get_device_status_from_telnet_async("127.0.0.1", "admin", "pw", "show version"))
+    assert result == {
+        "success": True, "host": "127.0.0.1", "command": "show version",
+        "output": "SONiC.202311", "error": None
+    }
+    assert time.monotonic() - start < 2
+
+
+@pytest.mark.skipif(not it.TELNETLIB_AVAILABLE, reason="telnetlib not available")
+def test_sync_telnet_session_handles_username_banner_and_shell_prompt(telnet_device):
+    start = time.monotonic()
+    result = it.get_device_status_from_telnet("127.0.0.1", "admin", "pw", "show version")
+    assert result["success"]
+    assert result["output"] == "SONiC.202311"
+    assert time.monotonic() - start < 2
+
+
+class FakeTelnetSession:
+    """Pooled session stand-in whose keepalive send can fail or be checked out mid-send."""
+
+    def __init__(self, on_send=None):
+        self.closed = False
+        self.sent = []
+        self.on_send = on_send
+
+    def get_socket(self):
+        return self
+
+    def sendall(self, data):
+        self.sent.append(data)
+        if self.on_send is not None:
+            self.on_send(self)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def telnet_pool(monkeypatch):
+    monkeypatch.setattr(it, "_telnet_keepalive_thread", object())  # don't start the real thread
+    with it._telnet_pool_lock:
+        it._telnet_pool.clear()
+    yield it._telnet_pool
+    with it._telnet_pool_lock:
+        it._telnet_pool.clear()
+
+
+def _run_keepalive_once(monkeypatch):
+    """Run one pass of the keepalive loop on a private stop event."""
+    stop = threading.Event()
+    monkeypatch.setattr(it, "_telnet_keepalive_stop", stop)
+    monkeypatch.setattr(it, "TELNET_KEEPALIVE_INTERVAL", 0.01)
+    thread = threading.Thread(target=it._telnet_keepalive_loop, daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    stop.set()
+    thread.join(timeout=5)
+
+
+def test_telnet_pool_reuses_and_evicts_sessions(telnet_pool, monkeypatch):
+    monkeypatch.setattr(it, "TELNET_POOL_MAXSIZE", 2)
+    a, b, c, a2 = (FakeTelnetSession() for _ in range(4))
+    it._return_telnet_session("a", "admin", "pw", a)
+    it._return_telnet_session("b", "admin", "pw", b)
+    assert it._take_telnet_session("a", "admin", "pw") is a
+    assert it._take_telnet_session("a", "admin", "pw") is None
+
+    it._return_telnet_session("a", "admin", "pw", a)
+    it._return_telnet_session("a", "admin", "pw", a2)
+    assert a.closed and not a2.closed
+    it._return_telnet_session("c", "admin", "pw", c)
+    assert b.closed
+    assert [key[:2] for key in telnet_pool] == [("a", "admin"), ("c", "admin")]
+
+
+def test_telnet_pool_requires_the_same_password(telnet_pool):
+    session = FakeTelnetSession()
+    it._return_telnet_session("a", "admin", "pw", session)
+    assert it._take_telnet_session("a", "admin", "wrong") is None
+    assert it._take_telnet_session("a", "admin", "") is None
+    assert "pw" not in repr(list(telnet_pool))
+    assert it._take_telnet_session("a", "admin", "pw") is session
+
+
+def test_keepalive_drops_dead_idle_sessions(telnet_pool, monkeypatch):
+    def fail(tn):
+        raise OSError("connection reset")
+
+    alive, dead = FakeTelnetSession(), FakeTelnetSession(on_send=fail)
+    it._return_telnet_session("alive", "admin", "pw", alive)
+    it._return_telnet_session("dead", "admin", "pw", dead)
+    _run_keepalive_once(monkeypatch)
+
+    assert alive.sent and not alive.closed
+    assert dead.closed
+    assert [key[:2] for key in telnet_pool] == [("alive", "admin")]
+
+
+def test_keepalive_leaves_checked_out_sessions_open(telnet_pool, monkeypatch):
+    checked_out = []
+
+    def checked_out_then_fail(tn):
+        # A request thread takes the session while the NOP is in flight
+        checked_out.append(it._take_telnet_session("busy", "admin", "pw"))
+        raise OSError("connection reset")
+
+    busy = FakeTelnetSession(on_send=checked_out_then_fail)
+    it._return_telnet_session("busy", "admin", "pw", busy)
+    _run_keepalive_once(monkeypatch)
+
+    assert checked_out[0] is busy
+    assert not busy.closed
+
+
+def test_inventory_agent_shares_the_netbox_session():
+    from agents import inventory_agent
+
+    assert inventory_agent.get_netbox_session() is it.get_netbox_session()
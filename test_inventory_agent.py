@@ -0,0 +1,77 @@
+"""Behavior tests for identity verification and grouping in agents/inventory_agent.py.
+
+Run:
+    python -m pytest -q test_inventory_agent.py
+"""
+import threading
+from datetime import datetime
+
+from agents import connection_manager
+from agents.inventory_agent import group_by, optional_identity_verify
+from agents.inventory_models import Device, InventorySnapshot
+
+
+def _device(name, ip):
+    return Device(name=name, ip=ip, vendor="Edgecore", os="SONiC", role="leaf")
+
+
+def test_identity_verify_reports_hostname_mismatches_in_device_order(monkeypatch):
+    hostnames = {"10.0.0.1": "leaf1", "10.0.0.2": "spine9", "10.0.0.3": "other"}
+    checked = []
+    lock = threading.Lock()
+
+    def fake_identity(device):
+        with lock:
+            checked.append(device["name"])
+        if device["ip"] == "10.0.0.4":
+            raise OSError("unreachable")
+        return {"method": "ssh", "hostname": hostnames.get(device["ip"], ""), "success": True}
+
+    monkeypatch.setattr(connection_manager, "get_device_identity", fake_identity)
+    devices = [
+        _device("LEAF1", "10.0.0.1"),
+        _device("spine1", "10.0.0.2"),
+        _device("no-ip", ""),
+        _device("leaf3", "10.0.0.3"),
+        _device("leaf4", "10.0.0.4"),
+    ]
+
+    mismatches = optional_identity_verify(devices, max_workers=4)
+
+    assert sorted(checked) == ["LEAF1", "leaf3", "leaf4", "spine1"]
+    assert [(m.device_name, m.expected, m.observed) for m in mismatches] == [
+        ("spine1", "spine1", "spine9"),
+        ("leaf3", "leaf3", "other"),
+    ]
+    assert all(m.category == "IDENTITY_MISMATCH" for m in mismatches)
+
+
+def test_identity_verify_disabled_or_without_ips_skips_connections(monkeypatch):
+    def fail(device):
+        raise AssertionError("no connection expected")
+
+    monkeypatch.setattr(connection_manager, "get_device_identity", fail)
+    assert optional_identity_verify([_device("leaf1", "10.0.0.1")], enabled=False) == []
+    assert optional_identity_verify([_device("leaf1", "")]) == []
+
+
+def test_group_by_results_are_independent_between_calls():
+    snapshot = InventorySnapshot(devices=[
+        _device("leaf-1", "10.0.0.1"),
+        Device(name="spine-1", ip="10.0.0.2", vendor="Celestica", os="SONiC", role="spine"),
+        _device("leaf-2", "10.0.0.3"),
+    ], generated_at=datetime.now())
+    first = group_by(snapshot, "vendor")
+    assert {vendor: [d.name for d in devices] for vendor, devices in first.items()} == {
+        "Edgecore": ["leaf-1", "leaf-2"], "Celestica": ["spine-1"]
+    }
+
+    first["Edgecore"].clear()
+    first["Celestica"].append(first["Celestica"][0])
+    del first["Celestica"]
+
+    second = group_by(snapshot, "vendor")
+    assert second is not first
+    assert {vendor: [d.name for d in devices] for vendor, devices in second.items()} == {
+        "Edgecore": ["leaf-1", "leaf-2"], "Celestica": ["spine-1"]
+    }
@@ -0,0 +1,65 @@
+"""Behavior tests for agents/inventory_models.py.
+
+Run:
+    python -m pytest -q test_inventory_models.py
+"""
+import dataclasses
+from datetime import datetime
+
+import pytest
+
+from agents.inventory_models import VLAN, Device, InventorySnapshot
+
+
+def _device(**overrides):
+    fields = dict(
+        name="Leaf1", ip="10.0.0.1", vendor="Edgecore", os="SONiC", role="leaf",
+        region="us-west", vlans=(VLAN(10, "prod"), VLAN(20, "mgmt")), interfaces=("Ethernet0",)
+    )
+    fields.update(overrides)
+    return Device(**fields)
+
+
+def test_to_dict_serializes_all_fields():
+    assert _device().to_dict() == {
+        "name": "Leaf1",
+        "ip": "10.0.0.1",
+        "vendor": "Edgecore",
+        "os": "SONiC",
+        "role": "leaf",
+        "region": "us-west",
+        "vlans": [{"id": 10, "name": "prod"}, {"id": 20, "name": "mgmt"}],
+        "interfaces": ["Ethernet0"],
+    }
+    assert _device(region=None, vlans=(), interfaces=None).to_dict() == {
+        "name": "Leaf1", "ip": "10.0.0.1", "vendor": "Edgecore", "os": "SONiC", "role": "leaf"
+    }
+
+
+def test_mutating_to_dict_result_does_not_leak_into_later_calls():
+    device = _device()
+    first = device.to_dict()
+    first["exported"] = True
+    first["name"] = "changed"
+    first["vlans"].append({"id": 30, "name": "new"})
+    first["vlans"][0]["name"] = "changed"
+    first["interfaces"].clear()
+
+    second = device.to_dict()
+    assert second == _device().to_dict()
+    assert second is not first
+
+
+def test_device_is_frozen_and_round_trips():
+    device = _device()
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        device.name = "other"
+    assert device.name_key == "leaf1"
+    assert Device.from_dict(device.to_dict()) == device
+
+    snapshot = InventorySnapshot(devices=[device], generated_at=datetime(2024, 1, 15, 10, 30), source="merged")
+    restored = InventorySnapshot.from_dict(snapshot.to_dict())
+    assert restored.devices == [device]
+    assert restored.generated_at == snapshot.generated_at
+    assert restored.by_name_lower["leaf1"] == device
+
@@ -0,0 +1,27 @@
+"""Behavior tests for utils/topology_builder.py.
+
+Run:
+    python -m pytest -q test_topology_builder.py
+"""
+from agents.telemetry_agent import get_network_topology
+from utils.topology_builder import build_multi_vendor_topology
+
+
+def test_each_call_returns_an_independent_topology():
+    first = build_multi_vendor_topology()
+    expected_devices = len(first["devices"])
+    first["devices"][0]["status"] = "mutated"
+    first["devices"].pop()
+    first["statistics"]["total_devices"] = 0
+
+    second = build_multi_vendor_topology()
+    assert second is not first
+    assert len(second["devices"]) == expected_devices
+    assert second["devices"][0]["status"] == "active"
+    assert second["statistics"]["total_devices"] == expected_devices
+
+
+def test_network_topology_callers_do_not_share_state():
+    first = get_network_topology()
+    first["links"].clear()
+    assert get_network_topology()["links"]
@@ -0,0 +1,18 @@
+"""Credential helpers shared by the pooled device connections."""
+import hashlib
+import hmac
+import secrets
+from typing import Optional
+
+# Per-process key, so pool keys never hold a reusable hash of a password
+_DIGEST_KEY = secrets.token_bytes(32)
+
+
+def credential_digest(password: Optional[str]) -> str:
+    """
+    Return a keyed digest of a password for use in connection pool keys.
+
+    Pools keyed on it only hand a logged-in session to callers that supplied
+    the same password the session was opened with.
+    """
+    return hmac.new(_DIGEST_KEY, (password or "").encode("utf-8"), hashlib.sha256).hexdigest()
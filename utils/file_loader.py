@@ -7,26 +7,46 @@ from utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Prefer orjson (C parser) when installed; stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-def load_build_json(file_path: str) -> Optional[Dict]:
+
+def resolve_build_path(file_path: str) -> str:
     """
-    Load and parse a build JSON file.
+    Resolve a build JSON path.
     
     Args:
         file_path: Path to the JSON file (can be relative to data/builds/)
         
     Returns:
-        Parsed JSON data or None if file not found/invalid
+        Absolute path, preferring data/builds/ for relative paths
     """
     # Resolve path - check if it's already absolute, or relative to data/builds/
     if not os.path.isabs(file_path):
         # Try relative to data/builds/ first
         data_path = Path(__file__).parent.parent / "data" / "builds" / file_path
         if data_path.exists():
-            file_path = str(data_path)
-        else:
-            # Try as relative to current working directory
-            file_path = os.path.abspath(file_path)
+            return str(data_path)
+        # Try as relative to current working directory
+        return os.path.abspath(file_path)
+    return file_path
+
+
+def load_build_json(file_path: str) -> Optional[Dict]:
+    """
+    Load and parse a build JSON file.
+    
+    Args:
+        file_path: Path to the JSON file (can be relative to data/builds/)
+        
+    Returns:
+        Parsed JSON data or None if file not found/invalid
+    """
+    file_path = resolve_build_path(file_path)
     
     logger.debug(f"Loading build JSON from: {file_path}")
     
@@ -35,8 +55,12 @@ def load_build_json(file_path: str) -> Optional[Dict]:
         return None
     
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
+        if ORJSON_AVAILABLE:
+            with open(file_path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(file_path, 'r') as f:
+                data = json.load(f)
         logger.debug(f"Successfully loaded build JSON: {file_path}")
         return data
     except json.JSONDecodeError as e:
@@ -0,0 +1,34 @@
+"""Shared HTTP session for NetBox API calls."""
+from functools import lru_cache
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds for NetBox requests
+NETBOX_TIMEOUT = (3.05, 10)
+
+
+@lru_cache(maxsize=None)
+def get_netbox_session() -> requests.Session:
+    """
+    Return the process-wide keep-alive session for NetBox API calls.
+
+    Connections are pooled per host. Transient failures (connection errors,
+    502/503/504) are retried with a short backoff; GraphQL POSTs are read-only
+    queries, so they are retried too. The last response is still returned so
+    raise_for_status() reports its status.
+    """
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
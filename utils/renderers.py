@@ -19,6 +19,13 @@ try:
 except ImportError:
     JINJA2_AVAILABLE = False
 
+# Prefer orjson (C encoder) for JSON output when installed; stdlib json otherwise
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from agents.inventory_models import Device, InventorySnapshot, InventoryReport
 
 
@@ -105,6 +112,10 @@ def to_json(obj: Any, indent: int = 2, sort_keys: bool = True) -> str:
     """
     Convert object to stable JSON string.
     
+    Model objects (anything with to_dict()) may appear at any depth, so
+    callers can pass snapshots and reports directly instead of converting
+    them first. Other unknown types are rendered with str().
+    
     Args:
         obj: Object to serialize (can be dict, list, or model with to_dict())
         indent: JSON indentation (default: 2)
@@ -113,11 +124,31 @@ def to_json(obj: Any, indent: int = 2, sort_keys: bool = True) -> str:
     Returns:
         JSON string
     """
-    # Handle model objects with to_dict()
-    if hasattr(obj, "to_dict"):
-        obj = obj.to_dict()
+    # orjson only supports two-space indentation; other layouts use json
+    if ORJSON_AVAILABLE and indent == 2:
+        option = (
+            orjson.OPT_INDENT_2
+            | orjson.OPT_NON_STR_KEYS
+            # Keep datetime and dataclass output identical to the json path
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        try:
+            return orjson.dumps(obj, default=_json_default, option=option).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits or unsortable mixed-type keys
+            pass
     
-    return json.dumps(obj, indent=indent, sort_keys=sort_keys, default=str)
+    return json.dumps(obj, indent=indent, sort_keys=sort_keys, default=_json_default)
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize model objects via to_dict() and anything else via str()."""
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return str(obj)
 
 
 def to_markdown_report(